@@ -0,0 +1,213 @@
+"""
+Semantic answer cache for the question endpoints.
+
+Answers are stored together with the embedding of the question that produced
+them. A new question whose embedding has cosine similarity above a threshold
+with a cached one gets the stored answer back without running the agent.
+Identical questions (after whitespace/case normalization) are matched without
+embedding them at all.
+
+Entries expire after a TTL, the least recently used entry is evicted when the
+cache is full, and `invalidate()` drops everything when ingestion changes the
+corpus. The cache lives in process memory, so ingestion running in another
+process is only picked up once entries expire.
+"""
+
+import os
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheProbe:
+    """State captured by `lookup` that `store` needs to cache the eventual answer."""
+    normalized_query: str
+    embedding: Optional[np.ndarray]
+    generation: int
+
+
+@dataclass
+class _CachedAnswer:
+    normalized_query: str
+    answer: str
+    embedding: np.ndarray
+    created_at: float
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class SemanticAnswerCache:
+    """LRU + TTL cache of agent answers keyed by question embedding."""
+
+    def __init__(
+        self,
+        embed: Callable[[str], Awaitable[List[float]]],
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 1000
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            embed: Coroutine function returning the embedding of a question
+            similarity_threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: How long an answer stays valid
+            max_entries: Maximum number of cached answers (LRU eviction beyond that)
+        """
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[str, _CachedAnswer]" = OrderedDict()
+        self._exact: Dict[str, str] = {}  # normalized query -> entry key
+        self._generation = 0
+
+        # Stacked embeddings of all entries, rebuilt lazily after inserts/removals
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls, embed: Callable[[str], Awaitable[List[float]]]) -> "SemanticAnswerCache":
+        """Create a cache configured by the ANSWER_CACHE_* environment variables."""
+        return cls(
+            embed=embed,
+            similarity_threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+            ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+            max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000")),
+        )
+
+    async def lookup(self, query: str) -> Tuple[Optional[str], CacheProbe]:
+        """
+        Find a cached answer for `query`.
+
+        Returns:
+            Tuple of (cached answer or None, probe to pass to `store` on a miss)
+        """
+        normalized = _normalize_query(query)
+        generation = self._generation
+
+        key = self._exact.get(normalized)
+        if key is not None and self._is_fresh(key):
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key].answer, CacheProbe(normalized, None, generation)
+
+        embedding = self._unit_vector(await self.embed(query))
+        # Expired rows are dropped first so they can't shadow a fresh, slightly less similar answer
+        self._drop_expired()
+        key, similarity = self._most_similar(embedding)
+        if key is not None and similarity >= self.similarity_threshold:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            logger.info(f"Answer cache hit (similarity {similarity:.3f})")
+            return self._entries[key].answer, CacheProbe(normalized, embedding, generation)
+
+        self.misses += 1
+        return None, CacheProbe(normalized, embedding, generation)
+
+    def store(self, probe: CacheProbe, answer: str) -> None:
+        """Cache `answer` for the question described by `probe`."""
+        if probe.embedding is None or not answer:
+            return
+        if probe.generation != self._generation:
+            # The corpus changed while the answer was generated; it may already be stale.
+            return
+
+        # A concurrent miss for the same question may have stored it already; replace that answer
+        previous = self._exact.get(probe.normalized_query)
+        if previous is not None:
+            self._forget(previous, self._entries.pop(previous))
+
+        while len(self._entries) >= self.max_entries:
+            key, entry = self._entries.popitem(last=False)
+            self._forget(key, entry)
+            self.evictions += 1
+
+        key = uuid4().hex
+        self._entries[key] = _CachedAnswer(
+            normalized_query=probe.normalized_query,
+            answer=answer,
+            embedding=probe.embedding,
+            created_at=time.monotonic(),
+        )
+        self._exact[probe.normalized_query] = key
+        self._matrix = None
+
+    def invalidate(self) -> None:
+        """Drop every cached answer (called when ingestion changes the corpus)."""
+        self._entries.clear()
+        self._exact.clear()
+        self._matrix = None
+        self._generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and size counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _is_fresh(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if time.monotonic() - entry.created_at <= self.ttl_seconds:
+            return True
+        self._forget(key, self._entries.pop(key))
+        self.expirations += 1
+        return False
+
+    def _drop_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry.created_at < cutoff]
+        for key in expired:
+            self._forget(key, self._entries.pop(key))
+        self.expirations += len(expired)
+
+    def _forget(self, key: str, entry: _CachedAnswer) -> None:
+        if self._exact.get(entry.normalized_query) == key:
+            del self._exact[entry.normalized_query]
+        self._matrix = None
+
+    def _most_similar(self, embedding: np.ndarray) -> Tuple[Optional[str], float]:
+        if not self._entries:
+            return None, 0.0
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries.keys())
+            self._matrix = np.stack([self._entries[k].embedding for k in self._matrix_keys])
+
+        # Rows and query are unit vectors, so the dot product is the cosine similarity
+        scores = self._matrix @ embedding
+        best = int(np.argmax(scores))
+        return self._matrix_keys[best], float(scores[best])
+
+    @staticmethod
+    def _unit_vector(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
@@ -0,0 +1,279 @@
+"""
+Checkpoints for resumable ingestion runs.
+
+Every run gets an id and a directory under INGEST_CHECKPOINT_DIR (default
+`<project root>/.cache/runs/<run_id>`) holding:
+
+- run.json: the run's parameters and status, so a resume repeats the same run
+- events.jsonl: an append-only log of per-file stages
+  (converted, chunked, embedded, saved)
+- chunks/: the embedded chunks of files that are embedded but not yet saved,
+  so a resumed run never pays for the same embeddings twice (the persistent
+  embedding store may have evicted them in the meantime)
+
+Resuming skips saved files and reloads embedded chunks instead of calling the
+embedding API again. Conversions are not stored here: unchanged files come
+back from the conversion cache.
+
+A single-document run (an API upload) deletes its checkpoint once it has
+finished without errors, since there is nothing left to resume. Other runs of
+any status are deleted once they have been idle for
+INGEST_CHECKPOINT_RETENTION_DAYS.
+"""
+
+import os
+import sys
+import json
+import gzip
+import time
+import base64
+import shutil
+import hashlib
+import logging
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from .chunker import DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+# Per-file stages, in the order a file completes them
+CHECKPOINT_STAGES = ("converted", "chunked", "embedded", "saved")
+
+
+def _default_checkpoint_dir() -> Path:
+    # checkpoints.py -> file_data_ingestion -> api -> project root
+    return Path(__file__).resolve().parents[2] / ".cache" / "runs"
+
+
+def checkpoint_root() -> Path:
+    return Path(os.getenv("INGEST_CHECKPOINT_DIR") or _default_checkpoint_dir()).expanduser()
+
+
+def prune_runs(max_age_days: Optional[float] = None) -> None:
+    """
+    Delete runs idle for longer than INGEST_CHECKPOINT_RETENTION_DAYS (default 7).
+
+    Completed, failed and interrupted runs alike; a run still marked running that
+    has written nothing for that long died without updating its status.
+    """
+    if max_age_days is None:
+        max_age_days = float(os.getenv("INGEST_CHECKPOINT_RETENTION_DAYS", "7"))
+    root = checkpoint_root()
+    if not root.is_dir():
+        return
+
+    cutoff = time.time() - max_age_days * 86400
+    for run_dir in root.iterdir():
+        try:
+            last_write = max(
+                path.stat().st_mtime
+                for path in (run_dir / "run.json", run_dir / "events.jsonl")
+                if path.exists()
+            )
+        except (OSError, ValueError):
+            # Not a run directory
+            continue
+        if last_write <= cutoff:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def new_run_id() -> str:
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:6]}"
+
+
+def _pack_embedding(embedding: Optional[List[float]]) -> Optional[str]:
+    if not embedding:
+        return None
+    floats = array("f", embedding)
+    if sys.byteorder == "big":
+        floats.byteswap()
+    return base64.b64encode(floats.tobytes()).decode("ascii")
+
+
+def _unpack_embedding(data: Optional[str]) -> Optional[List[float]]:
+    if data is None:
+        return None
+    floats = array("f")
+    floats.frombytes(base64.b64decode(data))
+    if sys.byteorder == "big":
+        floats.byteswap()
+    return floats.tolist()
+
+
+class RunCheckpoint:
+    """Persisted progress of one ingestion run."""
+
+    def __init__(self, run_id: str, directory: Optional[Path] = None):
+        """
+        Initialize checkpoint.
+
+        Args:
+            run_id: Run identifier
+            directory: Run directory (default: <checkpoint root>/<run_id>)
+        """
+        self.run_id = run_id
+        self.directory = Path(directory) if directory else checkpoint_root() / run_id
+        self._files: Dict[str, Dict[str, Any]] = {}  # path -> latest event
+        self._events = None
+
+    @classmethod
+    def create(cls, params: Dict[str, Any], run_id: Optional[str] = None) -> "RunCheckpoint":
+        """Start a new run and persist its parameters."""
+        prune_runs()
+        checkpoint = cls(run_id or new_run_id())
+        (checkpoint.directory / "chunks").mkdir(parents=True, exist_ok=True)
+        checkpoint._write_run({
+            "run_id": checkpoint.run_id,
+            "status": "running",
+            "created_at": datetime.now().isoformat(),
+            "params": params,
+        })
+        return checkpoint
+
+    @classmethod
+    def load(cls, run_id: str) -> "RunCheckpoint":
+        """
+        Open an existing run for resuming.
+
+        Raises:
+            FileNotFoundError: If no checkpoint exists for `run_id`
+        """
+        if not run_id or run_id in (".", "..") or Path(run_id).name != run_id:
+            raise FileNotFoundError(f"Invalid run id: {run_id!r}")
+        checkpoint = cls(run_id)
+        if not (checkpoint.directory / "run.json").exists():
+            raise FileNotFoundError(f"No checkpoint found for run {run_id} in {checkpoint.directory.parent}")
+
+        events_path = checkpoint.directory / "events.jsonl"
+        if events_path.exists():
+            with open(events_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Last line of a run that died mid-write
+                        continue
+                    checkpoint._files[event["path"]] = event
+        return checkpoint
+
+    @property
+    def run(self) -> Dict[str, Any]:
+        with open(self.directory / "run.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.run["params"]
+
+    def _write_run(self, run: Dict[str, Any]) -> None:
+        tmp_path = self.directory / "run.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        os.replace(tmp_path, self.directory / "run.json")
+
+    def update_run(self, **fields: Any) -> None:
+        """Update top-level run fields (e.g. status, cleaned)."""
+        run = self.run
+        run.update(fields)
+        self._write_run(run)
+
+    def stage(self, path: str, content_sha256: Optional[str] = None) -> Optional[str]:
+        """
+        Last completed stage of a file, or None.
+
+        If `content_sha256` is given and the file changed since it was checkpointed,
+        its progress no longer counts and None is returned.
+        """
+        event = self._files.get(path)
+        if event is None:
+            return None
+        if content_sha256 is not None and event.get("content_sha256") != content_sha256:
+            return None
+        return event["stage"]
+
+    def record(self, path: str, stage: str, content_sha256: Optional[str] = None, **extra: Any) -> None:
+        """Append a stage event for a file."""
+        event = {"path": path, "stage": stage, "content_sha256": content_sha256, **extra}
+        if self._events is None:
+            self._events = open(self.directory / "events.jsonl", "a", encoding="utf-8")
+        self._events.write(json.dumps(event) + "\n")
+        self._events.flush()
+        self._files[path] = event
+
+        if stage == "saved":
+            self._chunks_path(path).unlink(missing_ok=True)
+
+    def _chunks_path(self, path: str) -> Path:
+        return self.directory / "chunks" / f"{hashlib.sha256(path.encode('utf-8')).hexdigest()}.json.gz"
+
+    def save_chunks(self, path: str, content_sha256: str, chunks: List[DocumentChunk]) -> None:
+        """Persist embedded chunks and mark the file as embedded (callers skip failed embeddings)."""
+        chunks_path = self._chunks_path(path)
+        tmp_path = chunks_path.with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=3) as f:
+            json.dump([
+                {
+                    "content": c.content,
+                    "index": c.index,
+                    "start_char": c.start_char,
+                    "end_char": c.end_char,
+                    "metadata": c.metadata,
+                    "token_count": c.token_count,
+                    "embedding": _pack_embedding(c.embedding),
+                }
+                for c in chunks
+            ], f)
+        os.replace(tmp_path, chunks_path)
+        self.record(path, "embedded", content_sha256)
+
+    def load_chunks(self, path: str, content_sha256: str) -> Optional[List[DocumentChunk]]:
+        """Embedded chunks of a file checkpointed at the `embedded` stage, if still valid."""
+        if self.stage(path, content_sha256) != "embedded":
+            return None
+        if not self._chunks_path(path).exists():
+            return None
+        try:
+            with gzip.open(self._chunks_path(path), "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not load checkpointed chunks for {path}: {e}")
+            return None
+
+        if any("embedding_error" in item["metadata"] for item in data):
+            # Zero vectors of failed embeddings; embed the file again instead
+            return None
+
+        chunks = []
+        for item in data:
+            chunk = DocumentChunk(
+                content=item["content"],
+                index=item["index"],
+                start_char=item["start_char"],
+                end_char=item["end_char"],
+                metadata=item["metadata"],
+                token_count=item["token_count"],
+            )
+            chunk.embedding = _unpack_embedding(item["embedding"])
+            chunks.append(chunk)
+        return chunks
+
+    def counts(self) -> Dict[str, int]:
+        """Number of files whose last completed stage is each checkpoint stage."""
+        counts = {stage: 0 for stage in CHECKPOINT_STAGES}
+        for event in self._files.values():
+            counts[event["stage"]] = counts.get(event["stage"], 0) + 1
+        return counts
+
+    def discard(self) -> None:
+        """Delete the run's directory (a finished run that has nothing left to resume)."""
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def close(self) -> None:
+        if self._events is not None:
+            self._events.close()
+            self._events = None
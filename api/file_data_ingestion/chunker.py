@@ -14,15 +14,18 @@ Benefits over custom chunking:
 - Battle-tested (maintained by Docling team)
 """
 
-import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union
 from dataclasses import dataclass
 
 from dotenv import load_dotenv
-from transformers import AutoTokenizer
-from docling.chunking import HybridChunker
-from docling_core.types.doc import DoclingDocument
+
+from .text_reader import iter_paragraphs, sliding_windows
+
+# transformers and docling are imported when a DoclingHybridChunker is created, so that
+# importing DocumentChunk (e.g. from the query-time embedder) stays cheap.
 
 # Load environment variables
 load_dotenv()
@@ -30,6 +33,15 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4)
+def _load_tokenizer(model_id: str):
+    """Load (and on first use download) a HuggingFace tokenizer once per process."""
+    from transformers import AutoTokenizer
+
+    logger.info(f"Initializing tokenizer: {model_id}")
+    return AutoTokenizer.from_pretrained(model_id)
+
+
 @dataclass
 class ChunkingConfig:
     """Configuration for chunking."""
@@ -85,12 +97,13 @@ class DoclingHybridChunker:
         Args:
             config: Chunking configuration
         """
+        from docling.chunking import HybridChunker
+
         self.config = config
 
-        # Initialize tokenizer for token-aware chunking
+        # Initialize tokenizer for token-aware chunking (shared by all chunker instances)
         model_id = "sentence-transformers/all-MiniLM-L6-v2"
-        logger.info(f"Initializing tokenizer: {model_id}")
-        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+        self.tokenizer = _load_tokenizer(model_id)
 
         # Create HybridChunker
         self.chunker = HybridChunker(
@@ -107,7 +120,7 @@ class DoclingHybridChunker:
         title: str,
         source: str,
         metadata: Optional[Dict[str, Any]] = None,
-        docling_doc: Optional[DoclingDocument] = None
+        docling_doc: Optional[Any] = None
     ) -> List[DocumentChunk]:
         """
         Chunk a document using Docling's HybridChunker.
@@ -122,6 +135,17 @@ class DoclingHybridChunker:
         Returns:
             List of document chunks with contextualized content
         """
+        # Tokenizing every chunk is CPU work; keep it off the event loop
+        return await asyncio.to_thread(self._chunk_document, content, title, source, metadata, docling_doc)
+
+    def _chunk_document(
+        self,
+        content: str,
+        title: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]],
+        docling_doc: Optional[Any]
+    ) -> List[DocumentChunk]:
         if not content.strip():
             return []
 
@@ -142,42 +166,9 @@ class DoclingHybridChunker:
 
         try:
             # Use HybridChunker to chunk the DoclingDocument
-            chunk_iter = self.chunker.chunk(dl_doc=docling_doc)
-            chunks = list(chunk_iter)
-
-            # Convert Docling chunks to DocumentChunk objects
-            document_chunks = []
-            current_pos = 0
-
-            for i, chunk in enumerate(chunks):
-                # Get contextualized text (includes heading hierarchy)
-                contextualized_text = self.chunker.contextualize(chunk=chunk)
-
-                # Count actual tokens
-                token_count = len(self.tokenizer.encode(contextualized_text))
-
-                # Create chunk metadata
-                chunk_metadata = {
-                    **base_metadata,
-                    "total_chunks": len(chunks),
-                    "token_count": token_count,
-                    "has_context": True  # Flag indicating contextualized chunk
-                }
-
-                # Estimate character positions
-                start_char = current_pos
-                end_char = start_char + len(contextualized_text)
-
-                document_chunks.append(DocumentChunk(
-                    content=contextualized_text.strip(),
-                    index=i,
-                    start_char=start_char,
-                    end_char=end_char,
-                    metadata=chunk_metadata,
-                    token_count=token_count
-                ))
-
-                current_pos = end_char
+            document_chunks = list(self._iter_hybrid_chunks(docling_doc, base_metadata))
+            for chunk in document_chunks:
+                chunk.metadata["total_chunks"] = len(document_chunks)
 
             logger.info(f"Created {len(document_chunks)} chunks using HybridChunker")
             return document_chunks
@@ -186,9 +177,83 @@ class DoclingHybridChunker:
             logger.error(f"HybridChunker failed: {e}, falling back to simple chunking")
             return self._simple_fallback_chunk(content, base_metadata)
 
+    def iter_chunks(
+        self,
+        content: Union[str, Iterable[str]],
+        title: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        docling_doc: Optional[Any] = None
+    ) -> Iterator[DocumentChunk]:
+        """
+        Yield chunks one at a time, for documents too large to chunk in one go.
+
+        Chunks carry no `total_chunks` (it isn't known until the end), and a HybridChunker
+        failure is raised instead of falling back, since earlier chunks may already be
+        stored. Blocking; run it in a worker thread.
+
+        Args:
+            content: Document content, as one string or consecutive blocks
+                (only used without a DoclingDocument)
+            title: Document title
+            source: Document source
+            metadata: Additional metadata
+            docling_doc: Optional pre-converted DoclingDocument
+
+        Yields:
+            Document chunks in order
+        """
+        base_metadata = {
+            "title": title,
+            "source": source,
+            "chunk_method": "hybrid",
+            **(metadata or {})
+        }
+        if docling_doc is None:
+            yield from self._iter_fallback_chunks([content] if isinstance(content, str) else content, base_metadata)
+        else:
+            yield from self._iter_hybrid_chunks(docling_doc, base_metadata)
+
+    def _iter_hybrid_chunks(
+        self,
+        docling_doc: Any,
+        base_metadata: Dict[str, Any]
+    ) -> Iterator[DocumentChunk]:
+        """Convert HybridChunker chunks to DocumentChunk objects as they are produced."""
+        current_pos = 0
+
+        for i, chunk in enumerate(self.chunker.chunk(dl_doc=docling_doc)):
+            # Get contextualized text (includes heading hierarchy)
+            contextualized_text = self.chunker.contextualize(chunk=chunk)
+
+            # Count actual tokens
+            token_count = len(self.tokenizer.encode(contextualized_text))
+
+            # Create chunk metadata
+            chunk_metadata = {
+                **base_metadata,
+                "token_count": token_count,
+                "has_context": True  # Flag indicating contextualized chunk
+            }
+
+            # Estimate character positions
+            start_char = current_pos
+            end_char = start_char + len(contextualized_text)
+
+            yield DocumentChunk(
+                content=contextualized_text.strip(),
+                index=i,
+                start_char=start_char,
+                end_char=end_char,
+                metadata=chunk_metadata,
+                token_count=token_count
+            )
+
+            current_pos = end_char
+
     def _simple_fallback_chunk(
         self,
-        content: str,
+        content: Union[str, Iterable[str]],
         base_metadata: Dict[str, Any]
     ) -> List[DocumentChunk]:
         """
@@ -199,56 +264,14 @@ class DoclingHybridChunker:
         - HybridChunker fails
 
         Args:
-            content: Content to chunk
+            content: Content to chunk, as one string or consecutive blocks
             base_metadata: Base metadata for chunks
 
         Returns:
             List of document chunks
         """
-        chunks = []
-        chunk_size = self.config.chunk_size
-        overlap = self.config.chunk_overlap
-
-        # Simple sliding window approach
-        start = 0
-        chunk_index = 0
-
-        while start < len(content):
-            end = start + chunk_size
-
-            if end >= len(content):
-                # Last chunk
-                chunk_text = content[start:]
-            else:
-                # Try to end at sentence boundary
-                chunk_end = end
-                for i in range(end, max(start + self.config.min_chunk_size, end - 200), -1):
-                    if i < len(content) and content[i] in '.!?\n':
-                        chunk_end = i + 1
-                        break
-                chunk_text = content[start:chunk_end]
-                end = chunk_end
-
-            if chunk_text.strip():
-                token_count = len(self.tokenizer.encode(chunk_text))
-
-                chunks.append(DocumentChunk(
-                    content=chunk_text.strip(),
-                    index=chunk_index,
-                    start_char=start,
-                    end_char=end,
-                    metadata={
-                        **base_metadata,
-                        "chunk_method": "simple_fallback",
-                        "total_chunks": -1  # Will update after
-                    },
-                    token_count=token_count
-                ))
-
-                chunk_index += 1
-
-            # Move forward with overlap
-            start = end - overlap
+        blocks = [content] if isinstance(content, str) else content
+        chunks = list(self._iter_fallback_chunks(blocks, base_metadata))
 
         # Update total chunks
         for chunk in chunks:
@@ -257,6 +280,28 @@ class DoclingHybridChunker:
         logger.info(f"Created {len(chunks)} chunks using simple fallback")
         return chunks
 
+    def _iter_fallback_chunks(self, blocks: Iterable[str], base_metadata: Dict[str, Any]) -> Iterator[DocumentChunk]:
+        """Sliding-window chunks, trying to end each at a sentence boundary."""
+        chunk_index = 0
+        for start, end, chunk_text in sliding_windows(
+            blocks, self.config.chunk_size, self.config.chunk_overlap, self.config.min_chunk_size
+        ):
+            if not chunk_text.strip():
+                continue
+
+            yield DocumentChunk(
+                content=chunk_text.strip(),
+                index=chunk_index,
+                start_char=start,
+                end_char=end,
+                metadata={
+                    **base_metadata,
+                    "chunk_method": "simple_fallback"
+                },
+                token_count=len(self.tokenizer.encode(chunk_text))
+            )
+            chunk_index += 1
+
 
 class SimpleChunker:
     """
@@ -292,6 +337,15 @@ class SimpleChunker:
         Returns:
             List of document chunks
         """
+        return await asyncio.to_thread(self._chunk_document, content, title, source, metadata)
+
+    def _chunk_document(
+        self,
+        content: str,
+        title: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]]
+    ) -> List[DocumentChunk]:
         if not content.strip():
             return []
 
@@ -303,10 +357,51 @@ class SimpleChunker:
         }
 
         # Split on double newlines (paragraphs)
-        import re
-        paragraphs = re.split(r'\n\s*\n', content)
+        chunks = list(self._iter_paragraph_chunks(iter_paragraphs([content]), base_metadata))
+
+        # Update total chunks in metadata
+        for chunk in chunks:
+            chunk.metadata["total_chunks"] = len(chunks)
+
+        return chunks
+
+    def iter_chunks(
+        self,
+        content: Union[str, Iterable[str]],
+        title: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs  # Ignore extra args like docling_doc
+    ) -> Iterator[DocumentChunk]:
+        """
+        Yield chunks one at a time, for documents too large to chunk in one go.
+
+        Chunks carry no `total_chunks` (it isn't known until the end).
 
-        chunks = []
+        Args:
+            content: Document content, as one string or consecutive blocks
+            title: Document title
+            source: Document source
+            metadata: Additional metadata
+
+        Yields:
+            Document chunks in order
+        """
+        base_metadata = {
+            "title": title,
+            "source": source,
+            "chunk_method": "simple",
+            **(metadata or {})
+        }
+        blocks = [content] if isinstance(content, str) else content
+        yield from self._iter_paragraph_chunks(iter_paragraphs(blocks), base_metadata)
+
+    def _iter_paragraph_chunks(
+        self,
+        paragraphs: Iterable[str],
+        base_metadata: Dict[str, Any]
+    ) -> Iterator[DocumentChunk]:
+        """Pack paragraphs into chunks of up to `chunk_size` characters."""
         current_chunk = ""
         current_pos = 0
         chunk_index = 0
@@ -324,13 +419,13 @@ class SimpleChunker:
             else:
                 # Save current chunk if it exists
                 if current_chunk:
-                    chunks.append(self._create_chunk(
+                    yield self._create_chunk(
                         current_chunk,
                         chunk_index,
                         current_pos,
                         current_pos + len(current_chunk),
                         base_metadata.copy()
-                    ))
+                    )
 
                     current_pos += len(current_chunk)
                     chunk_index += 1
@@ -340,19 +435,13 @@ class SimpleChunker:
 
         # Add final chunk
         if current_chunk:
-            chunks.append(self._create_chunk(
+            yield self._create_chunk(
                 current_chunk,
                 chunk_index,
                 current_pos,
                 current_pos + len(current_chunk),
                 base_metadata.copy()
-            ))
-
-        # Update total chunks in metadata
-        for chunk in chunks:
-            chunk.metadata["total_chunks"] = len(chunks)
-
-        return chunks
+            )
 
     def _create_chunk(
         self,
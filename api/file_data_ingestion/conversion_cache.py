@@ -0,0 +1,164 @@
+"""
+Content-addressed cache of Docling conversions.
+
+A conversion is stored under the SHA-256 of the source file, as one gzipped
+JSON file holding the markdown and the serialized DoclingDocument (or just the
+markdown, for audio transcripts). Re-ingesting, rechunking or retrying an
+unchanged file then skips Docling / Whisper entirely.
+
+The cache lives in its own directory (CONVERSION_CACHE_DIR, default
+`<project root>/.cache/conversions`), never next to the documents, so nothing it
+writes is picked up as a document. Total size is capped by
+CONVERSION_CACHE_MAX_MB (default 2048, 0 disables the cache); the least recently
+used entries are evicted first.
+"""
+
+import os
+import gzip
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored format (or the converter settings it depends on) changes
+CACHE_VERSION = "1"
+
+# Evict down to this fraction of the limit so eviction doesn't run on every write
+_EVICT_TARGET = 0.9
+
+
+def _default_cache_dir() -> Path:
+    # conversion_cache.py -> file_data_ingestion -> api -> project root
+    return Path(__file__).resolve().parents[2] / ".cache" / "conversions"
+
+
+class ConversionCache:
+    """Size-bounded on-disk cache of (markdown, DoclingDocument dict) by file hash."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        """
+        Initialize cache.
+
+        Args:
+            directory: Cache directory (created on first write)
+            max_bytes: Maximum total size of the cached entries
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None  # Computed from disk on first write
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["ConversionCache"]:
+        """Create the cache from CONVERSION_CACHE_DIR / CONVERSION_CACHE_MAX_MB (None if disabled)."""
+        max_mb = float(os.getenv("CONVERSION_CACHE_MAX_MB", "2048"))
+        if max_mb <= 0:
+            return None
+        directory = os.getenv("CONVERSION_CACHE_DIR") or _default_cache_dir()
+        return cls(Path(directory).expanduser(), int(max_mb * 1024 * 1024))
+
+    def _path(self, content_sha256: str, kind: str) -> Path:
+        return self.directory / content_sha256[:2] / f"{content_sha256}-{kind}-v{CACHE_VERSION}.json.gz"
+
+    def get(self, content_sha256: str, kind: str = "docling") -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Look up a conversion.
+
+        Args:
+            content_sha256: Hash of the source file
+            kind: What produced the entry ("docling" or "transcript")
+
+        Returns:
+            Tuple of (markdown, serialized DoclingDocument or None), or None on a miss
+        """
+        path = self._path(content_sha256, kind)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            # mtime doubles as the last-used time for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable conversion cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry["markdown"], entry["document"]
+
+    def put(
+        self,
+        content_sha256: str,
+        markdown: str,
+        document: Optional[Dict[str, Any]] = None,
+        kind: str = "docling"
+    ) -> None:
+        """Store a conversion, evicting old entries if the cache grows past its limit."""
+        path = self._path(content_sha256, kind)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename, so readers never see a partial entry
+            tmp_path = path.with_name(f".{uuid4().hex}.tmp")
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=3) as f:
+                json.dump({"markdown": markdown, "document": document}, f)
+            size = tmp_path.stat().st_size
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to cache conversion {content_sha256}: {e}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _entries(self):
+        return [p for p in self.directory.glob("*/*.json.gz") if p.is_file()]
+
+    def _disk_usage(self) -> int:
+        return sum(p.stat().st_size for p in self._entries())
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is below the target size."""
+        entries = []
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+
+        size = sum(entry[1] for entry in entries)
+        target = self.max_bytes * _EVICT_TARGET
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
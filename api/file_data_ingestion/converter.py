@@ -0,0 +1,295 @@
+"""
+Docling conversion off the event loop.
+
+Docling's layout/table models and the Whisper ASR pipeline are CPU heavy and
+fully synchronous. Calling them from an ingestion coroutine blocks the whole
+event loop (and with it every API request), so conversions run in a
+dedicated process pool. Workers send back the markdown together with the
+DoclingDocument serialized as a plain dict, which the parent rebuilds for
+the HybridChunker.
+
+Pool size is read from DOCLING_PROCESS_WORKERS (default 2). A size of 0 runs
+conversions in a background thread of the current process instead.
+
+Converters are long-lived: each process keeps one DocumentConverter per input
+format and its Whisper model (see transcriber.py), so layout, table and ASR
+models load once per worker instead of once per document. Workers warm the
+formats listed in DOCLING_WARM_FORMATS (default "pdf"; "audio" preloads
+Whisper) when they start, and `warm_conversion_pool()` starts them ahead of
+the first document.
+
+Audio is split into segments that are transcribed in parallel across the pool.
+
+When the caller knows the file's content hash, finished conversions and
+transcripts are kept in the on-disk ConversionCache and unchanged files are
+never converted twice.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .conversion_cache import ConversionCache
+from .transcriber import format_transcript, get_whisper_model, prepare_audio_sync, transcribe_segment_sync
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_configured_workers: Optional[int] = None
+
+# Per-process converter cache: InputFormat (None for "any format") -> (converter, lock)
+_converters: Dict[Any, Tuple[Any, threading.Lock]] = {}
+_converters_lock = threading.Lock()
+
+
+def get_conversion_workers() -> int:
+    """Number of conversion processes (0 means convert in a thread instead)."""
+    if _configured_workers is not None:
+        return _configured_workers
+    return max(0, int(os.getenv("DOCLING_PROCESS_WORKERS", "2")))
+
+
+def configure_conversion_pool(max_workers: int) -> None:
+    """
+    Set the conversion pool size, replacing the current pool if the size changes.
+
+    Args:
+        max_workers: Number of worker processes (0 to convert in a thread)
+    """
+    global _configured_workers
+    if max_workers < 0:
+        raise ValueError("Conversion pool size cannot be negative")
+    if _configured_workers == max_workers:
+        return
+    _configured_workers = max_workers
+    shutdown_conversion_pool()
+
+
+def shutdown_conversion_pool(wait: bool = True) -> None:
+    """Stop the worker processes (they are started again on next use)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait, cancel_futures=True)
+        _executor = None
+
+
+@lru_cache(maxsize=1)
+def get_conversion_cache() -> Optional[ConversionCache]:
+    """Process-wide conversion cache (None when disabled with CONVERSION_CACHE_MAX_MB=0)."""
+    return ConversionCache.from_env()
+
+
+def get_warm_formats() -> List[str]:
+    """Input formats (Docling InputFormat values, e.g. "pdf", "docx", "audio") to preload."""
+    return [f.strip().lower() for f in os.getenv("DOCLING_WARM_FORMATS", "pdf").split(",") if f.strip()]
+
+
+def _init_worker(warm_formats: List[str], threads: int) -> None:
+    """Initializer for conversion processes: configure logging and load the models."""
+    # Split the cores between workers so parallel Whisper/Docling runs don't oversubscribe
+    # them (read by torch when it is first imported)
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    _warm_converters(warm_formats)
+
+
+def _warm_converters(formats: List[str]) -> None:
+    from docling.datamodel.base_models import InputFormat
+
+    for name in formats:
+        try:
+            if name == "audio":
+                get_whisper_model()
+                logger.info("Warmed Whisper model")
+                continue
+            input_format = InputFormat(name)
+            converter, _ = _get_converter(input_format)
+            converter.initialize_pipeline(input_format)
+            logger.info(f"Warmed Docling converter for {name}")
+        except Exception as e:
+            # A failed warm-up only costs the first conversion its load time
+            logger.warning(f"Could not warm Docling converter for {name}: {e}")
+
+
+def _noop() -> None:
+    pass
+
+
+def warm_conversion_pool() -> None:
+    """
+    Start the conversion workers now so their models are loaded before the first document.
+
+    Returns immediately; warming happens in the worker processes (or a background
+    thread when converting in-process).
+    """
+    executor = _get_executor()
+    if executor is None:
+        threading.Thread(
+            target=_warm_converters, args=(get_warm_formats(),), name="docling-warmup", daemon=True
+        ).start()
+        return
+
+    # The pool spawns a process per submitted task while none is idle
+    for _ in range(get_conversion_workers()):
+        executor.submit(_noop)
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    workers = get_conversion_workers()
+    if workers == 0:
+        return None
+
+    if _executor is None:
+        # Spawn rather than fork: the parent has running threads (event loop, DB pool,
+        # tokenizers) that must not be duplicated into the children.
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(get_warm_formats(), max(1, (os.cpu_count() or 1) // workers)),
+        )
+        logger.info(f"Started Docling conversion pool with {workers} processes")
+    return _executor
+
+
+async def _run_in_pool(func, *args):
+    executor = _get_executor()
+    if executor is None:
+        return await asyncio.to_thread(func, *args)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(executor, func, *args)
+    except BrokenProcessPool:
+        # A worker died (typically OOM on a huge document); drop the pool so the
+        # next conversion starts a fresh one instead of failing forever.
+        shutdown_conversion_pool(wait=False)
+        raise
+
+
+# --- Functions executed inside the worker processes ---
+
+def _build_converter(input_format):
+    from docling.document_converter import DocumentConverter
+
+    if input_format is None:
+        return DocumentConverter()
+    return DocumentConverter(allowed_formats=[input_format])
+
+
+def _get_converter(input_format) -> Tuple[Any, threading.Lock]:
+    """
+    Return this process's converter for `input_format`, creating it on first use.
+
+    The lock serializes conversions on the same converter; it is only contended
+    when converting in threads (pool size 0).
+    """
+    entry = _converters.get(input_format)
+    if entry is None:
+        with _converters_lock:
+            entry = _converters.get(input_format)
+            if entry is None:
+                entry = (_build_converter(input_format), threading.Lock())
+                _converters[input_format] = entry
+    return entry
+
+
+def _input_format_for(file_path: str):
+    """Docling InputFormat for a file extension, or None to let Docling detect it."""
+    from docling.datamodel.base_models import FormatToExtensions
+
+    extension = Path(file_path).suffix.lower().lstrip(".")
+    for input_format, extensions in FormatToExtensions.items():
+        if extension in extensions:
+            return input_format
+    return None
+
+
+def convert_document_sync(file_path: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Convert a document with Docling.
+
+    Returns:
+        Tuple of (markdown_content, serialized DoclingDocument)
+    """
+    converter, lock = _get_converter(_input_format_for(file_path))
+    with lock:
+        result = converter.convert(file_path)
+    return result.document.export_to_markdown(), result.document.export_to_dict()
+
+
+# --- Async API used by the ingestion pipeline ---
+
+async def convert_document(file_path: str, content_sha256: Optional[str] = None) -> Tuple[str, Any]:
+    """
+    Convert a document in the conversion pool.
+
+    Args:
+        file_path: Document to convert
+        content_sha256: Hash of the file; enables the conversion cache
+
+    Returns:
+        Tuple of (markdown_content, DoclingDocument)
+    """
+    from docling_core.types.doc import DoclingDocument
+
+    cache = get_conversion_cache() if content_sha256 else None
+    cached = await asyncio.to_thread(cache.get, content_sha256) if cache else None
+
+    if cached is not None:
+        logger.info(f"Conversion cache hit for {os.path.basename(file_path)}")
+        markdown_content, document_dict = cached
+    else:
+        markdown_content, document_dict = await _run_in_pool(convert_document_sync, file_path)
+        if cache:
+            await asyncio.to_thread(cache.put, content_sha256, markdown_content, document_dict)
+
+    return markdown_content, DoclingDocument.model_validate(document_dict)
+
+
+async def transcribe_audio(file_path: str, content_sha256: Optional[str] = None) -> str:
+    """
+    Transcribe an audio file with Whisper in the conversion pool and return markdown.
+
+    The recording is split at quiet points and the segments are transcribed in
+    parallel, then stitched back together in order.
+
+    Args:
+        file_path: Audio file to transcribe
+        content_sha256: Hash of the file; enables the transcript cache
+    """
+    audio_path = Path(file_path).resolve()
+    if not audio_path.exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    cache = get_conversion_cache() if content_sha256 else None
+    cached = await asyncio.to_thread(cache.get, content_sha256, "transcript") if cache else None
+    if cached is not None:
+        logger.info(f"Transcript cache hit for {audio_path.name}")
+        return cached[0]
+
+    samples_path, segments = await _run_in_pool(prepare_audio_sync, str(audio_path))
+    try:
+        logger.info(f"Transcribing {audio_path.name} in {len(segments)} segments")
+        parts = await asyncio.gather(*(
+            _run_in_pool(transcribe_segment_sync, samples_path, start, end)
+            for start, end in segments
+        ))
+    finally:
+        os.unlink(samples_path)
+
+    markdown_content = format_transcript([segment for part in parts for segment in part])
+    if cache:
+        await asyncio.to_thread(cache.put, content_sha256, markdown_content, None, "transcript")
+    return markdown_content
@@ -4,15 +4,19 @@ Document embedding generation for vector search.
 
 import os
 import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 from datetime import datetime
-import json
 
 from openai import RateLimitError, APIError
 from dotenv import load_dotenv
 
 from .chunker import DocumentChunk
+from .embedding_store import EmbeddingStore
 
 # Import flexible providers
 try:
@@ -34,6 +38,85 @@ embedding_client = get_embedding_client()
 EMBEDDING_MODEL = get_embedding_model()
 
 
+@lru_cache(maxsize=1)
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """Process-wide persistent embedding cache (None when disabled with EMBEDDING_CACHE_MAX_MB=0)."""
+    return EmbeddingStore.from_env()
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on concurrent embedding requests.
+
+    The limit grows by one after `limit` requests in a row succeed and is halved
+    on a rate limit error, so dispatch settles just below the provider's rate
+    limit instead of bouncing off it. A burst of rate limit errors from requests
+    that were already in flight counts as one: only a request started after the
+    last decrease can lower the limit again.
+    """
+
+    def __init__(self, max_limit: int):
+        """
+        Initialize limiter.
+
+        Args:
+            max_limit: Upper bound (and starting value) of the limit
+        """
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self.rate_limited = 0
+        self.epoch = 0  # Bumped on every decrease; requests note it when they start
+        self._successes = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # One generator can outlive an event loop (e.g. a process-wide embedder)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._condition
+
+    async def __aenter__(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def record_success(self) -> None:
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_limit:
+            self.limit += 1
+            self._successes = 0
+
+    def record_rate_limit(self, started_epoch: int) -> None:
+        """
+        Record a rate limit error.
+
+        Args:
+            started_epoch: `epoch` when the failed request was sent
+        """
+        self.rate_limited += 1
+        if started_epoch < self.epoch:
+            # Sent under a higher limit that has already been lowered
+            return
+        self._successes = 0
+        self.epoch += 1
+        if self.limit > 1:
+            self.limit = max(1, self.limit // 2)
+            logger.info(f"Rate limited, lowering embedding request concurrency to {self.limit}")
+
+
 class EmbeddingGenerator:
     """Generates embeddings for document chunks."""
     
@@ -42,21 +125,33 @@ class EmbeddingGenerator:
         model: str = EMBEDDING_MODEL,
         batch_size: int = 100,
         max_retries: int = 3,
-        retry_delay: float = 1.0
+        retry_delay: float = 1.0,
+        store: Optional[EmbeddingStore] = None,
+        max_batch_tokens: Optional[int] = None,
+        max_concurrency: Optional[int] = None
     ):
         """
         Initialize embedding generator.
         
         Args:
             model: OpenAI embedding model to use
-            batch_size: Number of texts to process in parallel
+            batch_size: Maximum number of texts per request
             max_retries: Maximum number of retry attempts
             retry_delay: Delay between retries in seconds
+            store: Persistent cache consulted before calling the API
+            max_batch_tokens: Approximate maximum tokens per request, as counted by the
+                chunker (default: EMBEDDING_BATCH_MAX_TOKENS or 200000; the API allows 300000)
+            max_concurrency: Maximum requests in flight (default: EMBEDDING_CONCURRENCY or 4);
+                lowered automatically while the API reports rate limits
         """
         self.model = model
         self.batch_size = batch_size
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.store = store
+        self.memory_cache: Optional["EmbeddingCache"] = None  # Set by create_embedder
+        self.max_batch_tokens = max_batch_tokens or int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "200000"))
+        self.throttle = AdaptiveConcurrency(max_concurrency or int(os.getenv("EMBEDDING_CONCURRENCY", "4")))
         
         # Model-specific configurations
         self.model_configs = {
@@ -84,17 +179,32 @@ class EmbeddingGenerator:
         # Truncate text if too long
         if len(text) > self.config["max_tokens"] * 4:  # Rough token estimation
             text = text[:self.config["max_tokens"] * 4]
-        
+
+        if self.store is not None:
+            cached = await asyncio.to_thread(self.store.get_many, self.model, self.config["dimensions"], [text])
+            if cached[0] is not None:
+                return cached[0]
+
+        embedding = await self._request_embedding(text)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.put_many, self.model, self.config["dimensions"], [(text, embedding)])
+        return embedding
+
+    async def _request_embedding(self, text: str) -> List[float]:
+        """Call the embedding API for one text, retrying transient failures."""
         for attempt in range(self.max_retries):
+            epoch = self.throttle.epoch
             try:
                 response = await embedding_client.embeddings.create(
                     model=self.model,
                     input=text
                 )
+                self.throttle.record_success()
                 
                 return response.data[0].embedding
                 
             except RateLimitError as e:
+                self.throttle.record_rate_limit(epoch)
                 if attempt == self.max_retries - 1:
                     raise
                 
@@ -140,17 +250,47 @@ class EmbeddingGenerator:
                 text = text[:self.config["max_tokens"] * 4]
             
             processed_texts.append(text)
-        
+
+        if self.store is None:
+            return await self._request_embeddings_batch(processed_texts)
+
+        # Only texts missing from the cache go to the API, each distinct text once
+        dimensions = self.config["dimensions"]
+        embeddings = await asyncio.to_thread(self.store.get_many, self.model, dimensions, processed_texts)
+        missing: Dict[str, List[int]] = {}
+        for i, (text, embedding) in enumerate(zip(processed_texts, embeddings)):
+            if embedding is None:
+                missing.setdefault(text, []).append(i)
+        if not missing:
+            return embeddings
+
+        texts_to_embed = list(missing)
+        new_embeddings = await self._request_embeddings_batch(texts_to_embed)
+        for text, embedding in zip(texts_to_embed, new_embeddings):
+            for i in missing[text]:
+                embeddings[i] = embedding
+
+        # Zero vectors are failed embeddings (see _process_individually), never cache them
+        await asyncio.to_thread(self.store.put_many, self.model, dimensions, [
+            (text, embedding) for text, embedding in zip(texts_to_embed, new_embeddings) if any(embedding)
+        ])
+        return embeddings
+
+    async def _request_embeddings_batch(self, processed_texts: List[str]) -> List[List[float]]:
+        """Call the embedding API for a batch of texts, retrying transient failures."""
         for attempt in range(self.max_retries):
+            epoch = self.throttle.epoch
             try:
                 response = await embedding_client.embeddings.create(
                     model=self.model,
                     input=processed_texts
                 )
+                self.throttle.record_success()
                 
                 return [data.embedding for data in response.data]
                 
             except RateLimitError as e:
+                self.throttle.record_rate_limit(epoch)
                 if attempt == self.max_retries - 1:
                     raise
                 
@@ -205,6 +345,30 @@ class EmbeddingGenerator:
         
         return embeddings
     
+    def _pack_batches(self, chunks: List[DocumentChunk]) -> List[List[DocumentChunk]]:
+        """
+        Split chunks, in order, into requests of at most `batch_size` texts and
+        about `max_batch_tokens` tokens.
+
+        Token counts are the chunks' own: the chunker's tokenizer (not the
+        embedding model's) or about 4 characters per token. The budget is
+        therefore approximate; the default leaves a third of the API limit as
+        headroom for the difference.
+        """
+        batches: List[List[DocumentChunk]] = []
+        batch: List[DocumentChunk] = []
+        batch_tokens = 0
+        for chunk in chunks:
+            tokens = chunk.token_count
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > self.max_batch_tokens):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(chunk)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
     async def embed_chunks(
         self,
         chunks: List[DocumentChunk],
@@ -212,30 +376,33 @@ class EmbeddingGenerator:
     ) -> List[DocumentChunk]:
         """
         Generate embeddings for document chunks.
+
+        Chunks are packed into requests by estimated token count, and several
+        requests are in flight at once under the adaptive concurrency limit.
         
         Args:
             chunks: List of document chunks
             progress_callback: Optional callback for progress updates
         
         Returns:
-            Chunks with embeddings added
+            Chunks with embeddings added, in the order given
         """
         if not chunks:
             return chunks
         
-        logger.info(f"Generating embeddings for {len(chunks)} chunks")
-        
-        # Process chunks in batches
-        embedded_chunks = []
-        total_batches = (len(chunks) + self.batch_size - 1) // self.batch_size
-        
-        for i in range(0, len(chunks), self.batch_size):
-            batch_chunks = chunks[i:i + self.batch_size]
-            batch_texts = [chunk.content for chunk in batch_chunks]
-            
+        batches = self._pack_batches(chunks)
+        total_batches = len(batches)
+        logger.info(f"Generating embeddings for {len(chunks)} chunks in {total_batches} requests")
+
+        results: List[List[DocumentChunk]] = [[] for _ in batches]
+        completed = 0
+
+        async def embed_batch(batch_index: int, batch_chunks: List[DocumentChunk]):
+            nonlocal completed
             try:
-                # Generate embeddings for this batch
-                embeddings = await self.generate_embeddings_batch(batch_texts)
+                async with self.throttle:
+                    # Generate embeddings for this batch
+                    embeddings = await self.generate_embeddings_batch([chunk.content for chunk in batch_chunks])
                 
                 # Add embeddings to chunks
                 for chunk, embedding in zip(batch_chunks, embeddings):
@@ -255,17 +422,10 @@ class EmbeddingGenerator:
                     
                     # Add embedding as a separate attribute
                     embedded_chunk.embedding = embedding
-                    embedded_chunks.append(embedded_chunk)
-                
-                # Progress update
-                current_batch = (i // self.batch_size) + 1
-                if progress_callback:
-                    progress_callback(current_batch, total_batches)
-                
-                logger.info(f"Processed batch {current_batch}/{total_batches}")
+                    results[batch_index].append(embedded_chunk)
                 
             except Exception as e:
-                logger.error(f"Failed to process batch {i//self.batch_size + 1}: {e}")
+                logger.error(f"Failed to process batch {batch_index + 1}: {e}")
                 
                 # Add chunks without embeddings as fallback
                 for chunk in batch_chunks:
@@ -274,8 +434,17 @@ class EmbeddingGenerator:
                         "embedding_generated_at": datetime.now().isoformat()
                     })
                     chunk.embedding = [0.0] * self.config["dimensions"]
-                    embedded_chunks.append(chunk)
-        
+                    results[batch_index].append(chunk)
+
+            # Progress update
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, total_batches)
+            logger.info(f"Processed batch {completed}/{total_batches}")
+
+        await asyncio.gather(*(embed_batch(i, batch) for i, batch in enumerate(batches)))
+
+        embedded_chunks = [chunk for batch in results for chunk in batch]
         logger.info(f"Generated embeddings for {len(embedded_chunks)} chunks")
         return embedded_chunks
     
@@ -291,6 +460,13 @@ class EmbeddingGenerator:
         """
         return await self.generate_embedding(query)
     
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the in-memory cache and the persistent store (None if unused)."""
+        return {
+            "memory": self.memory_cache.stats() if self.memory_cache is not None else None,
+            "store": self.store.stats() if self.store is not None else None,
+        }
+
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings for this model."""
         return self.config["dimensions"]
@@ -298,39 +474,76 @@ class EmbeddingGenerator:
 
 # Cache for embeddings
 class EmbeddingCache:
-    """Simple in-memory cache for embeddings."""
+    """
+    In-memory LRU cache of embeddings with a capacity in bytes.
+
+    Entries live in an OrderedDict in least- to most-recently used order, so
+    lookups, inserts and evictions are all O(1). Vectors are stored as packed
+    float32 (`array('f')`, 4 bytes per dimension) rather than lists of Python
+    floats; `bytes` counts the stored vectors.
+    """
     
-    def __init__(self, max_size: int = 1000):
-        """Initialize cache."""
-        self.cache: Dict[str, List[float]] = {}
-        self.access_times: Dict[str, datetime] = {}
-        self.max_size = max_size
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Maximum total size of the stored vectors
+        """
+        self.cache: "OrderedDict[bytes, array]" = OrderedDict()
+        self.max_bytes = max_bytes
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
     
     def get(self, text: str) -> Optional[List[float]]:
         """Get embedding from cache."""
         text_hash = self._hash_text(text)
-        if text_hash in self.cache:
-            self.access_times[text_hash] = datetime.now()
-            return self.cache[text_hash]
-        return None
+        vector = self.cache.get(text_hash)
+        if vector is None:
+            self.misses += 1
+            return None
+        self.cache.move_to_end(text_hash)
+        self.hits += 1
+        return vector.tolist()
     
     def put(self, text: str, embedding: List[float]):
-        """Store embedding in cache."""
+        """Store embedding in cache, evicting the least recently used entries if it is full."""
+        vector = array("f", embedding)
+        size = len(vector) * vector.itemsize
+        if size > self.max_bytes:
+            return
+
         text_hash = self._hash_text(text)
-        
-        # Evict oldest entries if cache is full
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-            del self.cache[oldest_key]
-            del self.access_times[oldest_key]
-        
-        self.cache[text_hash] = embedding
-        self.access_times[text_hash] = datetime.now()
+        previous = self.cache.pop(text_hash, None)
+        if previous is not None:
+            self.bytes -= len(previous) * previous.itemsize
+
+        while self.cache and self.bytes + size > self.max_bytes:
+            _, evicted = self.cache.popitem(last=False)
+            self.bytes -= len(evicted) * evicted.itemsize
+            self.evictions += 1
+
+        self.cache[text_hash] = vector
+        self.bytes += size
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
     
-    def _hash_text(self, text: str) -> str:
+    def _hash_text(self, text: str) -> bytes:
         """Generate hash for text."""
-        import hashlib
-        return hashlib.md5(text.encode()).hexdigest()
+        return hashlib.md5(text.encode()).digest()
 
 
 # Factory function
@@ -344,17 +557,21 @@ def create_embedder(
     
     Args:
         model: Embedding model to use
-        use_cache: Whether to use caching
+        use_cache: Whether to use caching (in memory for single texts, and the
+            persistent embedding store for single texts and batches)
         **kwargs: Additional arguments for EmbeddingGenerator
     
     Returns:
         EmbeddingGenerator instance
     """
+    if use_cache:
+        kwargs.setdefault("store", get_embedding_store())
     embedder = EmbeddingGenerator(model=model, **kwargs)
     
     if use_cache:
         # Add caching capability
-        cache = EmbeddingCache()
+        cache = EmbeddingCache(int(float(os.getenv("EMBEDDING_MEMORY_CACHE_MB", "64")) * 1024 * 1024))
+        embedder.memory_cache = cache
         original_generate = embedder.generate_embedding
         
         async def cached_generate(text: str) -> List[float]:
@@ -0,0 +1,249 @@
+"""
+Persistent cache of embeddings on local disk.
+
+Embeddings are stored in a SQLite database (WAL mode, so ingestion worker
+processes and the API can share it) under the key
+(model, dimensions, SHA-256 of the embedded text). Both the batch path used
+for chunks and the single-text path used for queries look texts up here first
+and only send the misses to the embedding API, so re-ingesting or rechunking
+unchanged text costs almost nothing.
+
+The database lives in EMBEDDING_CACHE_DIR (default
+`<project root>/.cache/embeddings`). Its size is capped by
+EMBEDDING_CACHE_MAX_MB (default 1024, 0 disables the cache); the least
+recently used embeddings are evicted first.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of the limit so eviction doesn't run on every write
+_EVICT_TARGET = 0.9
+
+# Hits refresh their last-used time at most this often (seconds), to keep reads cheap
+_TOUCH_INTERVAL = 3600
+
+# Keys per SELECT (well below SQLite's bound parameter limit)
+_LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    text_sha256 BLOB NOT NULL,
+    embedding BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, dimensions, text_sha256)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+
+def _default_cache_dir() -> Path:
+    # embedding_store.py -> file_data_ingestion -> api -> project root
+    return Path(__file__).resolve().parents[2] / ".cache" / "embeddings"
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def _pack(embedding: Sequence[float]) -> bytes:
+    floats = array("f", embedding)
+    if sys.byteorder == "big":
+        floats.byteswap()
+    return floats.tobytes()
+
+
+def _unpack(data: bytes) -> List[float]:
+    floats = array("f")
+    floats.frombytes(data)
+    if sys.byteorder == "big":
+        floats.byteswap()
+    return floats.tolist()
+
+
+class EmbeddingStore:
+    """Size-bounded SQLite cache of float32 embeddings by (model, dimensions, text hash)."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        """
+        Initialize store.
+
+        Args:
+            directory: Directory of the database (created on first use)
+            max_bytes: Maximum total size of the stored embeddings
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / "embeddings.sqlite3"
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._size: Optional[int] = None  # Computed from the database on first write
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["EmbeddingStore"]:
+        """Create the store from EMBEDDING_CACHE_DIR / EMBEDDING_CACHE_MAX_MB (None if disabled)."""
+        max_mb = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024"))
+        if max_mb <= 0:
+            return None
+        directory = os.getenv("EMBEDDING_CACHE_DIR") or _default_cache_dir()
+        return cls(Path(directory).expanduser(), int(max_mb * 1024 * 1024))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, model: str, dimensions: int, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings.
+
+        Args:
+            model: Embedding model
+            dimensions: Embedding dimensions
+            texts: Texts exactly as they are sent to the model
+
+        Returns:
+            The embedding of each text, or None where it isn't cached
+        """
+        keys = [_text_key(text) for text in texts]
+        found: Dict[bytes, bytes] = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                unique = list(dict.fromkeys(keys))
+                for start in range(0, len(unique), _LOOKUP_BATCH):
+                    batch = unique[start:start + _LOOKUP_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    found.update(conn.execute(
+                        f"""
+                        SELECT text_sha256, embedding FROM embeddings
+                        WHERE model = ? AND dimensions = ? AND text_sha256 IN ({placeholders})
+                        """,
+                        (model, dimensions, *batch)
+                    ).fetchall())
+
+                hit_keys = list(found)
+                now = int(time.time())
+                for start in range(0, len(hit_keys), _LOOKUP_BATCH):
+                    batch = hit_keys[start:start + _LOOKUP_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    conn.execute(
+                        f"""
+                        UPDATE embeddings SET last_used = ?
+                        WHERE model = ? AND dimensions = ? AND text_sha256 IN ({placeholders})
+                          AND last_used < ?
+                        """,
+                        (now, model, dimensions, *batch, now - _TOUCH_INTERVAL)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            self.misses += len(texts)
+            return [None] * len(texts)
+
+        embeddings = [_unpack(found[key]) if key in found else None for key in keys]
+        hits = sum(1 for embedding in embeddings if embedding is not None)
+        self.hits += hits
+        self.misses += len(texts) - hits
+        return embeddings
+
+    def put_many(self, model: str, dimensions: int, items: List[Tuple[str, Sequence[float]]]) -> None:
+        """Store (text, embedding) pairs, evicting old embeddings if the cache grows past its limit."""
+        if not items:
+            return
+        now = int(time.time())
+        rows = [(model, dimensions, _text_key(text), _pack(embedding), now) for text, embedding in items]
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("BEGIN")
+                try:
+                    conn.executemany(
+                        """
+                        INSERT OR REPLACE INTO embeddings (model, dimensions, text_sha256, embedding, last_used)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        rows
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+
+                if self._size is None:
+                    self._size = self._stored_bytes(conn)
+                else:
+                    self._size += sum(len(row[3]) for row in rows)
+                if self._size > self.max_bytes:
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to cache {len(items)} embeddings: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(length(embedding)), 0) FROM embeddings").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Delete least recently used embeddings until the cache is below the target size."""
+        # Other processes write to the same database; start from its actual size
+        size = self._stored_bytes(conn)
+        target = self.max_bytes * _EVICT_TARGET
+        victims = []
+        cursor = conn.execute(
+            "SELECT model, dimensions, text_sha256, length(embedding) FROM embeddings ORDER BY last_used"
+        )
+        for model, dimensions, key, length in cursor:
+            if size <= target:
+                break
+            victims.append((model, dimensions, key))
+            size -= length
+        cursor.close()
+
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND dimensions = ? AND text_sha256 = ?",
+                victims
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.evictions += len(victims)
+        self._size = size
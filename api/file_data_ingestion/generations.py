@@ -0,0 +1,345 @@
+"""
+Blue/green rebuilds of the document corpus.
+
+A full rebuild used to delete every document and chunk and then re-ingest, so
+searches returned nothing until it finished and the deletes bloated the tables
+and the vector index. Instead, a rebuild is written into a shadow generation:
+
+1. `prepare_shadow` creates `documents_next`, `chunks_next` and
+   `ingestion_manifest_next` with the columns, defaults, checks, primary keys,
+   triggers, grants and row-level security policies of the live tables, but
+   without their secondary (e.g. vector) indexes, so loading stays fast.
+2. The pipeline writes the new corpus into those tables while queries keep
+   using the live ones.
+3. `publish_shadow` adds the foreign keys and builds the secondary indexes on
+   the loaded tables, analyzes them, then swaps them with the live tables by
+   renaming all of them in one short transaction. The previous generation is
+   emptied with TRUNCATE and dropped.
+
+`match_chunks` and the other queries refer to the tables by name, so they pick
+up the new generation as soon as the swap commits.
+
+Objects that bind to a table rather than its name (views, foreign keys from
+other tables) would keep pointing at the old generation, so if any exist
+`rebuild_blockers` reports them and the caller falls back to deleting in place.
+Documents written to the live tables by other clients during a rebuild are not
+part of the new generation.
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CorpusTables:
+    """Names of the tables that make up one generation of the corpus."""
+    documents: str = "documents"
+    chunks: str = "chunks"
+    manifest: str = "ingestion_manifest"
+
+    def names(self) -> List[str]:
+        return [self.documents, self.chunks, self.manifest]
+
+
+LIVE_TABLES = CorpusTables()
+
+_SHADOW_SUFFIX = "_next"
+_RETIRED_SUFFIX = "_retired"
+
+
+def _suffixed(name: str, suffix: str) -> str:
+    # Postgres truncates identifiers to 63 bytes
+    return name[:63 - len(suffix)] + suffix
+
+
+SHADOW_TABLES = CorpusTables(*(_suffixed(name, _SHADOW_SUFFIX) for name in LIVE_TABLES.names()))
+RETIRED_TABLES = CorpusTables(*(_suffixed(name, _RETIRED_SUFFIX) for name in LIVE_TABLES.names()))
+
+
+def _ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _retarget(sql: str, live: str, shadow: str) -> str:
+    """Point a definition at the shadow table (names may be schema-qualified)."""
+    return re.sub(rf"(?<![\w.])(?:[\w\"]+\.)?{re.escape(live)}(?![\w\"])", _ident(shadow), sql)
+
+
+async def _table_exists(conn, name: str) -> bool:
+    return await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name)
+
+
+async def _indexes(conn, table: str) -> List[Dict[str, object]]:
+    """Indexes of a table: name, definition and whether a constraint owns them."""
+    rows = await conn.fetch(
+        """
+        SELECT c.relname AS name,
+               pg_get_indexdef(i.indexrelid) AS definition,
+               EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = i.indexrelid) AS constraint_index
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = to_regclass($1)
+        ORDER BY c.relname
+        """,
+        table
+    )
+    return [dict(row) for row in rows]
+
+
+async def _constraints(conn, table: str, kinds: str) -> List[Dict[str, object]]:
+    rows = await conn.fetch(
+        """
+        SELECT conname AS name, contype AS kind, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE conrelid = to_regclass($1) AND contype = ANY($2::"char"[])
+        ORDER BY conname
+        """,
+        table,
+        list(kinds)
+    )
+    return [dict(row) for row in rows]
+
+
+async def rebuild_blockers(conn, tables: CorpusTables = LIVE_TABLES) -> List[str]:
+    """Objects outside the corpus tables that would keep pointing at the old generation."""
+    rows = await conn.fetch(
+        """
+        SELECT DISTINCT format('view %s depends on %s', v.oid::regclass, t.oid::regclass) AS blocker
+        FROM pg_depend d
+        JOIN pg_rewrite r ON r.oid = d.objid
+        JOIN pg_class v ON v.oid = r.ev_class
+        JOIN pg_class t ON t.oid = d.refobjid
+        WHERE d.classid = 'pg_rewrite'::regclass
+          AND t.oid = ANY(SELECT to_regclass(n) FROM unnest($1::text[]) n)
+          AND v.oid <> t.oid
+        UNION
+        SELECT format('foreign key %s on %s references %s', c.conname, c.conrelid::regclass, c.confrelid::regclass)
+        FROM pg_constraint c
+        WHERE c.contype = 'f'
+          AND c.confrelid = ANY(SELECT to_regclass(n) FROM unnest($1::text[]) n)
+          AND c.conrelid <> ALL(SELECT to_regclass(n) FROM unnest($1::text[]) n)
+        """,
+        tables.names()
+    )
+    return [row["blocker"] for row in rows]
+
+
+async def prepare_shadow(conn, reuse: bool = False) -> None:
+    """
+    Create empty shadow tables shaped like the live ones.
+
+    Args:
+        conn: Database connection
+        reuse: Keep existing shadow tables (resuming an interrupted rebuild)
+    """
+    if reuse and all([await _table_exists(conn, name) for name in SHADOW_TABLES.names()]):
+        logger.info("Resuming rebuild into the existing shadow tables")
+        return
+
+    async with conn.transaction():
+        await conn.execute(
+            "DROP TABLE IF EXISTS " + ", ".join(_ident(name) for name in SHADOW_TABLES.names())
+        )
+        for live, shadow in zip(LIVE_TABLES.names(), SHADOW_TABLES.names()):
+            # Columns, defaults, CHECK / NOT NULL constraints, identity, storage and comments
+            await conn.execute(
+                f"CREATE TABLE {_ident(shadow)} (LIKE {_ident(live)} INCLUDING ALL EXCLUDING INDEXES)"
+            )
+
+            # Primary keys are needed while loading (the manifest is upserted on its key)
+            for constraint in await _constraints(conn, live, "p"):
+                await conn.execute(
+                    f"ALTER TABLE {_ident(shadow)} ADD CONSTRAINT "
+                    f"{_ident(_suffixed(constraint['name'], _SHADOW_SUFFIX))} {constraint['definition']}"
+                )
+
+            # Triggers must fire for the loaded rows just as they would on the live table
+            triggers = await conn.fetch(
+                """
+                SELECT pg_get_triggerdef(oid) AS definition
+                FROM pg_trigger
+                WHERE tgrelid = to_regclass($1) AND NOT tgisinternal
+                """,
+                live
+            )
+            for trigger in triggers:
+                await conn.execute(_retarget(trigger["definition"], live, shadow))
+
+            await _copy_access(conn, live, shadow)
+
+
+async def _copy_access(conn, live: str, shadow: str) -> None:
+    """Grants and row-level security of the live table."""
+    grants = await conn.fetch(
+        """
+        SELECT coalesce(quote_ident(r.rolname), 'PUBLIC') AS grantee,
+               a.privilege_type,
+               a.is_grantable
+        FROM pg_class c
+        CROSS JOIN LATERAL aclexplode(c.relacl) a
+        LEFT JOIN pg_roles r ON r.oid = a.grantee
+        WHERE c.oid = to_regclass($1) AND a.grantee <> c.relowner
+        """,
+        live
+    )
+    for grant in grants:
+        await conn.execute(
+            f"GRANT {grant['privilege_type']} ON {_ident(shadow)} TO {grant['grantee']}"
+            + (" WITH GRANT OPTION" if grant["is_grantable"] else "")
+        )
+
+    security = await conn.fetchrow(
+        "SELECT relrowsecurity, relforcerowsecurity FROM pg_class WHERE oid = to_regclass($1)",
+        live
+    )
+    if security["relrowsecurity"]:
+        await conn.execute(f"ALTER TABLE {_ident(shadow)} ENABLE ROW LEVEL SECURITY")
+    if security["relforcerowsecurity"]:
+        await conn.execute(f"ALTER TABLE {_ident(shadow)} FORCE ROW LEVEL SECURITY")
+
+    policies = await conn.fetch(
+        """
+        SELECT p.polname AS name,
+               p.polpermissive AS permissive,
+               CASE p.polcmd WHEN 'r' THEN 'SELECT' WHEN 'a' THEN 'INSERT' WHEN 'w' THEN 'UPDATE'
+                             WHEN 'd' THEN 'DELETE' ELSE 'ALL' END AS command,
+               ARRAY(
+                   SELECT coalesce(quote_ident(r.rolname), 'PUBLIC')
+                   FROM unnest(p.polroles) role
+                   LEFT JOIN pg_roles r ON r.oid = role
+               ) AS roles,
+               pg_get_expr(p.polqual, p.polrelid) AS using_expr,
+               pg_get_expr(p.polwithcheck, p.polrelid) AS check_expr
+        FROM pg_policy p
+        WHERE p.polrelid = to_regclass($1)
+        """,
+        live
+    )
+    for policy in policies:
+        sql = (
+            f"CREATE POLICY {_ident(policy['name'])} ON {_ident(shadow)}"
+            f" AS {'PERMISSIVE' if policy['permissive'] else 'RESTRICTIVE'}"
+            f" FOR {policy['command']} TO {', '.join(policy['roles'])}"
+        )
+        if policy["using_expr"]:
+            sql += f" USING ({policy['using_expr']})"
+        if policy["check_expr"]:
+            sql += f" WITH CHECK ({policy['check_expr']})"
+        await conn.execute(sql)
+
+
+async def count_shadow_documents(conn) -> int:
+    return await conn.fetchval(f"SELECT count(*) FROM {_ident(SHADOW_TABLES.documents)}")
+
+
+async def publish_shadow(conn) -> None:
+    """
+    Index the loaded shadow tables and swap them in as the live generation.
+
+    Index builds run before the swap, while the shadow tables are invisible to
+    queries; the swap itself only renames tables and indexes. The previous
+    generation is truncated and dropped afterwards.
+    """
+    live_tables = LIVE_TABLES.names()
+    shadow_of = dict(zip(live_tables, SHADOW_TABLES.names()))
+
+    # Everything built here is skipped if it already exists, so a publish that was
+    # interrupted can simply be run again
+    async with conn.transaction():
+        maintenance_work_mem = os.getenv("REBUILD_MAINTENANCE_WORK_MEM")
+        if maintenance_work_mem:
+            await conn.execute(f"SET LOCAL maintenance_work_mem = '{maintenance_work_mem}'")
+
+        for live in live_tables:
+            shadow = shadow_of[live]
+            existing = {c["name"] for c in await _constraints(conn, shadow, "f")}
+
+            # Foreign keys between the corpus tables point at the shadow generation
+            for constraint in await _constraints(conn, live, "f"):
+                name = _suffixed(constraint["name"], _SHADOW_SUFFIX)
+                if name in existing:
+                    continue
+                definition = constraint["definition"]
+                for other in live_tables:
+                    definition = _retarget(definition, other, shadow_of[other])
+                await conn.execute(f"ALTER TABLE {_ident(shadow)} ADD CONSTRAINT {_ident(name)} {definition}")
+
+            for index in await _indexes(conn, live):
+                if index["constraint_index"]:
+                    continue
+                definition = re.sub(
+                    r"^CREATE (UNIQUE )?INDEX \S+ ON ",
+                    lambda m: (
+                        f"CREATE {m.group(1) or ''}INDEX IF NOT EXISTS "
+                        f"{_ident(_suffixed(index['name'], _SHADOW_SUFFIX))} ON "
+                    ),
+                    index["definition"],
+                    count=1
+                )
+                logger.info(f"Building index {index['name']} on the new generation")
+                await conn.execute(_retarget(definition, live, shadow))
+
+            await conn.execute(f"ANALYZE {_ident(shadow)}")
+
+    retired_of = dict(zip(live_tables, RETIRED_TABLES.names()))
+    await conn.execute(
+        "DROP TABLE IF EXISTS " + ", ".join(_ident(name) for name in RETIRED_TABLES.names())
+    )
+
+    async with conn.transaction():
+        # Fail rather than queue every query behind a swap that can't get its locks
+        await conn.execute(f"SET LOCAL lock_timeout = '{os.getenv('REBUILD_LOCK_TIMEOUT', '30s')}'")
+        await conn.execute(
+            "LOCK TABLE " + ", ".join(_ident(name) for name in live_tables) + " IN ACCESS EXCLUSIVE MODE"
+        )
+
+        for live in live_tables:
+            for index in await _indexes(conn, live):
+                await conn.execute(
+                    f"ALTER INDEX {_ident(index['name'])} RENAME TO {_ident(_suffixed(index['name'], _RETIRED_SUFFIX))}"
+                )
+            await conn.execute(f"ALTER TABLE {_ident(live)} RENAME TO {_ident(retired_of[live])}")
+
+        for live in live_tables:
+            shadow = shadow_of[live]
+            await conn.execute(f"ALTER TABLE {_ident(shadow)} RENAME TO {_ident(live)}")
+            for index in await _indexes(conn, live):
+                if index["name"].endswith(_SHADOW_SUFFIX):
+                    await conn.execute(
+                        f"ALTER INDEX {_ident(index['name'])} RENAME TO {_ident(index['name'][:-len(_SHADOW_SUFFIX)])}"
+                    )
+            for constraint in await _constraints(conn, live, "f"):
+                if constraint["name"].endswith(_SHADOW_SUFFIX):
+                    await conn.execute(
+                        f"ALTER TABLE {_ident(live)} RENAME CONSTRAINT {_ident(constraint['name'])} "
+                        f"TO {_ident(constraint['name'][:-len(_SHADOW_SUFFIX)])}"
+                    )
+
+            # Serial columns of the new tables share the old sequences; move their ownership
+            # so dropping the old generation keeps them
+            owned = await conn.fetch(
+                """
+                SELECT s.oid::regclass::text AS sequence, a.attname AS column_name
+                FROM pg_depend d
+                JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+                JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+                WHERE d.refobjid = to_regclass($1) AND d.deptype = 'a'
+                """,
+                retired_of[live]
+            )
+            for row in owned:
+                await conn.execute(
+                    f"ALTER SEQUENCE {row['sequence']} OWNED BY {_ident(live)}.{_ident(row['column_name'])}"
+                )
+
+    logger.info("Published the new corpus generation")
+
+    # TRUNCATE releases the old generation's storage at once, without scanning it
+    retired = ", ".join(_ident(name) for name in RETIRED_TABLES.names())
+    await conn.execute(f"TRUNCATE {retired}")
+    await conn.execute(f"DROP TABLE {retired}")
@@ -3,12 +3,15 @@ Main ingestion script for processing markdown documents into vector DB and knowl
 """
 
 import os
+import time
 import asyncio
 import logging
+import itertools
 import json
-import glob
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterable, AsyncIterator, Iterator, Tuple, Union
 from datetime import datetime
 import argparse
 
@@ -18,22 +21,49 @@ from openai import AsyncOpenAI
 
 from .chunker import ChunkingConfig, create_chunker, DocumentChunk
 from .embedder import create_embedder
+from .converter import configure_conversion_pool, convert_document, transcribe_audio, warm_conversion_pool
+from .manifest import (
+    FileState,
+    SyncPlan,
+    delete_documents,
+    ensure_manifest_table,
+    load_manifest,
+    record_file,
+    refresh_stats,
+    stat_file,
+)
+from .scanner import AUDIO_EXTENSIONS, DOCLING_EXTENSIONS, iterate_in_thread, scan_documents
+from .titles import WEAK_TITLE_SOURCES, TitleEnricher, extract_title
+from .checkpoints import RunCheckpoint
+from .generations import (
+    LIVE_TABLES,
+    SHADOW_TABLES,
+    CorpusTables,
+    count_shadow_documents,
+    prepare_shadow,
+    publish_shadow,
+    rebuild_blockers,
+)
+from .profiling import IngestionProfiler
+from .sharding import ingest_in_processes
+from .text_reader import TextProfile, iter_text_file, parse_frontmatter, profile_text, read_text_file
 
 # Import utilities
 try:
-    from ..utils.db_utils import initialize_database, close_database, db_pool
-    from ..utils.models import IngestionConfig, IngestionResult
+    from ..utils.db_utils import initialize_database, close_database, copy_chunk_records, copy_document_stream, db_pool
+    from ..utils.models import IngestionConfig, IngestionResult, IngestionSummary, StageTimings
+    from ..utils.hashing import sha256_file
 except ImportError:
     # For direct execution or testing
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from utils.db_utils import initialize_database, close_database, db_pool
-    from utils.models import IngestionConfig, IngestionResult
+    from utils.db_utils import initialize_database, close_database, copy_chunk_records, copy_document_stream, db_pool
+    from utils.models import IngestionConfig, IngestionResult, IngestionSummary, StageTimings
+    from utils.hashing import sha256_file
 
 # Load environment variables
 load_dotenv()
-openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 logger = logging.getLogger(__name__)
 
@@ -62,30 +92,75 @@ def _resolve_documents_folder(documents_folder: str) -> str:
 
     return str(_project_root() / folder_path)
 
-async def create_title(content: str) -> Dict[str, str]:
-    """Create a short document title """
-    system_prompt = """You are a helpful assistant. 
-    You can generate relevant a short title from a given document snippet. 
-    You always return only a JSON object with exactly a single key: 'title', whose value should be the generated document title.
-    The short title should always be a short word phrase summarizing the overall topic of the document.
+@contextmanager
+def _timed(timings: StageTimings, stage: str):
+    """Add the wall-clock time spent in the block to `timings.<stage>` (milliseconds)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, stage, getattr(timings, stage) + (time.perf_counter() - start) * 1000)
+
+
+def summarize_results(results: List[IngestionResult], total_time_ms: float) -> IngestionSummary:
     """
-    
-    # Prepare the prompt from joining 4 chunks
-    prompt = content
+    Aggregate per-document results into run-level metrics.
 
-    try:
-        response = await openai_client.chat.completions.create(
-            model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Based on the following text, generate a short meaningful title for it:\n\n{prompt}"}
-            ],
-            response_format={ "type": "json_object" }
+    Args:
+        results: Results returned by the pipeline
+        total_time_ms: Wall-clock duration of the run
+
+    Returns:
+        Summary with totals, summed stage timings and overall chunk throughput
+    """
+    summary = IngestionSummary(documents=len(results), total_time_ms=total_time_ms)
+    for result in results:
+        summary.chunks_created += result.chunks_created
+        summary.chunks_embedded += result.chunks_embedded
+        summary.errors += len(result.errors)
+        summary.bytes_read += result.bytes_read
+        summary.tokens_embedded += result.tokens_embedded
+        summary.stage_timings.add(result.stage_timings)
+
+    if total_time_ms > 0:
+        summary.chunks_per_second = summary.chunks_created / (total_time_ms / 1000)
+    return summary
+
+
+@dataclass
+class _DocumentWork:
+    """A document moving through the ingestion stages, with everything produced so far."""
+    index: int
+    source_path: str
+    start_time: datetime = field(default_factory=datetime.now)
+    timings: StageTimings = field(default_factory=StageTimings)
+    content: Optional[str] = ""  # None for text files too large to hold in memory
+    docling_doc: Optional[Any] = None
+    title: str = ""
+    title_source: str = ""
+    source: str = ""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    bytes_read: int = 0
+    text_profile: Optional[TextProfile] = None  # Counts and head of the content
+    chunks: List[DocumentChunk] = field(default_factory=list)
+    embedded: bool = False  # Chunks already carry embeddings (restored from a checkpoint)
+    streaming: bool = False  # Chunked, embedded and saved in batches by the save stage
+    file_state: Optional[FileState] = None  # Manifest entry written together with the document
+    replaces_document_id: Optional[str] = None  # Previous version of the file, deleted on save
+    result: Optional[IngestionResult] = None  # Set once the document is saved or has failed
+
+    def fail(self, error: str, title: Optional[str] = None) -> None:
+        """Finish the document with an error result; later stages are skipped."""
+        self.result = IngestionResult(
+            document_id="",
+            title=title or os.path.basename(self.source_path),
+            source=self.source_path,
+            chunks_created=0,
+            processing_time_ms=(datetime.now() - self.start_time).total_seconds() * 1000,
+            stage_timings=self.timings,
+            bytes_read=self.bytes_read,
+            errors=[error]
         )
-        return json.loads(response.choices[0].message.content)
-    except Exception as e:
-        print(f"Error creating title: {e}")
-        return {"title": "Error processing title", "summary": "Error processing summary"}
 
 
 class DocumentIngestionPipeline:
@@ -94,18 +169,34 @@ class DocumentIngestionPipeline:
     def __init__(
         self,
         config: IngestionConfig,
-        clean_before_ingest: bool = True
+        clean_before_ingest: bool = True,
+        incremental: bool = False,
+        checkpoint: Optional[RunCheckpoint] = None
     ):
         """
         Initialize ingestion pipeline.
 
         Args:
             config: Ingestion configuration
-            clean_before_ingest: Whether to clean existing data before ingestion (default: True)
+            clean_before_ingest: Whether to replace the existing corpus (default: True); the new
+                corpus is built in shadow tables and swapped in when the run finishes
+            incremental: Sync folders against the ingestion manifest: skip unchanged files,
+                replace modified ones and remove documents whose file was deleted
+            checkpoint: Run checkpoint to record per-file progress in (and resume from)
         """
+        if incremental and clean_before_ingest:
+            raise ValueError("Incremental ingestion cannot be combined with cleaning the database")
+
         self.config = config
         self.documents_folder: str | None = None
         self.clean_before_ingest = clean_before_ingest
+        self.incremental = incremental
+        self.last_sync: Optional[SyncPlan] = None
+        self.checkpoint = checkpoint
+        self.resumed_saved = 0  # Files skipped because the checkpoint has them saved
+        self.tables: CorpusTables = LIVE_TABLES  # Where documents are written
+        self.rebuild_mode: Optional[str] = None  # "shadow" or "in_place" during a clean run
+        self.rebuild_published = False
         
         # Initialize components
         self.chunker_config = ChunkingConfig(
@@ -117,6 +208,11 @@ class DocumentIngestionPipeline:
         
         self.chunker = create_chunker(self.chunker_config)
         self.embedder = create_embedder()
+
+        # Optional LLM titles for documents that only got a weak local title
+        self.title_enricher: Optional[TitleEnricher] = None
+        if config.llm_title_enrichment:
+            self.title_enricher = TitleEnricher(AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")), db_pool)
         
         self._initialized = False
     
@@ -133,8 +229,14 @@ class DocumentIngestionPipeline:
         self._initialized = True
         logger.info("Ingestion pipeline initialized")
     
+    async def drain_title_enrichment(self):
+        """Wait for background LLM titles of the documents ingested so far."""
+        if self.title_enricher is not None:
+            await self.title_enricher.drain()
+
     async def close(self):
         """Close database connections."""
+        await self.drain_title_enrichment()
         if self._initialized:
             await close_database()
             self._initialized = False
@@ -143,18 +245,32 @@ class DocumentIngestionPipeline:
         self,
         document_path: Optional[str] = None,
         documents_folder: Optional[str] = None,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        stage_callback: Optional[callable] = None,
+        workers: int = 1
     ) -> List[IngestionResult]:
         """
         Ingest a single document (when `document_path` is provided) or all documents from a folder.
+
+        Documents flow through a staged pipeline (convert -> chunk -> embed -> save) with
+        bounded queues between the stages, so one document can be converting while
+        another is being embedded and a third is written to Postgres. Worker counts per
+        stage and the queue size come from the ingestion config. Folder files are fed
+        into the pipeline while the folder is still being scanned.
         
         Args:
             document_path: Path to a single document to ingest
             documents_folder: Folder to scan for documents when `document_path` is not provided
-            progress_callback: Optional callback for progress updates
+            progress_callback: Optional callback called as (completed, discovered); the
+                discovered count grows while the folder is being scanned
+            stage_callback: Optional callback called as (file_path, stage) when a document
+                enters the converting, chunking, embedding or saving stage
+            workers: Ingest in this many processes (see sharding.py); the folder is scanned
+                and planned completely first, and `stage_callback` is not called
         
         Returns:
-            List of ingestion results
+            List of ingestion results, in discovery order
+            (only files that were actually ingested when running incrementally)
         """
         if not self._initialized:
             await self.initialize()
@@ -165,46 +281,71 @@ class DocumentIngestionPipeline:
             if not file_candidate.exists() or not file_candidate.is_file():
                 raise FileNotFoundError(f"Document file not found: {resolved_path}")
             self.documents_folder = str(file_candidate.parent)
-            document_files = [resolved_path]
+            root = self.documents_folder
+            discovered = iter([stat_file(resolved_path, root)])
         else:
             default_documents_dir = _project_root() / "api" / "documents"
             folder = str(default_documents_dir) if documents_folder is None else str(documents_folder)
             self.documents_folder = _resolve_documents_folder(folder)
-            document_files = self._find_document_files()
+            root = str(Path(self.documents_folder).resolve())
+            discovered = self._find_document_files(root)
+
+        files = iterate_in_thread(discovered)
+        first = await anext(files, None)
 
-        if not document_files:
+        # A folder sync still has to run when the folder is empty: its files may all be deleted
+        if first is None and not (self.incremental and document_path is None):
             logger.warning(f"No supported document files found in {self.documents_folder}")
             return []
 
-        # Clean existing data if requested (only if we have documents to ingest)
+        async with db_pool.acquire() as conn:
+            await ensure_manifest_table(conn)
+            plan = SyncPlan(manifest=await load_manifest(conn, root)) if self.incremental else None
+
+        # Rebuild from scratch if requested (only if we have documents to ingest)
         if self.clean_before_ingest:
-            await self._clean_databases()
+            await self._begin_rebuild()
+
+        async def documents_to_ingest() -> AsyncIterator[Tuple[FileState, Optional[str]]]:
+            state = first
+            while state is not None:
+                if plan is None or await plan.classify(state, sha256_file):
+                    if await self._saved_by_checkpoint(state):
+                        self.resumed_saved += 1
+                    else:
+                        yield state, plan.replaces.get(state.path) if plan else None
+                state = await anext(files, None)
+
+        if workers > 1:
+            results = await ingest_in_processes(
+                self.config,
+                [item async for item in documents_to_ingest()],
+                workers,
+                self.tables,
+                run_id=self.checkpoint.run_id if self.checkpoint is not None else None,
+                progress_callback=progress_callback
+            )
+        else:
+            results = await self._run_pipeline(documents_to_ingest(), progress_callback, stage_callback)
 
-        logger.info(f"Found {len(document_files)} document files to process")
+        if plan is not None:
+            plan.finish()
+            if document_path is not None:
+                # A single file says nothing about the rest of the folder
+                plan.deleted = []
 
-        results = []
+            async with db_pool.acquire() as conn:
+                async with conn.transaction():
+                    await refresh_stats(conn, plan.touched)
+                    await delete_documents(conn, [entry.document_id for entry in plan.deleted])
 
-        for i, file_path in enumerate(document_files):
-            try:
-                logger.info(f"Processing file {i+1}/{len(document_files)}: {file_path}")
+            self.last_sync = plan
+            logger.info(f"Incremental sync of {root}: {plan.stats()}")
 
-                result = await self._ingest_single_document(file_path)
-                results.append(result)
+        await self.drain_title_enrichment()
 
-                if progress_callback:
-                    progress_callback(i + 1, len(document_files))
-                
-            except Exception as e:
-                logger.error(f"Failed to process {file_path}: {e}")
-                results.append(IngestionResult(
-                    document_id="",
-                    title=os.path.basename(file_path),
-                    chunks_created=0,
-                    entities_extracted=0,
-                    relationships_created=0,
-                    processing_time_ms=0,
-                    errors=[str(e)]
-                ))
+        if self.rebuild_mode == "shadow":
+            await self._publish_rebuild()
         
         # Log summary
         total_chunks = sum(r.chunks_created for r in results)
@@ -213,174 +354,458 @@ class DocumentIngestionPipeline:
         logger.info(f"Ingestion complete: {len(results)} documents, {total_chunks} chunks, {total_errors} errors")
         
         return results
-    
-    async def _ingest_single_document(self, file_path: str) -> IngestionResult:
+
+    async def _saved_by_checkpoint(self, state: FileState) -> bool:
+        """Whether this run already saved the file, with the content it has now."""
+        if self.checkpoint is None or self.checkpoint.stage(state.file_path) != "saved":
+            return False
+        # Only files the checkpoint has as saved are hashed; the hash is reused by the pipeline
+        if state.content_sha256 is None:
+            state.content_sha256 = await asyncio.to_thread(sha256_file, state.file_path)
+        return self.checkpoint.stage(state.file_path, state.content_sha256) == "saved"
+
+    async def ingest_files(
+        self,
+        files: List[Tuple[FileState, Optional[str]]],
+        tables: CorpusTables = LIVE_TABLES,
+        progress_callback: Optional[callable] = None
+    ) -> List[IngestionResult]:
         """
-        Ingest a single document.
+        Ingest files that were already discovered and planned, e.g. one shard of a multi-process run.
+
+        There is no discovery, manifest sync or rebuild step: `files` are
+        (file, id of the document it replaces) pairs and the documents are written to `tables`.
+        """
+        if not self._initialized:
+            await self.initialize()
+        self._use_tables(tables)
+
+        async def planned() -> AsyncIterator[Tuple[FileState, Optional[str]]]:
+            for item in files:
+                yield item
+
+        results = await self._run_pipeline(planned(), progress_callback, None)
+        await self.drain_title_enrichment()
+        return results
+
+    async def _run_pipeline(
+        self,
+        files: AsyncIterator[Tuple[FileState, Optional[str]]],
+        progress_callback: Optional[callable],
+        stage_callback: Optional[callable]
+    ) -> List[IngestionResult]:
+        """Push (file, id of the document it replaces) pairs through the convert/chunk/embed/save stages."""
+        results: Dict[int, IngestionResult] = {}
+        discovered = 0
+
+        def report_stage(work: _DocumentWork, stage: str):
+            if stage_callback:
+                stage_callback(work.source_path, stage)
+
+        def finish(work: _DocumentWork):
+            results[work.index] = work.result
+            if progress_callback:
+                progress_callback(len(results), discovered)
+
+        stages = [
+            (self._convert_stage, self.config.convert_concurrency),
+            (self._chunk_stage, self.config.chunk_concurrency),
+            (self._embed_stage, self.config.embed_concurrency),
+            (self._save_stage, self.config.save_concurrency),
+        ]
+        # One queue in front of every stage; bounded so a fast stage can't run far ahead
+        queues = [asyncio.Queue(maxsize=self.config.stage_queue_size) for _ in stages]
+
+        async def feed():
+            nonlocal discovered
+            try:
+                async for state, replaces_document_id in files:
+                    await queues[0].put(_DocumentWork(
+                        index=discovered,
+                        source_path=state.file_path,
+                        file_state=state,
+                        replaces_document_id=replaces_document_id
+                    ))
+                    discovered += 1
+            finally:
+                # Always release the stage workers, even if discovery fails
+                for _ in range(stages[0][1]):
+                    await queues[0].put(None)
+            logger.info(f"Discovered {discovered} document files to process")
+
+        async def run_stage(position: int):
+            handler, workers = stages[position]
+            inbox = queues[position]
+            outbox = queues[position + 1] if position + 1 < len(stages) else None
+
+            async def worker():
+                while (work := await inbox.get()) is not None:
+                    try:
+                        await handler(work, lambda stage, w=work: report_stage(w, stage))
+                    except Exception as e:
+                        logger.error(f"Failed to process {work.source_path}: {e}")
+                        work.fail(str(e))
+
+                    # Documents that failed or have nothing left to do skip the remaining stages
+                    if outbox is None or work.result is not None:
+                        finish(work)
+                    else:
+                        await outbox.put(work)
+
+            await asyncio.gather(*(worker() for _ in range(workers)))
+            if outbox is not None:
+                for _ in range(stages[position + 1][1]):
+                    await outbox.put(None)
+
+        await asyncio.gather(feed(), *(run_stage(i) for i in range(len(stages))))
+        return [results[i] for i in sorted(results)]
+
+    async def ingest_content(
+        self,
+        content: str,
+        source: str,
+        title: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        stage_callback: Optional[callable] = None
+    ) -> IngestionResult:
+        """
+        Ingest already-extracted markdown (e.g. a crawled web page) as one document.
 
         Args:
-            file_path: Path to the document file
+            content: Markdown content of the document
+            source: Document source stored with the document (URL or path)
+            title: Optional title; extracted from the content when omitted
+            metadata: Extra metadata merged into the extracted document metadata
+            stage_callback: Optional callback for stage transitions, called as (source, stage)
 
         Returns:
             Ingestion result
         """
-        start_time = datetime.now()
+        if not self._initialized:
+            await self.initialize()
+
+        work = _DocumentWork(index=0, source_path=source, source=source, content=content)
+        work.bytes_read = len(content.encode("utf-8"))
+
+        def report_stage(stage: str):
+            if stage_callback:
+                stage_callback(source, stage)
+
+        with _timed(work.timings, "title_ms"):
+            if title:
+                work.title, work.title_source = title, "provided"
+            else:
+                work.title, work.title_source = extract_title(content, source)
+        with _timed(work.timings, "metadata_ms"):
+            work.metadata = self._extract_document_metadata(profile_text(content), source)
+            work.metadata["title_source"] = work.title_source
+            work.metadata.update(metadata or {})
+
+        for stage in (self._chunk_stage, self._embed_stage, self._save_stage):
+            await stage(work, report_stage)
+            if work.result is not None:
+                break
+        return work.result
+
+    async def _convert_stage(self, work: "_DocumentWork", report_stage: callable) -> None:
+        """Read/convert the source file and extract its title and metadata."""
+        file_path = work.source_path
+
+        # Content hash of the source file, used to detect re-uploads of the same file and as
+        # the conversion cache key (already known when an incremental sync checked the file)
+        if work.file_state.content_sha256 is None:
+            work.file_state.content_sha256 = await asyncio.to_thread(sha256_file, file_path)
+        content_sha256 = work.file_state.content_sha256
+
+        if self.checkpoint is not None:
+            # Embedded by an earlier attempt of this run: reuse the embeddings
+            chunks = await asyncio.to_thread(self.checkpoint.load_chunks, file_path, content_sha256)
+            if chunks is not None:
+                logger.info(f"Resuming {os.path.basename(file_path)} with {len(chunks)} checkpointed embeddings")
+                work.chunks, work.embedded = chunks, True
 
         # Read document (returns tuple: content, docling_doc)
-        document_content, docling_doc = self._read_document(file_path)
-        document_title = await self._extract_title(document_content, file_path)
-        documents_folder = self.documents_folder or str(Path(file_path).resolve().parent)
-        document_source = os.path.relpath(file_path, documents_folder)
-
-        # Extract metadata from content
-        document_metadata = self._extract_document_metadata(document_content, file_path)
-
-        logger.info(f"Processing document: {document_title}")
-
-        # Chunk the document - pass DoclingDocument for HybridChunker
-        chunks = await self.chunker.chunk_document(
-            content=document_content,
-            title=document_title,
-            source=document_source,
-            metadata=document_metadata,
-            docling_doc=docling_doc  # Pass DoclingDocument for HybridChunker
-        )
-        
-        if not chunks:
-            logger.warning(f"No chunks created for {document_title}")
-            return IngestionResult(
-                document_id="",
-                title=document_title,
-                chunks_created=0,
-                entities_extracted=0,
-                relationships_created=0,
-                processing_time_ms=(datetime.now() - start_time).total_seconds() * 1000,
-                errors=["No chunks created"]
+        report_stage("converting")
+        with _timed(work.timings, "convert_ms"):
+            work.content, work.docling_doc, work.text_profile = await self._read_document(
+                file_path, content_sha256=work.file_state.content_sha256
             )
-        
-        logger.info(f"Created {len(chunks)} chunks")
-        
-        # Entity extraction removed (graph-related functionality)
-        entities_extracted = 0
-        
-        # Generate embeddings
-        embedded_chunks = await self.embedder.embed_chunks(chunks)
-        logger.info(f"Generated embeddings for {len(embedded_chunks)} chunks")
-        
-        # Save to PostgreSQL
-        document_id = await self._save_to_postgres(
-            document_title,
-            document_source,
-            document_content,
-            embedded_chunks,
-            document_metadata
+        work.bytes_read = os.path.getsize(file_path)
+
+        with _timed(work.timings, "title_ms"):
+            # Titles only look at the start of the text, so the head is enough for large files
+            head = work.content if work.content is not None else work.text_profile.head
+            work.title, work.title_source = extract_title(head, file_path, work.docling_doc)
+        work.source = work.file_state.path
+
+        with _timed(work.timings, "metadata_ms"):
+            # Extract metadata from content
+            work.metadata = self._extract_document_metadata(work.text_profile, file_path)
+            work.metadata["content_sha256"] = work.file_state.content_sha256
+            work.metadata["title_source"] = work.title_source
+
+        # Large documents never have all their chunks and embeddings in memory at once
+        max_inline_chars = int(self.config.max_inline_text_mb * 1024 * 1024)
+        work.streaming = not work.embedded and work.text_profile.char_count > max_inline_chars
+
+        if self.checkpoint is not None and not work.embedded:
+            self.checkpoint.record(file_path, "converted", content_sha256)
+
+    async def _chunk_stage(self, work: "_DocumentWork", report_stage: callable) -> None:
+        """Split the document into chunks (pass the DoclingDocument for HybridChunker)."""
+        if work.streaming:
+            return
+        if work.embedded:
+            work.docling_doc = None
+            return
+
+        logger.info(f"Processing document: {work.title}")
+
+        report_stage("chunking")
+        with _timed(work.timings, "chunk_ms"):
+            work.chunks = await self.chunker.chunk_document(
+                content=work.content,
+                title=work.title,
+                source=work.source,
+                metadata=work.metadata,
+                docling_doc=work.docling_doc  # Pass DoclingDocument for HybridChunker
+            )
+        # The converted document is no longer needed and can be large
+        work.docling_doc = None
+
+        if not work.chunks:
+            logger.warning(f"No chunks created for {work.title}")
+            work.fail("No chunks created", title=work.title)
+            return
+
+        logger.info(f"Created {len(work.chunks)} chunks")
+        if self.checkpoint is not None and work.file_state is not None:
+            self.checkpoint.record(work.source_path, "chunked", work.file_state.content_sha256)
+
+    async def _embed_stage(self, work: "_DocumentWork", report_stage: callable) -> None:
+        """Generate embeddings for the document's chunks."""
+        if work.embedded or work.streaming:
+            return
+
+        report_stage("embedding")
+        with _timed(work.timings, "embed_ms"):
+            work.chunks = await self.embedder.embed_chunks(work.chunks)
+        logger.info(f"Generated embeddings for {len(work.chunks)} chunks")
+
+        # Chunks whose embedding failed carry zero vectors; a resume must retry them
+        failed = any("embedding_error" in chunk.metadata for chunk in work.chunks)
+        if self.checkpoint is not None and work.file_state is not None and not failed:
+            # Written even with the embedding store enabled: its LRU may evict them before a resume
+            await asyncio.to_thread(
+                self.checkpoint.save_chunks, work.source_path, work.file_state.content_sha256, work.chunks
+            )
+
+    async def _save_stage(self, work: "_DocumentWork", report_stage: callable) -> None:
+        """Store the document and its chunks, then record the final result."""
+        if work.streaming:
+            await self._stream_document(work, report_stage)
+            return
+
+        report_stage("saving")
+        with _timed(work.timings, "save_ms"):
+            document_id = await self._save_to_postgres(
+                work.title,
+                work.source,
+                work.content,
+                work.chunks,
+                work.metadata,
+                file_state=work.file_state,
+                replaces_document_id=work.replaces_document_id
+            )
+
+        chunks = work.chunks
+        self._finish_saved(
+            work,
+            document_id,
+            chunks_created=len(chunks),
+            chunks_embedded=sum(1 for c in chunks if "embedding_error" not in c.metadata),
+            tokens_embedded=sum(c.token_count or 0 for c in chunks)
         )
-        
+
+    async def _stream_document(self, work: "_DocumentWork", report_stage: callable) -> None:
+        """
+        Chunk, embed and save a large document in batches of `stream_batch_size` chunks.
+
+        The document row goes in first, then each batch is chunked, embedded and copied
+        into Postgres before the next one is cut, so memory holds one batch of chunks and
+        embeddings regardless of the document's size. Everything is written in one
+        transaction: readers see the whole document or nothing, and a failure part way
+        leaves no partial document behind.
+
+        Chunks of a streamed document carry no `total_chunks`; the document's metadata
+        gets it once all chunks are written.
+        """
+        logger.info(f"Streaming document in batches of {self.config.stream_batch_size} chunks: {work.title}")
+        content_source = (
+            work.content if work.content is not None
+            else iter_text_file(work.source_path, work.text_profile.encoding)
+        )
+        chunk_iter = self.chunker.iter_chunks(
+            content_source,
+            title=work.title,
+            source=work.source,
+            metadata=work.metadata,
+            docling_doc=work.docling_doc
+        )
+
+        def next_batch() -> List[DocumentChunk]:
+            return list(itertools.islice(chunk_iter, self.config.stream_batch_size))
+
+        chunks_created = chunks_embedded = tokens_embedded = 0
+        async with db_pool.acquire() as conn:
+            async with conn.transaction():
+                report_stage("saving")
+                with _timed(work.timings, "save_ms"):
+                    if work.replaces_document_id:
+                        await delete_documents(conn, [work.replaces_document_id])
+                    document_id = await self._insert_document(
+                        conn, work.title, work.source, self._document_content(work), work.metadata
+                    )
+                # The row holds the content now
+                work.content = None
+
+                while True:
+                    report_stage("chunking")
+                    with _timed(work.timings, "chunk_ms"):
+                        batch = await asyncio.to_thread(next_batch)
+                    if not batch:
+                        break
+
+                    report_stage("embedding")
+                    with _timed(work.timings, "embed_ms"):
+                        batch = await self.embedder.embed_chunks(batch)
+
+                    report_stage("saving")
+                    with _timed(work.timings, "save_ms"):
+                        await copy_chunk_records(conn, self._chunk_records(document_id, batch), table=self.tables.chunks)
+
+                    chunks_created += len(batch)
+                    chunks_embedded += sum(1 for c in batch if "embedding_error" not in c.metadata)
+                    tokens_embedded += sum(c.token_count or 0 for c in batch)
+                    logger.info(f"Saved {chunks_created} chunks of {work.title}")
+
+                work.docling_doc = None
+                if chunks_created == 0:
+                    # Rolls back the document row
+                    raise ValueError("No chunks created")
+
+                with _timed(work.timings, "save_ms"):
+                    await conn.execute(
+                        f"""
+                        UPDATE {self.tables.documents}
+                        SET metadata = metadata::jsonb || $2::jsonb
+                        WHERE id = $1::uuid
+                        """,
+                        document_id,
+                        json.dumps({"total_chunks": chunks_created})
+                    )
+                    if work.file_state is not None:
+                        await record_file(conn, work.file_state, document_id, table=self.tables.manifest)
+
+        self._finish_saved(
+            work,
+            document_id,
+            chunks_created=chunks_created,
+            chunks_embedded=chunks_embedded,
+            tokens_embedded=tokens_embedded
+        )
+
+    def _finish_saved(
+        self,
+        work: "_DocumentWork",
+        document_id: str,
+        chunks_created: int,
+        chunks_embedded: int,
+        tokens_embedded: int
+    ) -> None:
+        """Record a saved document: checkpoint, LLM title and the final result."""
         logger.info(f"Saved document to PostgreSQL with ID: {document_id}")
-        
-        # Knowledge graph functionality removed
-        relationships_created = 0
-        graph_errors = []
+
+        if self.checkpoint is not None and work.file_state is not None:
+            self.checkpoint.record(
+                work.source_path, "saved", work.file_state.content_sha256, document_id=document_id
+            )
+
+        if self.title_enricher is not None and work.title_source in WEAK_TITLE_SOURCES:
+            self.title_enricher.submit(document_id, work.content or work.text_profile.head)
         
         # Calculate processing time
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
+        processing_time = (datetime.now() - work.start_time).total_seconds() * 1000
         
-        return IngestionResult(
+        work.result = IngestionResult(
             document_id=document_id,
-            title=document_title,
-            chunks_created=len(chunks),
-            entities_extracted=entities_extracted,
-            relationships_created=relationships_created,
+            title=work.title,
+            source=work.source_path,
+            chunks_created=chunks_created,
+            chunks_embedded=chunks_embedded,
             processing_time_ms=processing_time,
-            errors=graph_errors
+            stage_timings=work.timings,
+            bytes_read=work.bytes_read,
+            tokens_embedded=tokens_embedded,
+            chunks_per_second=chunks_created / (processing_time / 1000) if processing_time > 0 else 0.0,
+            errors=[]
         )
     
-    def _find_document_files(self) -> List[str]:
-        """Find all supported document files in the documents folder."""
-        if not self.documents_folder:
-            return []
-
-        documents_dir = Path(self.documents_folder)
-
-        if not documents_dir.exists():
+    def _find_document_files(self, root: str) -> Iterator[FileState]:
+        """Lazily find supported document files under `root` (one scandir walk)."""
+        if not os.path.isdir(root):
             logger.error(
                 "Documents folder not found: %s (cwd=%s)",
-                str(documents_dir),
+                root,
                 os.getcwd(),
             )
-            return []
-
-        # Supported file patterns - Docling + text formats + audio
-        patterns = [
-            "*.md", "*.markdown", "*.txt",  # Text formats
-            "*.pdf",  # PDF
-            "*.docx", "*.doc",  # Word
-            "*.pptx", "*.ppt",  # PowerPoint
-            "*.xlsx", "*.xls",  # Excel
-            "*.html", "*.htm",  # HTML
-            "*.mp3", "*.wav", "*.m4a", "*.flac",  # Audio formats
-        ]
-        files = []
-
-        for pattern in patterns:
-            files.extend(glob.glob(str(documents_dir / "**" / pattern), recursive=True))
-
-        return sorted(files)
+            return iter([])
+
+        max_mb = self.config.max_file_size_mb
+        return scan_documents(
+            root,
+            include=self.config.include_patterns,
+            exclude=self.config.exclude_patterns,
+            max_file_size=int(max_mb * 1024 * 1024) if max_mb is not None else None
+        )
     
-    def _read_document(self, file_path: str) -> tuple[str, Optional[Any]]:
+    async def _read_document(
+        self,
+        file_path: str,
+        content_sha256: Optional[str] = None
+    ) -> tuple[Optional[str], Optional[Any], TextProfile]:
         """
         Read document content from file - supports multiple formats via Docling.
 
+        Docling conversion and audio transcription run in the conversion process pool,
+        so large documents don't block the event loop. With `content_sha256` given,
+        conversions are served from / stored in the conversion cache.
+
+        Text files are read in one pass that also profiles them; files larger than
+        `max_inline_text_mb` are not kept in memory and come back with content None
+        (they are re-read as a stream by the chunk and save stages).
+
         Returns:
-            Tuple of (markdown_content, docling_document)
+            Tuple of (markdown_content, docling_document, text_profile)
             docling_document is None for text files and audio files
         """
         file_ext = os.path.splitext(file_path)[1].lower()
 
         # Audio formats - transcribe with Whisper ASR
-        audio_formats = ['.mp3', '.wav', '.m4a', '.flac']
-        if file_ext in audio_formats:
-            content = self._transcribe_audio(file_path)
-
-            # # Testing helper: persist transcription next to the source file
-            # try:
-            #     base_name = os.path.splitext(os.path.basename(file_path))[0]
-            #     output_path = os.path.join(os.path.dirname(file_path), f"{base_name}-converted.md")
-            #     with open(output_path, "w", encoding="utf-8") as f:
-            #         f.write(content)
-            #     logger.info(f"Saved transcribed markdown: {output_path}")
-            # except Exception as e:
-            #     logger.warning(f"Failed to save transcribed markdown for {file_path}: {e}")
-            # return (content, None)  # No DoclingDocument for audio
+        if file_ext in AUDIO_EXTENSIONS:
+            content = await self._transcribe_audio(file_path, content_sha256)
+            return (content, None, profile_text(content))  # No DoclingDocument for audio
 
         # Docling-supported formats (convert to markdown)
-        docling_formats = ['.pdf', '.docx', '.doc', '.pptx', '.ppt', '.xlsx', '.xls', '.html', '.htm']
-
-        if file_ext in docling_formats:
+        if file_ext in DOCLING_EXTENSIONS:
             try:
-                from docling.document_converter import DocumentConverter
-
                 logger.info(f"Converting {file_ext} file using Docling: {os.path.basename(file_path)}")
 
-                converter = DocumentConverter()
-                result = converter.convert(file_path)
-
-                # Export to markdown for consistent processing
-                markdown_content = result.document.export_to_markdown()
-
-                # Testing helper: persist converted markdown next to the source file
-                try:
-                    base_name = os.path.splitext(os.path.basename(file_path))[0]
-                    output_path = os.path.join(os.path.dirname(file_path), f"{base_name}-converted.md")
-                    with open(output_path, "w", encoding="utf-8") as f:
-                        f.write(markdown_content)
-                    logger.info(f"Saved converted markdown: {output_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to save converted markdown for {file_path}: {e}")
+                markdown_content, docling_doc = await convert_document(file_path, content_sha256)
                 logger.info(f"Successfully converted {os.path.basename(file_path)} to markdown")
 
                 # Return both markdown and DoclingDocument for HybridChunker
-                return (markdown_content, result.document)
+                return (markdown_content, docling_doc, profile_text(markdown_content))
 
             except Exception as e:
                 logger.error(f"Failed to convert {file_path} with Docling: {e}")
@@ -388,57 +813,22 @@ class DocumentIngestionPipeline:
                 logger.warning(f"Falling back to raw text extraction for {file_path}")
                 try:
                     with open(file_path, 'r', encoding='utf-8') as f:
-                        return (f.read(), None)
+                        content = f.read()
                 except:
-                    return (f"[Error: Could not read file {os.path.basename(file_path)}]", None)
+                    content = f"[Error: Could not read file {os.path.basename(file_path)}]"
+                return (content, None, profile_text(content))
 
-        # Text-based formats (read directly)
+        # Text-based formats (read directly, falling back to latin-1)
         else:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return (f.read(), None)
-            except UnicodeDecodeError:
-                # Try with different encoding
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    return (f.read(), None)
-
-    def _transcribe_audio(self, file_path: str) -> str:
-        """Transcribe audio file using Whisper ASR via Docling."""
-        try:
-            from pathlib import Path
-            from docling.document_converter import DocumentConverter, AudioFormatOption
-            from docling.datamodel.pipeline_options import AsrPipelineOptions
-            from docling.datamodel import asr_model_specs
-            from docling.datamodel.base_models import InputFormat
-            from docling.pipeline.asr_pipeline import AsrPipeline
-
-            # Use Path object - Docling expects this
-            audio_path = Path(file_path).resolve()
-            logger.info(f"Transcribing audio file using Whisper Turbo: {audio_path.name}")
-            logger.info(f"Audio file absolute path: {audio_path}")
-
-            # Verify file exists
-            if not audio_path.exists():
-                raise FileNotFoundError(f"Audio file not found: {audio_path}")
-
-            # Configure ASR pipeline with Whisper Turbo model
-            pipeline_options = AsrPipelineOptions()
-            pipeline_options.asr_options = asr_model_specs.WHISPER_TURBO
-
-            converter = DocumentConverter(
-                format_options={
-                    InputFormat.AUDIO: AudioFormatOption(
-                        pipeline_cls=AsrPipeline,
-                        pipeline_options=pipeline_options,
-                    )
-                }
-            )
-
-            # Transcribe the audio file - pass Path object
-            result = converter.convert(audio_path)
+            max_inline_chars = int(self.config.max_inline_text_mb * 1024 * 1024)
+            profile, content = await asyncio.to_thread(read_text_file, file_path, max_inline_chars)
+            return (content, None, profile)
 
-            # Export to markdown with timestamps
-            markdown_content = result.document.export_to_markdown()
+    async def _transcribe_audio(self, file_path: str, content_sha256: Optional[str] = None) -> str:
+        """Transcribe audio file using Whisper ASR (segments run in parallel in the conversion pool)."""
+        try:
+            logger.info(f"Transcribing audio file using Whisper: {os.path.basename(file_path)}")
+            markdown_content = await transcribe_audio(file_path, content_sha256)
             logger.info(f"Successfully transcribed {os.path.basename(file_path)}")
             return markdown_content
 
@@ -446,83 +836,20 @@ class DocumentIngestionPipeline:
             logger.error(f"Failed to transcribe {file_path} with Whisper ASR: {e}")
             return f"[Error: Could not transcribe audio file {os.path.basename(file_path)}]"
 
-    # def _extract_title(self, content: str, file_path: str) -> str:
-    #     """Extract title from document content or filename."""
-    #     # Try to find markdown title
-    #     lines = content.split('\n')
-    #     for line in lines[:100]:  # Check first 100 lines
-    #         line = line.strip()
-    #         if line.startswith('# '):
-    #             return line[2:].strip()
-        
-    #     # Fallback to filename
-    #     return os.path.splitext(os.path.basename(file_path))[0]
-    
-    async def _extract_title(self, content: str, file_path: str) -> str:
-        """Extract title from document content or filename.
-
-        Priority (within first 70 lines):
-        1) First '# ' heading
-        2) First '## ' heading
-        3) First '### ' heading
-        Fallback: filename without extension
-        """
-        lines = content.splitlines()[:70]
-
-        # 1) First '# '
-        for line in lines:
-            s = line.strip()
-            if s.startswith("# "):
-                return s[2:].strip()
-
-        # 2) First '## '
-        for line in lines:
-            s = line.strip()
-            if s.startswith("## "):
-                return s[3:].strip()
-
-        # 3) First '### '
-        for line in lines:
-            s = line.strip()
-            if s.startswith("### "):
-                return s[4:].strip()
-            
-        response = await create_title(content.splitlines()[:100])
-
-        title = (response or {}).get("title")
-        if isinstance(title, str) and title.strip():
-            return title.strip()
-
-        # 4) Fallback to filename
-        return os.path.splitext(os.path.basename(file_path))[0]
-    
-    def _extract_document_metadata(self, content: str, file_path: str) -> Dict[str, Any]:
-        """Extract metadata from document content."""
+    def _extract_document_metadata(self, profile: TextProfile, file_path: str) -> Dict[str, Any]:
+        """Extract metadata from the document's text profile (counts and head)."""
         metadata = {
             "file_path": file_path,
-            "file_size": len(content),
+            "file_size": profile.char_count,
             "ingestion_date": datetime.now().isoformat()
         }
         
         # Try to extract YAML frontmatter
-        if content.startswith('---'):
-            try:
-                import yaml
-                end_marker = content.find('\n---\n', 4)
-                if end_marker != -1:
-                    frontmatter = content[4:end_marker]
-                    yaml_metadata = yaml.safe_load(frontmatter)
-                    if isinstance(yaml_metadata, dict):
-                        metadata.update(yaml_metadata)
-            except ImportError:
-                logger.warning("PyYAML not installed, skipping frontmatter extraction")
-            except Exception as e:
-                logger.warning(f"Failed to parse frontmatter: {e}")
+        metadata.update(parse_frontmatter(profile.head))
         
-        # Extract some basic metadata from content
-        lines = content.split('\n')
-        metadata['line_count'] = len(lines)
-        metadata['word_count'] = len(content.split())
+        # Basic metadata counted while the content was read
+        metadata['line_count'] = profile.line_count
+        metadata['word_count'] = profile.word_count
         
         return metadata
     
@@ -530,53 +857,136 @@ class DocumentIngestionPipeline:
         self,
         title: str,
         source: str,
-        content: str,
+        content: Union[str, AsyncIterable[str]],
         chunks: List[DocumentChunk],
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        file_state: Optional[FileState] = None,
+        replaces_document_id: Optional[str] = None
     ) -> str:
-        """Save document and chunks to PostgreSQL."""
+        """
+        Save document and chunks to PostgreSQL.
+
+        `content` is either the whole text or, for files too large to hold in memory,
+        an async stream of its pieces that is copied into the row as it is read.
+
+        When `replaces_document_id` is given the previous version is deleted in the same
+        transaction, and `file_state` is recorded in the ingestion manifest, so readers
+        never see both versions (or neither).
+        """
         async with db_pool.acquire() as conn:
             async with conn.transaction():
-                # Insert document
-                document_result = await conn.fetchrow(
-                    """
-                    INSERT INTO documents (title, source, content, metadata)
-                    VALUES ($1, $2, $3, $4)
-                    RETURNING id::text
-                    """,
-                    title,
-                    source,
-                    content,
-                    json.dumps(metadata)
-                )
-                
-                document_id = document_result["id"]
+                if replaces_document_id:
+                    await delete_documents(conn, [replaces_document_id])
+
+                document_id = await self._insert_document(conn, title, source, content, metadata)
                 
-                # Insert chunks
-                for chunk in chunks:
-                    # Convert embedding to PostgreSQL vector string format
-                    embedding_data = None
-                    if hasattr(chunk, 'embedding') and chunk.embedding:
-                        # PostgreSQL vector format: '[1.0,2.0,3.0]' (no spaces after commas)
-                        # converts something like [0.12, -0.3, 1.5] to "[0.12,-0.3,1.5]"
-                        # map(str, chunk.embedding) converts each number to a string, joins by comma and adds bracket at end
-                        embedding_data = '[' + ','.join(map(str, chunk.embedding)) + ']'
-                    
-                    await conn.execute(
-                        """
-                        INSERT INTO chunks (document_id, content, embedding, chunk_index, metadata, token_count)
-                        VALUES ($1::uuid, $2, $3::vector, $4, $5, $6)
-                        """,
-                        document_id,
-                        chunk.content,
-                        embedding_data,
-                        chunk.index,
-                        json.dumps(chunk.metadata),
-                        chunk.token_count
-                    )
+                # Bulk-insert chunks with COPY; embeddings go over the wire as packed
+                # float32 through the binary vector codec registered on the pool
+                await copy_chunk_records(conn, self._chunk_records(document_id, chunks), table=self.tables.chunks)
+
+                if file_state is not None:
+                    await record_file(conn, file_state, document_id, table=self.tables.manifest)
                 
                 return document_id
     
+    async def _insert_document(
+        self,
+        conn,
+        title: str,
+        source: str,
+        content: Union[str, AsyncIterable[str]],
+        metadata: Dict[str, Any]
+    ) -> str:
+        """Insert the document row and return its id."""
+        if isinstance(content, str):
+            document_result = await conn.fetchrow(
+                f"""
+                INSERT INTO {self.tables.documents} (title, source, content, metadata)
+                VALUES ($1, $2, $3, $4)
+                RETURNING id::text
+                """,
+                title,
+                source,
+                content,
+                json.dumps(metadata)
+            )
+            return document_result["id"]
+
+        return await copy_document_stream(
+            conn, title, source, content, json.dumps(metadata), table=self.tables.documents
+        )
+
+    @staticmethod
+    def _chunk_records(document_id: str, chunks: List[DocumentChunk]) -> List[tuple]:
+        return [
+            (
+                document_id,
+                chunk.content,
+                chunk.embedding or None,
+                chunk.index,
+                json.dumps(chunk.metadata),
+                chunk.token_count
+            )
+            for chunk in chunks
+        ]
+
+    @staticmethod
+    def _document_content(work: "_DocumentWork") -> Union[str, AsyncIterable[str]]:
+        """The document's text, or a stream of it read from disk if it isn't held in memory."""
+        if work.content is not None:
+            return work.content
+        return iterate_in_thread(iter_text_file(work.source_path, work.text_profile.encoding), batch_size=16)
+
+    def _use_tables(self, tables: CorpusTables) -> None:
+        self.tables = tables
+        if self.title_enricher is not None:
+            self.title_enricher.documents_table = tables.documents
+            self.title_enricher.chunks_table = tables.chunks
+
+    async def _begin_rebuild(self) -> None:
+        """
+        Start replacing the whole corpus.
+
+        New documents go into shadow tables that are swapped in once the run finishes,
+        so searches keep serving the current corpus meanwhile. If other database objects
+        depend on the corpus tables the swap isn't safe, and the live tables are emptied
+        up front instead.
+        """
+        # A resumed run continues the rebuild it started
+        previous = self.checkpoint.run.get("rebuild") if self.checkpoint is not None else None
+        if previous == "in_place":
+            self.rebuild_mode = previous
+            return
+
+        async with db_pool.acquire() as conn:
+            blockers = await rebuild_blockers(conn)
+            if not blockers:
+                await prepare_shadow(conn, reuse=previous == "shadow")
+
+        if blockers:
+            logger.warning(f"Rebuilding in place, the corpus tables are referenced by: {'; '.join(blockers)}")
+            await self._clean_databases()
+            self.rebuild_mode = "in_place"
+        else:
+            logger.info(f"Rebuilding the corpus into {', '.join(SHADOW_TABLES.names())}")
+            self._use_tables(SHADOW_TABLES)
+            self.rebuild_mode = "shadow"
+
+        if self.checkpoint is not None:
+            self.checkpoint.update_run(rebuild=self.rebuild_mode)
+
+    async def _publish_rebuild(self) -> None:
+        """Index the shadow tables and swap them in as the live corpus."""
+        async with db_pool.acquire() as conn:
+            # e.g. a resumed run whose documents were all published already
+            if await count_shadow_documents(conn) == 0:
+                logger.warning("No documents were saved by this rebuild; keeping the current corpus")
+                return
+            await publish_shadow(conn)
+
+        self._use_tables(LIVE_TABLES)
+        self.rebuild_published = True
+
     async def _clean_databases(self):
         """Clean existing data from databases."""
         logger.warning("Cleaning existing data from databases...")
@@ -600,9 +1010,51 @@ async def main():
         help="Documents folder path (default: api/documents)",
     )
     parser.add_argument("--no-clean", action="store_true", help="Skip cleaning existing data before ingestion (default: cleans automatically)")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only ingest new/changed files and remove deleted ones, using the ingestion manifest (implies --no-clean)",
+    )
     parser.add_argument("--chunk-size", type=int, default=1000, help="Chunk size for splitting documents")
     parser.add_argument("--chunk-overlap", type=int, default=200, help="Chunk overlap size")
     parser.add_argument("--no-semantic", action="store_true", help="Disable semantic chunking")
+    parser.add_argument(
+        "--llm-titles",
+        action="store_true",
+        help="Replace weak local titles with LLM titles in the background (batched, after saving)",
+    )
+    parser.add_argument(
+        "--conversion-workers",
+        type=int,
+        default=None,
+        help="Docling conversion processes (default: DOCLING_PROCESS_WORKERS or 2; 0 converts in-process)",
+    )
+    parser.add_argument("--include", action="append", default=None, help="Only ingest files matching this glob (repeatable)")
+    parser.add_argument("--exclude", action="append", default=None, help="Skip files/directories matching this glob (repeatable)")
+    parser.add_argument("--max-file-size-mb", type=float, default=None, help="Skip files larger than this size")
+    parser.add_argument("--convert-concurrency", type=int, default=None, help="Documents converted at the same time (default: 2)")
+    parser.add_argument("--chunk-concurrency", type=int, default=None, help="Documents chunked at the same time (default: 1)")
+    parser.add_argument("--embed-concurrency", type=int, default=None, help="Documents embedded at the same time (default: 2)")
+    parser.add_argument("--save-concurrency", type=int, default=None, help="Documents written to Postgres at the same time (default: 2)")
+    parser.add_argument("--stage-queue-size", type=int, default=None, help="Documents buffered between pipeline stages (default: 2)")
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        default=None,
+        help="Continue an interrupted run with its original settings (other ingestion options are ignored)"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        default=None,
+        help="Profile the run (CPU samples, memory at stage boundaries, per-file timings) into DIR",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Ingest in this many processes, each with its own DB pool and in-process converter (default: 1)",
+    )
     # Graph-related arguments removed
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
 
@@ -611,10 +1063,26 @@ async def main():
     await run_ingestion(
         documents=str(args.documents),
         no_clean=args.no_clean,
+        incremental=args.incremental,
+        include=args.include,
+        exclude=args.exclude,
+        max_file_size_mb=args.max_file_size_mb,
         chunk_size=args.chunk_size,
         chunk_overlap=args.chunk_overlap,
         no_semantic=args.no_semantic,
+        llm_titles=args.llm_titles,
         verbose=args.verbose,
+        conversion_workers=args.conversion_workers,
+        stage_concurrency={
+            "convert_concurrency": args.convert_concurrency,
+            "chunk_concurrency": args.chunk_concurrency,
+            "embed_concurrency": args.embed_concurrency,
+            "save_concurrency": args.save_concurrency,
+            "stage_queue_size": args.stage_queue_size,
+        },
+        resume=args.resume,
+        profile_dir=args.profile,
+        workers=args.workers,
     )
 
 
@@ -626,14 +1094,49 @@ async def run_ingestion(
     chunk_overlap: int = 200,
     no_semantic: bool = False,
     verbose: bool = False,
+    stage_callback: Optional[callable] = None,
+    keep_database_open: bool = False,
+    conversion_workers: Optional[int] = None,
+    stage_concurrency: Optional[Dict[str, Optional[int]]] = None,
+    incremental: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    max_file_size_mb: Optional[float] = None,
+    llm_titles: bool = False,
+    run_id: Optional[str] = None,
+    resume: Optional[str] = None,
+    profile_dir: Optional[str] = None,
+    workers: int = 1,
 ) -> List[IngestionResult]:
     """
     Programmatic entrypoint for running the ingestion pipeline (used by API and CLI).
 
     Keeps the same default behavior as `main()`:
     - documents defaults to `api/documents`
-    - cleans existing data by default (unless no_clean=True)
+    - replaces the existing corpus by default, via a blue/green rebuild (unless no_clean=True)
     - semantic chunking enabled by default (unless no_semantic=True)
+
+    `stage_callback` is forwarded to the pipeline for per-document stage reporting.
+    Set `keep_database_open=True` when several runs share the process-wide connection
+    pool (e.g. concurrent API jobs), so one run finishing does not close it under the others.
+    `conversion_workers` overrides the size of the Docling conversion process pool.
+    `stage_concurrency` overrides IngestionConfig pipeline settings such as
+    `embed_concurrency` or `stage_queue_size`; None values keep the defaults.
+    `incremental=True` syncs the folder against the ingestion manifest instead of
+    cleaning (unchanged files are skipped, modified replaced, deleted removed).
+    `include` / `exclude` globs and `max_file_size_mb` filter which folder files are ingested.
+    `llm_titles=True` enables background LLM titles for documents without a good local title.
+
+    Every run is checkpointed under `run_id` (generated when omitted). Pass `resume=RUN_ID`
+    to continue an interrupted or failed run with its original parameters: saved files are
+    skipped, embedded files reuse their embeddings, and a rebuild keeps filling the same
+    shadow tables. A single-document run (e.g. an API upload) that finishes without errors
+    deletes its checkpoint.
+
+    `workers > 1` shards the planned files across that many processes and merges their
+    results; each converts in-process, so `conversion_workers` is ignored.
+    `profile_dir` profiles the run and writes `profile.json` and `cpu.folded` there
+    (see profiling.py).
     """
     documents_dir: Optional[str]
     if document_path is None:
@@ -642,6 +1145,29 @@ async def run_ingestion(
     else:
         documents_dir = None
 
+    run_params = {
+        "document_path": document_path,
+        "documents": documents_dir,
+        "clean": not (no_clean or incremental),  # Clean by default
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "no_semantic": no_semantic,
+        "stage_concurrency": stage_concurrency,
+        "incremental": incremental,
+        "include": include,
+        "exclude": exclude,
+        "max_file_size_mb": max_file_size_mb,
+        "llm_titles": llm_titles,
+        "workers": workers,
+    }
+    if resume is not None:
+        checkpoint = RunCheckpoint.load(resume)
+        # A rebuild continues into the tables the interrupted run was writing (see _begin_rebuild)
+        run_params = checkpoint.params
+        checkpoint.update_run(status="running", resumed_at=datetime.now().isoformat())
+    else:
+        checkpoint = RunCheckpoint.create(run_params, run_id=run_id)
+
     # Configure logging
     log_level = logging.DEBUG if verbose else logging.INFO
     try:
@@ -656,63 +1182,190 @@ async def run_ingestion(
             format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         )
 
+    workers = max(1, run_params.get("workers") or 1)
+    if workers > 1:
+        # Conversion happens in the ingestion worker processes
+        configure_conversion_pool(0)
+    else:
+        if conversion_workers is not None:
+            configure_conversion_pool(conversion_workers)
+        # Load the Docling models in the workers while the folder is scanned
+        warm_conversion_pool()
+
     # Create ingestion configuration
     config = IngestionConfig(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        use_semantic_chunking=not no_semantic
+        chunk_size=run_params["chunk_size"],
+        chunk_overlap=run_params["chunk_overlap"],
+        use_semantic_chunking=not run_params["no_semantic"],
+        include_patterns=run_params["include"] or [],
+        exclude_patterns=run_params["exclude"] or [],
+        max_file_size_mb=run_params["max_file_size_mb"],
+        llm_title_enrichment=run_params["llm_titles"],
+        **{k: v for k, v in (run_params["stage_concurrency"] or {}).items() if v is not None}
     )
 
     # Create and run pipeline - clean by default unless --no-clean is specified
     pipeline = DocumentIngestionPipeline(
         config=config,
-        clean_before_ingest=not no_clean  # Clean by default
+        clean_before_ingest=run_params["clean"],
+        incremental=run_params["incremental"],
+        checkpoint=checkpoint
     )
+    print(f"Run ID: {checkpoint.run_id} (resume with --resume {checkpoint.run_id})")
     
-    def progress_callback(current: int, total: int):
-        print(f"Progress: {current}/{total} documents processed")
+    def progress_callback(current: int, discovered: int):
+        print(f"Progress: {current}/{discovered} documents processed")
+
+    profiler = IngestionProfiler(profile_dir) if profile_dir else None
+    if profiler is not None:
+        stage_callback = profiler.stage_callback(stage_callback)
+        profiler.start()
+    results: List[IngestionResult] = []
+    summary: Optional[IngestionSummary] = None
     
     try:
         start_time = datetime.now()
         
         results = await pipeline.ingest_documents(
-            document_path=document_path,
-            documents_folder=documents_dir,
+            document_path=run_params["document_path"],
+            documents_folder=run_params["documents"],
             progress_callback=progress_callback,
+            stage_callback=stage_callback,
+            workers=workers,
         )
+        checkpoint.update_run(status="completed", finished_at=datetime.now().isoformat())
         
         end_time = datetime.now()
         total_time = (end_time - start_time).total_seconds()
+        summary = summarize_results(results, total_time * 1000)
         
         # Print summary
         print("\n" + "="*50)
         print("INGESTION SUMMARY")
         print("="*50)
         print(f"Documents processed: {len(results)}")
+        if workers > 1:
+            print(f"Worker processes: {workers}")
+        if pipeline.rebuild_published:
+            print("Rebuild: new corpus generation published")
+        if pipeline.resumed_saved:
+            print(f"Already saved before resuming: {pipeline.resumed_saved}")
+        if pipeline.last_sync is not None:
+            sync = pipeline.last_sync.stats()
+            print(
+                f"Incremental sync: {sync['new']} new, {sync['modified']} modified, "
+                f"{sync['unchanged']} unchanged, {sync['deleted']} deleted"
+            )
         print(f"Document titles: {[r.title for r in results]}")
-        print(f"Total chunks created: {sum(r.chunks_created for r in results)}")
+        print(f"Total chunks created: {summary.chunks_created}")
         # Graph-related stats removed
-        print(f"Total errors: {sum(len(r.errors) for r in results)}")
+        print(f"Total errors: {summary.errors}")
         print(f"Total processing time: {total_time:.2f} seconds")
+        print(f"Bytes read: {summary.bytes_read:,}")
+        print(f"Tokens embedded: {summary.tokens_embedded:,}")
+        store_stats = pipeline.embedder.cache_stats()["store"]
+        if store_stats and store_stats["hits"] + store_stats["misses"]:
+            print(f"Embedding cache: {store_stats['hits']:,} hits, {store_stats['misses']:,} misses")
+        print(f"Throughput: {summary.chunks_per_second:.1f} chunks/sec")
+        print("Time per stage (summed over documents):")
+        for stage, ms in summary.stage_timings.model_dump().items():
+            print(f"  {stage[:-3]:<10} {ms / 1000:8.2f} s")
         print()
         
         # Print individual results
         for result in results:
             status = "✓" if not result.errors else "✗"
-            print(f"{status} {result.title}: {result.chunks_created} chunks")
+            stages = ", ".join(
+                f"{stage[:-3]} {ms:.0f}ms" for stage, ms in result.stage_timings.model_dump().items() if ms
+            )
+            print(f"{status} {result.title}: {result.chunks_created} chunks ({stages})")
             
             if result.errors:
                 for error in result.errors:
                     print(f"  Error: {error}")
         
     except KeyboardInterrupt:
+        checkpoint.update_run(status="interrupted")
         print("\nIngestion interrupted by user")
+        print(f"Resume with: --resume {checkpoint.run_id}")
     except Exception as e:
+            checkpoint.update_run(status="failed", error=str(e))
             logger.error(f"Ingestion failed: {e}")
             raise
     finally:
-        await pipeline.close()
+        if run_params["document_path"] is not None and summary is not None and not summary.errors:
+            # A single document ingested without errors leaves nothing to resume
+            checkpoint.discard()
+        else:
+            checkpoint.close()
+        if profiler is not None:
+            report_path = profiler.finish(results, summary)
+            print(f"Profile written to {report_path} (flamegraph input: {report_path.parent / 'cpu.folded'})")
+        if not keep_database_open:
+            await pipeline.close()
+
+    return results
+
+
+async def run_content_ingestion(
+    pages: AsyncIterator[Tuple[str, str]],
+    concurrency: int = 2,
+    result_callback: Optional[callable] = None,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    no_semantic: bool = False,
+) -> List[IngestionResult]:
+    """
+    Ingest (source, markdown) pairs as they are produced, e.g. pages coming out of a crawl.
+
+    Pages are consumed by `concurrency` tasks sharing one pipeline, so ingestion overlaps
+    with whatever produces the pages. The database pool is left open because this runs
+    next to other API jobs.
+
+    Args:
+        pages: Async iterator of (source, markdown_content) pairs
+        concurrency: Number of pages ingested at the same time
+        result_callback: Optional callback called with each IngestionResult
+    """
+    config = IngestionConfig(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        use_semantic_chunking=not no_semantic
+    )
+    pipeline = DocumentIngestionPipeline(config=config, clean_before_ingest=False)
+    await pipeline.initialize()
+
+    results: List[IngestionResult] = []
+    page_lock = asyncio.Lock()
+
+    async def consume():
+        while True:
+            # Async generators can't be advanced by two tasks at once
+            async with page_lock:
+                try:
+                    source, content = await pages.__anext__()
+                except StopAsyncIteration:
+                    return
+
+            try:
+                result = await pipeline.ingest_content(content, source=source)
+            except Exception as e:
+                logger.error(f"Failed to ingest {source}: {e}")
+                result = IngestionResult(
+                    document_id="",
+                    title=source,
+                    source=source,
+                    chunks_created=0,
+                    processing_time_ms=0,
+                    errors=[str(e)]
+                )
+
+            results.append(result)
+            if result_callback:
+                result_callback(result)
 
+    await asyncio.gather(*(consume() for _ in range(max(1, concurrency))))
+    await pipeline.drain_title_enrichment()
     return results
 
 
@@ -0,0 +1,206 @@
+"""
+Manifest of ingested source files, used for incremental folder sync.
+
+Every document ingested from a file gets a row in `ingestion_manifest` that maps
+(root, path, size, mtime, content hash) to its document id. A sync compares the
+folder against the manifest:
+
+- size and mtime unchanged: the file is skipped without being read
+- stat changed: the file is hashed and only re-ingested if its content changed,
+  replacing the previous document
+- manifest entries whose file no longer exists are removed with their document
+
+Rows reference `documents(id)` with ON DELETE CASCADE, so deleting a document
+also clears its entry. A full rebuild writes a new manifest together with the
+new documents (see generations.py).
+"""
+
+import os
+import asyncio
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+MANIFEST_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS ingestion_manifest (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    content_sha256 TEXT NOT NULL,
+    document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    ingested_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (root, path)
+)
+"""
+
+_manifest_table_ready = False
+
+
+@dataclass
+class FileState:
+    """Stat of a source file as seen by the current run."""
+    root: str  # folder the manifest entry belongs to
+    file_path: str  # absolute path
+    path: str  # path relative to the manifest root (also the document source)
+    size: int
+    mtime_ns: int
+    content_sha256: Optional[str] = None
+
+
+@dataclass
+class ManifestEntry:
+    """A manifest row: what was ingested for a path and which document holds it."""
+    path: str
+    size: int
+    mtime_ns: int
+    content_sha256: str
+    document_id: str
+
+
+@dataclass
+class SyncPlan:
+    """
+    What an incremental sync has to do for one folder.
+
+    Files are classified one at a time as discovery streams them in; deleted
+    files are only known once the whole folder has been seen (`finish`).
+    """
+    manifest: Dict[str, ManifestEntry]
+    changed: int = 0  # new or modified files to ingest
+    replaces: Dict[str, str] = field(default_factory=dict)  # path -> document id being replaced
+    touched: List[FileState] = field(default_factory=list)  # stat changed, content identical
+    unchanged: int = 0
+    deleted: List[ManifestEntry] = field(default_factory=list)
+    _seen: Set[str] = field(default_factory=set, repr=False)
+
+    async def classify(self, state: FileState, hash_file: Callable[[str], str]) -> bool:
+        """
+        Compare one file with its manifest entry.
+
+        Only files whose size or mtime changed are hashed; new files are hashed later
+        by the pipeline like any other document.
+
+        Args:
+            state: Current state of the file
+            hash_file: Function returning the hex SHA-256 of a file
+
+        Returns:
+            True if the file has to be ingested
+        """
+        self._seen.add(state.path)
+        entry = self.manifest.get(state.path)
+        if entry is None:
+            self.changed += 1
+            return True
+
+        if entry.size == state.size and entry.mtime_ns == state.mtime_ns:
+            self.unchanged += 1
+            return False
+
+        state.content_sha256 = await asyncio.to_thread(hash_file, state.file_path)
+        if state.content_sha256 == entry.content_sha256:
+            self.touched.append(state)
+            return False
+
+        self.changed += 1
+        self.replaces[state.path] = entry.document_id
+        return True
+
+    def finish(self) -> None:
+        """Mark every manifest entry that discovery did not see as deleted."""
+        self.deleted = [entry for path, entry in self.manifest.items() if path not in self._seen]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "new": self.changed - len(self.replaces),
+            "modified": len(self.replaces),
+            "unchanged": self.unchanged + len(self.touched),
+            "deleted": len(self.deleted),
+        }
+
+
+def stat_file(file_path: str, root: str) -> FileState:
+    """Collect the manifest key and stat fields for `file_path`."""
+    st = os.stat(file_path)
+    return FileState(
+        root=root,
+        file_path=file_path,
+        path=os.path.relpath(file_path, root),
+        size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+    )
+
+
+async def ensure_manifest_table(conn) -> None:
+    """Create the manifest table on first use (call before ingesting concurrently)."""
+    global _manifest_table_ready
+    if _manifest_table_ready:
+        return
+    await conn.execute(MANIFEST_TABLE_SQL)
+    _manifest_table_ready = True
+
+
+async def load_manifest(conn, root: str) -> Dict[str, ManifestEntry]:
+    """All manifest entries under `root`, keyed by relative path."""
+    await ensure_manifest_table(conn)
+    rows = await conn.fetch(
+        """
+        SELECT path, size, mtime_ns, content_sha256, document_id::text
+        FROM ingestion_manifest
+        WHERE root = $1
+        """,
+        root
+    )
+    return {
+        row["path"]: ManifestEntry(
+            path=row["path"],
+            size=row["size"],
+            mtime_ns=row["mtime_ns"],
+            content_sha256=row["content_sha256"],
+            document_id=row["document_id"],
+        )
+        for row in rows
+    }
+
+
+async def record_file(conn, state: FileState, document_id: str, table: str = "ingestion_manifest") -> None:
+    """Point the manifest entry for `state` at `document_id` (insert or replace)."""
+    await conn.execute(
+        f"""
+        INSERT INTO {table} (root, path, size, mtime_ns, content_sha256, document_id)
+        VALUES ($1, $2, $3, $4, $5, $6::uuid)
+        ON CONFLICT (root, path) DO UPDATE SET
+            size = EXCLUDED.size,
+            mtime_ns = EXCLUDED.mtime_ns,
+            content_sha256 = EXCLUDED.content_sha256,
+            document_id = EXCLUDED.document_id,
+            ingested_at = NOW()
+        """,
+        state.root,
+        state.path,
+        state.size,
+        state.mtime_ns,
+        state.content_sha256,
+        document_id
+    )
+
+
+async def refresh_stats(conn, states: List[FileState]) -> None:
+    """Store the new size/mtime of files whose content did not change."""
+    if not states:
+        return
+    await conn.executemany(
+        """
+        UPDATE ingestion_manifest SET size = $3, mtime_ns = $4
+        WHERE root = $1 AND path = $2
+        """,
+        [(s.root, s.path, s.size, s.mtime_ns) for s in states]
+    )
+
+
+async def delete_documents(conn, document_ids: List[str]) -> None:
+    """Delete documents with their chunks (manifest rows follow via ON DELETE CASCADE)."""
+    if not document_ids:
+        return
+    await conn.execute("DELETE FROM chunks WHERE document_id = ANY($1::uuid[])", document_ids)
+    await conn.execute("DELETE FROM documents WHERE id = ANY($1::uuid[])", document_ids)
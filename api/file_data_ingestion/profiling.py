@@ -0,0 +1,265 @@
+"""
+Profiling of ingestion runs (`ingest --profile DIR`).
+
+A run is profiled with three instruments:
+
+- a sampling profiler: a background thread records the Python stack of every
+  other thread at a fixed interval. Samples are wall-clock, so threads blocked
+  on the network or a lock show up too, under the frame they are waiting in.
+- tracemalloc: traced memory is recorded at every stage boundary (a document
+  entering converting / chunking / embedding / saving), and a full snapshot of
+  the top allocation sites is taken at boundaries at most every
+  `snapshot_interval` seconds, since each snapshot walks every live allocation.
+- per-file timings: the stage boundaries of each file relative to the start of
+  the run (so queueing between stages is visible), next to the time each stage
+  actually spent on the file.
+
+The output directory gets `profile.json` (the report) and `cpu.folded`, the
+samples in folded-stack format ("thread;frame;frame count" per line), which
+flamegraph.pl, speedscope and inferno read directly.
+
+Docling conversion runs in separate processes unless the conversion pool is
+disabled; pass `--conversion-workers 0` to see it in the stack samples.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+# Frames kept per traced allocation
+TRACEMALLOC_FRAMES = 10
+
+# Allocation sites listed per snapshot
+SNAPSHOT_TOP = 15
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Background thread that samples the Python stacks of all other threads."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        """
+        Initialize sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.stacks: Counter = Counter()  # "thread;outer;...;inner" -> samples
+        self.samples = 0
+        self.elapsed = 0.0  # Seconds the sampler ran
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def seconds_per_sample(self) -> float:
+        """Measured time between samples (the interval plus the cost of sampling)."""
+        return self.elapsed / self.samples if self.samples else self.interval
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        start = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(_frame_label(frame))
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+            self.elapsed = time.perf_counter() - start
+
+    def write_folded(self, path: Path) -> None:
+        """Write the samples in folded-stack format."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_frames(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Innermost frames with the most samples (self time), per thread."""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            leaves[(frames[0], frames[-1])] += count
+        return [
+            {"thread": thread, "frame": frame, "samples": count, "seconds": round(count * self.seconds_per_sample, 3)}
+            for (thread, frame), count in leaves.most_common(limit)
+        ]
+
+
+class IngestionProfiler:
+    """Collects CPU samples, memory and per-file stage timings for one ingestion run."""
+
+    def __init__(
+        self,
+        output_dir: str,
+        interval: float = SAMPLE_INTERVAL,
+        snapshot_interval: float = 1.0
+    ):
+        """
+        Initialize profiler.
+
+        Args:
+            output_dir: Directory the report and folded stacks are written to
+            interval: Seconds between stack samples
+            snapshot_interval: Minimum seconds between full tracemalloc snapshots
+        """
+        self.output_dir = Path(output_dir).expanduser()
+        self.snapshot_interval = snapshot_interval
+        self.sampler = StackSampler(interval)
+
+        self._start: Optional[float] = None
+        self._started_at: Optional[str] = None
+        self._last_snapshot = float("-inf")
+        self._started_tracemalloc = False
+        self._lock = threading.Lock()
+
+        self.boundaries: List[Dict[str, Any]] = []
+        self.snapshots: List[Dict[str, Any]] = []
+        self.files: Dict[str, List[List[Any]]] = defaultdict(list)  # path -> [[stage, seconds], ...]
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._started_at = datetime.now().isoformat()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self._snapshot("start")
+        self.sampler.start()
+
+    def stage_callback(self, forward: Optional[callable] = None) -> callable:
+        """
+        Stage callback for the pipeline that records each boundary before calling `forward`.
+        """
+        def callback(file_path: str, stage: str):
+            self.record_boundary(file_path, stage)
+            if forward:
+                forward(file_path, stage)
+        return callback
+
+    def record_boundary(self, file_path: str, stage: str) -> None:
+        elapsed = time.perf_counter() - self._start
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self.files[file_path].append([stage, round(elapsed, 4)])
+            self.boundaries.append({
+                "t": round(elapsed, 4),
+                "file": file_path,
+                "stage": stage,
+                "traced_bytes": current,
+                "traced_peak_bytes": peak,
+            })
+            take_snapshot = elapsed - self._last_snapshot >= self.snapshot_interval
+            if take_snapshot:
+                self._last_snapshot = elapsed
+        if take_snapshot:
+            self._snapshot(f"{stage} {os.path.basename(file_path)}")
+
+    def _snapshot(self, label: str) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        stats = snapshot.statistics("lineno")
+        self.snapshots.append({
+            "t": round(time.perf_counter() - self._start, 4),
+            "label": label,
+            "traced_bytes": sum(stat.size for stat in stats),
+            "top": [
+                {"site": str(stat.traceback[0]), "bytes": stat.size, "blocks": stat.count}
+                for stat in stats[:SNAPSHOT_TOP]
+            ],
+        })
+
+    def finish(self, results: List[Any], summary: Any = None) -> Path:
+        """
+        Stop sampling and write `profile.json` and `cpu.folded`.
+
+        Args:
+            results: IngestionResults of the run
+            summary: Optional IngestionSummary of the run
+
+        Returns:
+            Path of the JSON report
+        """
+        self.sampler.stop()
+        self._snapshot("end")
+        _, peak = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        folded_path = self.output_dir / "cpu.folded"
+        self.sampler.write_folded(folded_path)
+
+        files = []
+        for result in results:
+            files.append({
+                "source": result.source,
+                "title": result.title,
+                "chunks_created": result.chunks_created,
+                "bytes_read": result.bytes_read,
+                "processing_time_ms": result.processing_time_ms,
+                "stage_timings_ms": result.stage_timings.model_dump(),
+                "boundaries": self.files.get(result.source, []),
+                "errors": result.errors,
+            })
+        files.sort(key=lambda f: f["processing_time_ms"], reverse=True)
+
+        report = {
+            "started_at": self._started_at,
+            "wall_seconds": round(time.perf_counter() - self._start, 3),
+            "summary": summary.model_dump() if summary is not None else None,
+            "cpu": {
+                "interval_seconds": self.sampler.interval,
+                "seconds_per_sample": round(self.sampler.seconds_per_sample, 6),
+                "samples": self.sampler.samples,
+                "folded_stacks": folded_path.name,
+                "top_frames": self.sampler.top_frames(),
+            },
+            "memory": {
+                "traced_peak_bytes": peak,
+                "boundaries": self.boundaries,
+                "snapshots": self.snapshots,
+            },
+            "files": files,
+        }
+        report_path = self.output_dir / "profile.json"
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        logger.info(f"Wrote ingestion profile to {report_path}")
+        return report_path
@@ -0,0 +1,158 @@
+"""
+Streaming discovery of documents to ingest.
+
+One `os.scandir` walk over the documents tree matches supported extensions as it
+goes and yields files lazily, so ingestion starts on the first file instead of
+after the whole tree (possibly a slow network mount) has been listed and sorted.
+Entries are visited in name order within each directory, which keeps runs
+deterministic without holding the full listing in memory.
+"""
+
+import os
+import asyncio
+import logging
+from fnmatch import fnmatch
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, TypeVar
+
+from .manifest import FileState
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Docling + text formats + audio
+SUPPORTED_EXTENSIONS = frozenset({
+    ".md", ".markdown", ".txt",  # Text formats
+    ".pdf",  # PDF
+    ".docx", ".doc",  # Word
+    ".pptx", ".ppt",  # PowerPoint
+    ".xlsx", ".xls",  # Excel
+    ".html", ".htm",  # HTML
+    ".mp3", ".wav", ".m4a", ".flac",  # Audio formats
+})
+
+# Formats converted by Docling and transcribed audio formats; older runs wrote
+# "<name>-converted.md" next to both
+DOCLING_EXTENSIONS = ('.pdf', '.docx', '.doc', '.pptx', '.ppt', '.xlsx', '.xls', '.html', '.htm')
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.flac')
+
+
+def is_converted_side_file(file_path: str) -> bool:
+    """True for a leftover `<name>-converted.md` whose source document is still present."""
+    name = os.path.basename(file_path)
+    if not name.endswith("-converted.md"):
+        return False
+    base = os.path.join(os.path.dirname(file_path), name[:-len("-converted.md")])
+    return any(os.path.exists(base + ext) for ext in DOCLING_EXTENSIONS + AUDIO_EXTENSIONS)
+
+
+def _matches(relative_path: str, patterns: Sequence[str]) -> bool:
+    name = relative_path.rsplit("/", 1)[-1]
+    return any(fnmatch(relative_path, p) or fnmatch(name, p) for p in patterns)
+
+
+def scan_documents(
+    root: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    max_file_size: Optional[int] = None
+) -> Iterator[FileState]:
+    """
+    Walk `root` once and yield every supported document.
+
+    Patterns are shell globs matched against the path relative to `root` (with `/`
+    separators) or the bare file name. Excluded directories are not descended into.
+    Hidden files and directories are skipped.
+
+    Args:
+        root: Folder to scan
+        include: If given, only files matching one of these globs are yielded
+        exclude: Files and directories matching one of these globs are skipped
+        max_file_size: Skip files larger than this many bytes
+
+    Yields:
+        FileState of each matching file
+    """
+    include = list(include or [])
+    exclude = list(exclude or [])
+    stack = [root]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory {directory}: {e}")
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            relative_path = os.path.relpath(entry.path, root).replace(os.sep, "/")
+
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _matches(relative_path, exclude):
+                        subdirectories.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+
+            if os.path.splitext(entry.name)[1].lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            if include and not _matches(relative_path, include):
+                continue
+            if exclude and _matches(relative_path, exclude):
+                continue
+            if is_converted_side_file(entry.path):
+                continue
+
+            try:
+                st = entry.stat()
+            except OSError as e:
+                logger.warning(f"Skipping {entry.path}: {e}")
+                continue
+            if max_file_size is not None and st.st_size > max_file_size:
+                logger.info(f"Skipping {entry.path}: {st.st_size:,} bytes exceeds the size limit")
+                continue
+
+            yield FileState(
+                root=root,
+                file_path=entry.path,
+                path=os.path.relpath(entry.path, root),
+                size=st.st_size,
+                mtime_ns=st.st_mtime_ns,
+            )
+
+        # Pushed in reverse so directories are visited in name order
+        stack.extend(reversed(subdirectories))
+
+
+async def iterate_in_thread(iterator: Iterator[T], batch_size: int = 256) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterator from a worker thread, a batch at a time.
+
+    The first batch holds a single item and each batch doubles up to
+    `batch_size`, so the first item is yielded as soon as it is found while
+    long iterations still take few thread hops.
+    """
+    def next_batch(size: int) -> List[T]:
+        batch = []
+        for item in iterator:
+            batch.append(item)
+            if len(batch) >= size:
+                break
+        return batch
+
+    size = 1
+    while True:
+        batch = await asyncio.to_thread(next_batch, size)
+        if not batch:
+            return
+        for item in batch:
+            yield item
+        size = min(size * 2, batch_size)
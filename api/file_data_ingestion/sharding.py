@@ -0,0 +1,190 @@
+"""
+Multi-process ingestion (`ingest --workers N`).
+
+One process running the pipeline is limited to one core for Docling parsing,
+tokenization and JSON / vector serialization. With `--workers N` the planned
+files are split into N shards of about equal total size and each shard is
+ingested by its own process, with its own database pool and an in-process
+Docling converter.
+
+Everything that has to happen once per run stays in the parent: discovery,
+the incremental manifest sync, starting and publishing a blue/green rebuild
+and the run checkpoint's status. The workers only push their files through
+the pipeline, into whichever tables the parent chose, and record per-file
+progress in the same run checkpoint.
+"""
+
+import os
+import asyncio
+import heapq
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from .checkpoints import RunCheckpoint
+from .converter import configure_conversion_pool, warm_conversion_pool
+from .generations import CorpusTables
+from .manifest import FileState
+
+try:
+    from ..utils.db_utils import db_pool
+    from ..utils.models import IngestionConfig, IngestionResult
+except ImportError:
+    # For direct execution or testing
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.db_utils import db_pool
+    from utils.models import IngestionConfig, IngestionResult
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _init_worker
+_progress = None
+
+
+def shard_files(files: List[Tuple[FileState, Optional[str]]], shards: int) -> List[List[int]]:
+    """
+    Split files into at most `shards` groups of about equal total size.
+
+    Largest files are placed first, each on the lightest shard so far; within a
+    shard files keep their discovery order.
+
+    Returns:
+        Indexes into `files` per non-empty shard
+    """
+    heap = [(0, shard) for shard in range(max(1, shards))]
+    groups: List[List[int]] = [[] for _ in heap]
+    for index in sorted(range(len(files)), key=lambda i: files[i][0].size, reverse=True):
+        load, shard = heapq.heappop(heap)
+        groups[shard].append(index)
+        heapq.heappush(heap, (load + files[index][0].size, shard))
+    return [sorted(group) for group in groups if group]
+
+
+def _init_worker(progress, log_level: int, threads: int) -> None:
+    """Initializer for ingestion processes: logging, core split and the in-process converter."""
+    global _progress
+    _progress = progress
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    logging.basicConfig(
+        level=log_level,
+        format=f"%(asctime)s - [worker {os.getpid()}] %(name)s - %(levelname)s - %(message)s",
+    )
+    # The worker processes are the parallelism; a conversion pool per worker would oversubscribe
+    configure_conversion_pool(0)
+    warm_conversion_pool()
+
+
+def _run_shard(
+    config: IngestionConfig,
+    tables: CorpusTables,
+    run_id: Optional[str],
+    files: List[Tuple[FileState, Optional[str]]]
+) -> List[IngestionResult]:
+    return asyncio.run(_ingest_shard(config, tables, run_id, files))
+
+
+async def _ingest_shard(
+    config: IngestionConfig,
+    tables: CorpusTables,
+    run_id: Optional[str],
+    files: List[Tuple[FileState, Optional[str]]]
+) -> List[IngestionResult]:
+    # Imported here: ingest imports this module
+    from .ingest import DocumentIngestionPipeline
+
+    # A worker needs connections for its save workers, the title enricher and little else
+    db_pool.min_size = 1
+    db_pool.max_size = config.save_concurrency + 2
+
+    checkpoint = RunCheckpoint.load(run_id) if run_id else None
+    pipeline = DocumentIngestionPipeline(config=config, clean_before_ingest=False, checkpoint=checkpoint)
+    try:
+        return await pipeline.ingest_files(
+            files,
+            tables=tables,
+            progress_callback=lambda completed, discovered: _progress.put(1)
+        )
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        await pipeline.close()
+
+
+async def ingest_in_processes(
+    config: IngestionConfig,
+    files: List[Tuple[FileState, Optional[str]]],
+    workers: int,
+    tables: CorpusTables,
+    run_id: Optional[str] = None,
+    progress_callback: Optional[callable] = None
+) -> List[IngestionResult]:
+    """
+    Ingest planned files in `workers` processes and merge their results.
+
+    Args:
+        config: Ingestion configuration used by every worker
+        files: (file, id of the document it replaces) pairs to ingest
+        workers: Number of worker processes
+        tables: Tables the documents are written to
+        run_id: Run checkpoint the workers record per-file progress in
+        progress_callback: Optional callback called as (completed, total)
+
+    Returns:
+        Results in the order of `files`
+
+    Raises:
+        RuntimeError: If a shard failed. A shard that raises lets the other shards
+            finish, but a worker process that dies (OOM, a crash in Docling) breaks
+            the process pool and aborts every shard still running. Either way nothing
+            is published, and files saved so far are skipped by `--resume`.
+    """
+    shards = shard_files(files, workers)
+    if not shards:
+        return []
+
+    ctx = multiprocessing.get_context("spawn")
+    progress = ctx.Queue()
+    completed = 0
+
+    async def report():
+        nonlocal completed
+        while await asyncio.to_thread(progress.get) is not None:
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, len(files))
+
+    logger.info(f"Ingesting {len(files)} files in {len(shards)} worker processes")
+    loop = asyncio.get_running_loop()
+    # Spawn rather than fork: the parent has running threads (event loop, DB pool)
+    with ProcessPoolExecutor(
+        max_workers=len(shards),
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(progress, logging.getLogger().getEffectiveLevel(), max(1, (os.cpu_count() or 1) // len(shards))),
+    ) as executor:
+        reporter = asyncio.create_task(report())
+        try:
+            outcomes = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, _run_shard, config, tables, run_id, [files[i] for i in shard])
+                    for shard in shards
+                ),
+                return_exceptions=True
+            )
+        finally:
+            progress.put(None)
+            await reporter
+
+    failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)} of {len(shards)} ingestion workers failed: {failures[0]}"
+        ) from failures[0]
+
+    results: List[Optional[IngestionResult]] = [None] * len(files)
+    for shard, shard_results in zip(shards, outcomes):
+        for index, result in zip(shard, shard_results):
+            results[index] = result
+    return results
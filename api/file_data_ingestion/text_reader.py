@@ -0,0 +1,224 @@
+"""
+Single-pass reading of text documents.
+
+Text files (.md, .markdown, .txt) are read in fixed-size blocks. One pass over
+the blocks counts lines, words and characters and keeps the head of the file,
+which is all that frontmatter parsing and title extraction look at. Files up to
+a size limit are also kept as one string; larger ones are never held in memory
+whole. Their content is streamed into Postgres with COPY, and their chunks are
+cut from a fresh block stream (see the chunkers' `iter_chunks`).
+
+Strings that are already in memory (Docling output, transcripts, crawled pages)
+go through the same profiler, so metadata is computed the same way for both.
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Characters read per block
+BLOCK_CHARS = 64 * 1024
+
+# Characters kept from the start of a document for frontmatter and title extraction
+HEAD_CHARS = 64 * 1024
+
+# Encodings tried in order; latin-1 decodes any byte sequence
+TEXT_ENCODINGS = ("utf-8", "latin-1")
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class TextProfile:
+    """What the pipeline needs to know about a text without keeping all of it."""
+    char_count: int = 0
+    line_count: int = 1
+    word_count: int = 0
+    head: str = ""  # First HEAD_CHARS characters
+    encoding: str = "utf-8"
+
+
+class TextProfiler:
+    """Accumulates a TextProfile from consecutive blocks of one text."""
+
+    def __init__(self, encoding: str = "utf-8"):
+        self.profile = TextProfile(encoding=encoding)
+        self._head: List[str] = []
+        self._head_chars = 0
+        self._in_word = False  # Previous block ended inside a word
+
+    def feed(self, block: str) -> None:
+        if not block:
+            return
+        profile = self.profile
+        profile.char_count += len(block)
+        profile.line_count += block.count("\n")
+
+        words = len(block.split())
+        # A word cut in two by the block boundary was counted twice
+        if self._in_word and not block[0].isspace():
+            words -= 1
+        profile.word_count += words
+        self._in_word = not block[-1].isspace()
+
+        if self._head_chars < HEAD_CHARS:
+            piece = block[:HEAD_CHARS - self._head_chars]
+            self._head.append(piece)
+            self._head_chars += len(piece)
+
+    def finish(self) -> TextProfile:
+        self.profile.head = "".join(self._head)
+        self._head = []
+        return self.profile
+
+
+def profile_text(content: str) -> TextProfile:
+    """Profile a string that is already in memory."""
+    profiler = TextProfiler()
+    for start in range(0, len(content), BLOCK_CHARS):
+        profiler.feed(content[start:start + BLOCK_CHARS])
+    return profiler.finish()
+
+
+def iter_text_file(file_path: str, encoding: str = "utf-8", block_chars: int = BLOCK_CHARS) -> Iterator[str]:
+    """Yield the decoded text of a file in blocks of `block_chars` characters."""
+    with open(file_path, "r", encoding=encoding) as f:
+        while True:
+            block = f.read(block_chars)
+            if not block:
+                return
+            yield block
+
+
+def read_text_file(file_path: str, max_inline_chars: int) -> Tuple[TextProfile, Optional[str]]:
+    """
+    Profile a text file in one pass.
+
+    Args:
+        file_path: Text file to read
+        max_inline_chars: Also return the content if it is at most this many characters
+
+    Returns:
+        Tuple of (profile, content or None for files too large to keep in memory)
+    """
+    for encoding in TEXT_ENCODINGS:
+        profiler = TextProfiler(encoding)
+        blocks: Optional[List[str]] = []
+        try:
+            for block in iter_text_file(file_path, encoding):
+                profiler.feed(block)
+                if blocks is not None:
+                    if profiler.profile.char_count <= max_inline_chars:
+                        blocks.append(block)
+                    else:
+                        blocks = None
+        except UnicodeDecodeError:
+            continue
+        return profiler.finish(), "".join(blocks) if blocks is not None else None
+
+    raise ValueError(f"Could not decode {file_path}")
+
+
+def head_lines(text: str, count: int) -> List[str]:
+    """First `count` lines of `text`, without splitting the rest of it."""
+    lines = []
+    start = 0
+    while len(lines) < count and start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            end = len(text)
+        lines.append(text[start:end].rstrip("\r"))
+        start = end + 1
+    return lines
+
+
+def parse_frontmatter(head: str) -> Dict[str, Any]:
+    """YAML frontmatter at the start of a document, or {} if there is none."""
+    if not head.startswith("---"):
+        return {}
+    try:
+        import yaml
+        end_marker = head.find("\n---\n", 4)
+        if end_marker == -1:
+            return {}
+        frontmatter = yaml.safe_load(head[4:end_marker])
+        return frontmatter if isinstance(frontmatter, dict) else {}
+    except ImportError:
+        logger.warning("PyYAML not installed, skipping frontmatter extraction")
+    except Exception as e:
+        logger.warning(f"Failed to parse frontmatter: {e}")
+    return {}
+
+
+def sliding_windows(
+    blocks: Iterable[str],
+    chunk_size: int,
+    overlap: int,
+    min_chunk_size: int
+) -> Iterator[Tuple[int, int, str]]:
+    """
+    Cut a text into overlapping windows of about `chunk_size` characters.
+
+    A window is ended at the last sentence or line break in its final 200
+    characters, if there is one. Only the current window and one block are held
+    in memory.
+
+    Yields:
+        (start_char, end_char, text) of each window
+    """
+    blocks = iter(blocks)
+    buffer = ""
+    offset = 0  # Position of buffer[0] in the whole text
+    eof = False
+    start = 0
+
+    while True:
+        # The window decision looks at one character past start + chunk_size
+        while not eof and offset + len(buffer) <= start + chunk_size:
+            block = next(blocks, None)
+            if block is None:
+                eof = True
+            else:
+                buffer += block
+        length = offset + len(buffer)  # Whole text once eof is set
+        if start >= length:
+            return
+
+        end = start + chunk_size
+        if end >= length:
+            # Last window
+            text = buffer[start - offset:]
+        else:
+            chunk_end = end
+            for i in range(end, max(start + min_chunk_size, end - 200), -1):
+                if buffer[i - offset] in '.!?\n':
+                    chunk_end = i + 1
+                    break
+            text = buffer[start - offset:chunk_end - offset]
+            end = chunk_end
+
+        yield start, end, text
+
+        start = end - overlap
+        # Drop the consumed prefix once it makes up half the buffer
+        if start - offset > len(buffer) // 2:
+            buffer = buffer[start - offset:]
+            offset = start
+
+
+def iter_paragraphs(blocks: Iterable[str]) -> Iterator[str]:
+    """
+    Split a text into paragraphs at blank lines, like `re.split(r'\\n\\s*\\n', text)`.
+
+    A break that straddles two blocks can leave whitespace-only pieces behind;
+    callers strip paragraphs and skip empty ones.
+    """
+    carry = ""
+    for block in blocks:
+        pieces = _PARAGRAPH_BREAK.split(carry + block)
+        carry = pieces.pop()
+        yield from pieces
+    yield carry
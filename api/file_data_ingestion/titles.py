@@ -0,0 +1,291 @@
+"""
+Document titles.
+
+Titles are extracted locally on the CPU, in order of preference:
+
+1) the title item of the DoclingDocument
+2) the first markdown heading ('# ', then '## ', then '### ') in the first 70 lines
+3) the first heading-like line (short, no trailing punctuation)
+4) the top keyphrases of the text
+5) the file name
+
+Documents that only got a weak title (3-5) can optionally be enriched by an LLM.
+`TitleEnricher` collects them in the background and asks for titles in
+batches, updating `documents.title` and the title in the metadata of the
+document's chunks after the document has been saved, so the LLM round trip
+never holds up ingestion.
+"""
+
+import os
+import re
+import json
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from typing import Any, List, Optional, Tuple
+
+from .text_reader import head_lines
+
+logger = logging.getLogger(__name__)
+
+# Title sources that are worth replacing with an LLM title
+WEAK_TITLE_SOURCES = frozenset({"line", "keyphrases", "filename"})
+
+# Characters of content sent to the LLM per document
+TITLE_SNIPPET_CHARS = 2000
+
+_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc few for from
+further had has have having he her here hers herself him himself his how however i if in into is
+it its itself just let may me might more most must my myself no nor not now of off on once only or
+other our ours ourselves out over own per same shall she should so some such than that the their
+theirs them themselves then there these they this those through to too under until up upon us
+use used using very via was we were what when where whether which while who whom why will with
+within without would yet you your yours yourself yourselves page pages figure table see also new
+one two three first second
+""".split())
+
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9'\-]*")
+_PHRASE_BREAK = re.compile(r"[.!?,;:()\[\]{}\"|/\\\n\t]+|\s-\s")
+
+
+def _docling_title(docling_doc: Any) -> Optional[str]:
+    for item in getattr(docling_doc, "texts", [])[:50]:
+        if getattr(item, "label", None) == "title":
+            text = (getattr(item, "text", "") or "").strip()
+            if text:
+                return text
+    return None
+
+
+def _markdown_heading(lines: List[str]) -> Optional[str]:
+    for prefix in ("# ", "## ", "### "):
+        for line in lines:
+            s = line.strip()
+            if s.startswith(prefix) and s[len(prefix):].strip():
+                return s[len(prefix):].strip()
+    return None
+
+
+def _heading_like_line(lines: List[str]) -> Optional[str]:
+    """First short line that reads like a heading rather than a sentence."""
+    for line in lines:
+        s = line.strip().strip("#*_ ").strip()
+        if not s or s.startswith(("[time:", "|", "!", "<", "-", "---")):
+            continue
+        words = s.split()
+        if not 2 <= len(words) <= 12 or len(s) > 100:
+            continue
+        if s[-1] in ".,;:!?":
+            continue
+        if sum(c.isalpha() for c in s) < 0.6 * len(s):
+            continue
+        return s
+    return None
+
+
+def _keyphrase_title(content: str, max_words: int = 4) -> Optional[str]:
+    """
+    Best keyphrase of the text (RAKE-style).
+
+    Candidate phrases are runs of non-stopwords; each word is scored by
+    degree / frequency and a phrase by the sum of its words, weighted by how
+    often the phrase occurs.
+    """
+    phrases: List[Tuple[str, ...]] = []
+    for fragment in _PHRASE_BREAK.split(content[:20000]):
+        current: List[str] = []
+        for word in _WORD.findall(fragment):
+            lower = word.lower()
+            if lower in _STOPWORDS or len(lower) < 3:
+                if current:
+                    phrases.append(tuple(current))
+                current = []
+            else:
+                current.append(lower)
+        if current:
+            phrases.append(tuple(current))
+
+    phrases = [p for p in phrases if len(p) <= max_words]
+    if not phrases:
+        return None
+
+    frequency: Counter = Counter()
+    degree: defaultdict = defaultdict(int)
+    for phrase in phrases:
+        for word in phrase:
+            frequency[word] += 1
+            degree[word] += len(phrase)
+
+    counts = Counter(phrases)
+    best = max(counts, key=lambda p: (sum(degree[w] / frequency[w] for w in p) * counts[p], len(p)))
+    return " ".join(word.capitalize() for word in best)
+
+
+def extract_title(content: str, file_path: str, docling_doc: Any = None) -> Tuple[str, str]:
+    """
+    Extract a title without any network calls.
+
+    Args:
+        content: Markdown content of the document
+        file_path: Source path (or URL), used for the last-resort fallback
+        docling_doc: Optional DoclingDocument of the source
+
+    Returns:
+        Tuple of (title, source) where source is one of
+        "docling", "heading", "line", "keyphrases" or "filename"
+    """
+    if docling_doc is not None:
+        title = _docling_title(docling_doc)
+        if title:
+            return title, "docling"
+
+    lines = head_lines(content, 70)
+
+    title = _markdown_heading(lines)
+    if title:
+        return title, "heading"
+
+    title = _heading_like_line(lines[:40])
+    if title:
+        return title, "line"
+
+    title = _keyphrase_title(content)
+    if title:
+        return title, "keyphrases"
+
+    return os.path.splitext(os.path.basename(file_path))[0], "filename"
+
+
+class TitleEnricher:
+    """Background task that replaces weak titles with LLM titles, several documents per request."""
+
+    def __init__(
+        self,
+        client,
+        db_pool,
+        model: Optional[str] = None,
+        batch_size: int = 10,
+        max_wait_seconds: float = 2.0,
+        documents_table: str = "documents",
+        chunks_table: str = "chunks"
+    ):
+        """
+        Initialize enricher.
+
+        Args:
+            client: AsyncOpenAI client
+            db_pool: DatabasePool used to update the titles
+            model: Chat model (default: LLM_MODEL or gpt-4o-mini)
+            batch_size: Documents titled per LLM request
+            max_wait_seconds: How long a partial batch waits for more documents
+            documents_table: Table holding the documents (the shadow table during a rebuild)
+            chunks_table: Table holding the chunks (the shadow table during a rebuild)
+        """
+        self.client = client
+        self.db_pool = db_pool
+        self.model = model or os.getenv("LLM_MODEL", "gpt-4o-mini")
+        self.batch_size = batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.documents_table = documents_table
+        self.chunks_table = chunks_table
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.enriched = 0
+        self.failed = 0
+
+    def submit(self, document_id: str, content: str) -> None:
+        """Queue a saved document for an LLM title."""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(), name="title-enricher")
+        self._queue.put_nowait((document_id, content[:TITLE_SNIPPET_CHARS]))
+
+    async def drain(self) -> None:
+        """Wait until every queued document has been titled."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = loop.time() + self.max_wait_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+
+            try:
+                await self._enrich(batch)
+            except Exception as e:
+                logger.warning(f"LLM title enrichment failed for {len(batch)} documents: {e}")
+                self.failed += len(batch)
+
+    async def _enrich(self, batch: List[Tuple[str, str]]) -> None:
+        system_prompt = """You are a helpful assistant.
+        You generate a short title for each of the given document snippets.
+        The short title should always be a short word phrase summarizing the overall topic of the document.
+        You always return only a JSON object with exactly a single key: 'titles', whose value maps each
+        document number (as a string) to its generated title.
+        """
+        documents = "\n\n".join(
+            f"Document {i}:\n{snippet}" for i, (_, snippet) in enumerate(batch, start=1)
+        )
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Generate a short meaningful title for each document:\n\n{documents}"}
+            ],
+            response_format={"type": "json_object"}
+        )
+        titles = json.loads(response.choices[0].message.content).get("titles") or {}
+
+        updates = []
+        for i, (document_id, _) in enumerate(batch, start=1):
+            title = titles.get(str(i))
+            if isinstance(title, str) and title.strip():
+                updates.append((document_id, title.strip()))
+        self.failed += len(batch) - len(updates)
+        if not updates:
+            return
+
+        # One statement per document, so a search never sees the new title on the
+        # document but the old one on its chunks
+        async with self.db_pool.acquire() as conn:
+            await conn.executemany(
+                f"""
+                WITH document AS (
+                    UPDATE {self.documents_table}
+                    SET title = $2,
+                        metadata = metadata::jsonb || '{{"title_source": "llm"}}'::jsonb,
+                        updated_at = NOW()
+                    WHERE id = $1::uuid
+                    RETURNING id
+                )
+                UPDATE {self.chunks_table}
+                SET metadata = metadata::jsonb || jsonb_build_object('title', $2::text)
+                WHERE document_id IN (SELECT id FROM document)
+                """,
+                updates
+            )
+        self.enriched += len(updates)
+        logger.info(f"Updated {len(updates)} document titles from the LLM")
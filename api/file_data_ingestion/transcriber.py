@@ -0,0 +1,128 @@
+"""
+Whisper transcription helpers executed inside the conversion workers.
+
+Long recordings are decoded once, split at quiet points into segments of about
+TRANSCRIBE_SEGMENT_SECONDS (default 120), and the segments are transcribed in
+parallel by the conversion pool. Each worker loads the Whisper model
+(WHISPER_MODEL, default "turbo") once and keeps it for every later segment.
+Segment timestamps are shifted back onto the recording's timeline when the
+transcript is stitched together.
+"""
+
+import os
+import logging
+import tempfile
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000  # Whisper's input rate
+
+_model_lock = threading.Lock()
+
+
+def get_segment_seconds() -> float:
+    return float(os.getenv("TRANSCRIBE_SEGMENT_SECONDS", "120"))
+
+
+@lru_cache(maxsize=1)
+def get_whisper_model():
+    """This process's Whisper model, loaded on first use."""
+    import whisper
+
+    name = os.getenv("WHISPER_MODEL", "turbo")
+    logger.info(f"Loading Whisper model {name}")
+    return whisper.load_model(name, device="cpu")
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    segment_seconds: float,
+    search_seconds: float = 20.0,
+    frame_seconds: float = 0.03
+) -> List[Tuple[int, int]]:
+    """
+    Split audio into segments of roughly `segment_seconds`, cutting at quiet points.
+
+    Each cut is placed at the lowest-energy spot in the `search_seconds` before the
+    target length, so segments end in a pause rather than mid-word.
+
+    Returns:
+        (start_sample, end_sample) pairs covering the whole recording
+    """
+    total = len(audio)
+    segment = int(segment_seconds * SAMPLE_RATE)
+    # Don't leave a short tail segment behind; one slightly longer segment is cheaper
+    if total <= segment * 1.25:
+        return [(0, total)]
+
+    frame = max(1, int(frame_seconds * SAMPLE_RATE))
+    frames = total // frame
+    framed = audio[:frames * frame].reshape(frames, frame)
+    energy = np.einsum("ij,ij->i", framed, framed) / frame
+
+    # Smooth over ~0.3 s so a single quiet frame inside a word doesn't win
+    window = max(1, int(0.3 / frame_seconds))
+    energy = np.convolve(energy, np.ones(window) / window, mode="same")
+
+    search = int(min(search_seconds, segment_seconds / 2) * SAMPLE_RATE)
+    boundaries = [0]
+    start = 0
+    while total - start > segment * 1.25:
+        lo = (start + segment - search) // frame
+        hi = (start + segment) // frame
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * frame + frame // 2
+        boundaries.append(cut)
+        start = cut
+    boundaries.append(total)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def prepare_audio_sync(file_path: str) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Decode an audio file and plan its segments.
+
+    The decoded samples are written to a temporary .npy file that the segment
+    workers memory-map, so the audio isn't pickled to every worker.
+
+    Returns:
+        Tuple of (path of the .npy file, segment boundaries in samples)
+    """
+    import whisper
+
+    audio = whisper.load_audio(file_path, sr=SAMPLE_RATE)
+    fd, samples_path = tempfile.mkstemp(prefix="transcribe-", suffix=".npy")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, audio)
+    return samples_path, split_on_silence(audio, get_segment_seconds())
+
+
+def transcribe_segment_sync(samples_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """
+    Transcribe samples[start:end] of a prepared recording.
+
+    Returns:
+        Whisper segments as {"start", "end", "text"} with times relative to the whole recording
+    """
+    audio = np.load(samples_path, mmap_mode="r")[start:end]
+    model = get_whisper_model()
+    # Serializes use of the model when segments run in threads instead of processes
+    with _model_lock:
+        result = model.transcribe(np.ascontiguousarray(audio), fp16=False)
+
+    offset = start / SAMPLE_RATE
+    return [
+        {"start": s["start"] + offset, "end": s["end"] + offset, "text": s["text"].strip()}
+        for s in result.get("segments", [])
+        if s["text"].strip()
+    ]
+
+
+def format_transcript(segments: List[Dict[str, Any]]) -> str:
+    """Markdown transcript with one timestamped line per Whisper segment."""
+    return "\n\n".join(f"[time: {s['start']:.2f}-{s['end']:.2f}] {s['text']}" for s in segments)
@@ -1,67 +1,184 @@
-from unittest import result
 from fastapi import FastAPI  # type: ignore
-from fastapi import BackgroundTasks, HTTPException  # type: ignore
+from fastapi import HTTPException  # type: ignore
 from fastapi import UploadFile, File  # type: ignore
 from fastapi.responses import PlainTextResponse  # type: ignore
 from fastapi.responses import JSONResponse  # type: ignore
+from fastapi.responses import StreamingResponse  # type: ignore
 from pydantic import BaseModel  # type: ignore
-from openai import OpenAI  # type: ignore
-from supabase import create_client, Client
-from openai import AsyncOpenAI
 
 from dotenv import load_dotenv
 from pathlib import Path
 import os
+import sys
+import json
 import asyncio
+import hashlib
+import time
+import logging
 from uuid import uuid4
 from fastapi.middleware.cors import CORSMiddleware
 
-from . import rag_agent_web
+# Only the query path is imported eagerly. The web crawler (crawl4ai/playwright), the
+# ingestion pipeline (docling/transformers), the document converters, the ingestion
+# database pool and the web agent (logfire/langsmith) are imported on first use, which
+# keeps cold start of a fresh replica short without slowing down the first question.
+# `python benchmarks/import_time.py` measures the import cost and the first request.
 from . import rag_agent_file
-from . import web_data_ingestion
-from .file_data_ingestion import ingest as file_data_ingest
+from .answer_cache import CacheProbe, SemanticAnswerCache
+from .ingest_scheduler import IngestJob, IngestScheduler, QueueFullError
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 load_dotenv(ROOT_DIR / ".env")
 
-# api_key = os.getenv("OPENAI_API_KEY")
-# client = OpenAI(api_key=api_key)
+logger = logging.getLogger(__name__)
 
-openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-supabase: Client = Client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_SERVICE_KEY")
-)
 
-# Prepare dependencies
-DEPS = rag_agent_web.PydanticAIDeps(
-    supabase=supabase,
-    openai_client=openai_client
-)
+async def _embed_question(text: str) -> list[float]:
+    # Same embedder as the search tool, so a cached answer's question and the
+    # retrieval that follows a miss share one embedding cache
+    return await rag_agent_file._query_embedder().embed_query(text)
+
 
 app = FastAPI()
 
-_INGEST_JOBS: dict[str, dict[str, str]] = {}
-_INGEST_LOCK = asyncio.Lock()
+# Similar questions are answered from this cache; cleared whenever an ingestion job
+# changes the corpus. Tuned with ANSWER_CACHE_* env vars.
+_ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+_ANSWER_CACHE = SemanticAnswerCache.from_env(embed=_embed_question)
+
+# Worker count and queue size come from INGEST_WORKERS / INGEST_QUEUE_SIZE.
+_INGEST_SCHEDULER = IngestScheduler.from_env()
+
+# Crawled pages waiting for ingestion, and how many pages are ingested at once
+_WEB_PAGE_BUFFER = int(os.getenv("WEB_INGEST_PAGE_BUFFER", "20"))
+_WEB_INGEST_CONCURRENCY = int(os.getenv("WEB_INGEST_CONCURRENCY", "2"))
+
+# Work avoided by returning an existing document for a re-uploaded file
+_DEDUP_STATS = {"uploads": 0, "deduplicated": 0, "bytes_saved": 0, "embeddings_saved": 0}
+
+
+async def _run_ingest_file_job(job: IngestJob) -> None:
+    from .file_data_ingestion import ingest as file_data_ingest
+
+    document_path = job.info.get("document_path")
+    resume = job.info.get("resume")
+    if not document_path and not resume:
+        raise ValueError("Missing document_path for ingestion job")
+
+    # Jobs run concurrently and share the database pool, so it must stay open between runs.
+    # The job id doubles as the run id, so a failed job can be resumed by its id.
+    start = time.perf_counter()
+    results = await file_data_ingest.run_ingestion(
+        document_path=document_path,
+        stage_callback=lambda _file_path, stage: job.set_stage(stage),
+        keep_database_open=True,
+        run_id=job.job_id,
+        resume=resume,
+    )
+    summary = file_data_ingest.summarize_results(results, (time.perf_counter() - start) * 1000)
+    job.info["summary"] = summary.model_dump()
+    _invalidate_answers_if_changed(results)
+
+
+async def _run_ingest_web_job(job: IngestJob) -> None:
+    """Crawl a site and ingest each page as soon as it has been crawled."""
+    from . import web_data_ingestion
+    from .file_data_ingestion import ingest as file_data_ingest
+
+    # The sitemap fetch uses blocking `requests`
+    urls = await asyncio.to_thread(web_data_ingestion.get_pydantic_ai_docs_urls, job.info["url"])
+    if not urls:
+        raise ValueError("No URLs found to crawl. Please enter a valid URL.")
+
+    for counter in ("discovered", "crawled", "failed", "chunks", "embedded"):
+        job.counters[counter] = 0
+    job.increment("discovered", len(urls))
+    job.set_stage("crawling")
+
+    # Bounded so a fast crawler waits for ingestion instead of buffering the whole site
+    pages: asyncio.Queue = asyncio.Queue(maxsize=_WEB_PAGE_BUFFER)
+
+    async def on_page(url: str, markdown: str | None, error: str | None) -> None:
+        if markdown is None:
+            job.increment("failed")
+            return
+        job.increment("crawled")
+        await pages.put((url, markdown))
+
+    async def crawl() -> None:
+        try:
+            job.info["markdown_path"] = await web_data_ingestion.crawl_urls(urls, page_callback=on_page)
+        finally:
+            await pages.put(None)
+
+    async def crawled_pages():
+        while (item := await pages.get()) is not None:
+            yield item
+
+    def on_result(result) -> None:
+        job.increment("chunks", result.chunks_created)
+        job.increment("embedded", result.chunks_embedded)
+
+    start = time.perf_counter()
+    crawl_task = asyncio.create_task(crawl())
+    try:
+        results = await file_data_ingest.run_content_ingestion(
+            crawled_pages(),
+            concurrency=_WEB_INGEST_CONCURRENCY,
+            result_callback=on_result,
+        )
+        await crawl_task
+    finally:
+        crawl_task.cancel()
+
+    summary = file_data_ingest.summarize_results(results, (time.perf_counter() - start) * 1000)
+    job.info["summary"] = summary.model_dump()
+    _invalidate_answers_if_changed(results)
 
 
-async def _run_ingest_file_job(job_id: str) -> None:
-    job = _INGEST_JOBS.get(job_id)
-    if job is None:
-        return
+def _invalidate_answers_if_changed(results) -> None:
+    if any(result.document_id for result in results):
+        _ANSWER_CACHE.invalidate()
+
 
-    job["status"] = "running"
+@app.on_event("startup")
+async def _warm_converters() -> None:
+    # Opt-in: starts the Docling worker processes (and their models) with the API
+    if os.getenv("DOCLING_WARM_ON_STARTUP", "false").strip().lower() in {"1", "true", "yes", "on"}:
+        from .file_data_ingestion.converter import warm_conversion_pool
+        warm_conversion_pool()
 
+
+_background_tasks: set = set()
+
+
+async def _build_content_hash_index() -> None:
     try:
-        async with _INGEST_LOCK:
-            document_path = job.get("document_path")
-            if not document_path:
-                raise ValueError("Missing document_path for ingestion job")
-            await file_data_ingest.run_ingestion(document_path=document_path)
-        job["status"] = "succeeded"
+        from .utils.db_utils import ensure_content_hash_index
+        await ensure_content_hash_index()
     except Exception as err:
-        job["status"] = "failed"
-        job["error"] = str(err)
+        # Upload dedup still works without it, just with a sequential scan; retried on next start
+        logger.warning(f"Could not create the content hash index: {err}")
+
+
+@app.on_event("startup")
+async def _start_content_hash_index() -> None:
+    # In the background: building the index on a large table must not hold up startup
+    task = asyncio.create_task(_build_content_hash_index())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@app.on_event("shutdown")
+async def _shutdown_ingestion() -> None:
+    await _INGEST_SCHEDULER.shutdown()
+    # Only what was loaded needs closing; importing it here would only create it
+    db_utils = sys.modules.get(f"{__package__}.utils.db_utils")
+    if db_utils is not None:
+        await db_utils.close_database()
+    converter = sys.modules.get(f"{__package__}.file_data_ingestion.converter")
+    if converter is not None:
+        converter.shutdown_conversion_pool()
 
 
 class IdeaRequest(BaseModel):
@@ -101,10 +218,7 @@ app.add_middleware(
     allow_headers=["*"],      # IMPORTANT for JSON requests (Content-Type)
 )
 
-@app.post("/api", response_class=PlainTextResponse)
-async def idea(payload: IdeaRequest):
-
-    response = await rag_agent_file.agent.run(payload.text, deps=DEPS)
+def _response_text(response) -> str:
     if hasattr(response, "data"):
         return str(response.data)
     for attr in ("output", "output_text", "text"):
@@ -113,21 +227,137 @@ async def idea(payload: IdeaRequest):
     return str(response)
 
 
-@app.post("/ingest", response_class=PlainTextResponse)
+def _sse_event(data: dict, event: str | None = None) -> str:
+    """Format one Server-Sent Events message."""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+@app.post("/api", response_class=PlainTextResponse)
+async def idea(payload: IdeaRequest):
+    start = time.perf_counter()
+
+    cached, probe = await _lookup_cached_answer(payload.text)
+    if cached is not None:
+        total_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"/api answered from cache in {total_ms:.0f} ms")
+        return PlainTextResponse(
+            cached,
+            headers={"Server-Timing": f"total;dur={total_ms:.1f}", "X-Answer-Cache": "hit"},
+        )
+
+    response = await rag_agent_file.agent.run(payload.text)
+    answer = _response_text(response)
+    if probe is not None:
+        _ANSWER_CACHE.store(probe, answer)
+
+    total_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"/api answered in {total_ms:.0f} ms")
+    return PlainTextResponse(
+        answer,
+        headers={"Server-Timing": f"total;dur={total_ms:.1f}", "X-Answer-Cache": "miss"},
+    )
+
+
+async def _lookup_cached_answer(question: str) -> tuple[str | None, CacheProbe | None]:
+    """Return (cached answer, probe); failures only disable caching for this request."""
+    if not _ANSWER_CACHE_ENABLED:
+        return None, None
+    try:
+        return await _ANSWER_CACHE.lookup(question)
+    except Exception as err:
+        logger.warning(f"Answer cache lookup failed: {err}")
+        return None, None
+
+
+@app.get("/api/cache/stats")
+async def answer_cache_stats():
+    return JSONResponse(content={"enabled": _ANSWER_CACHE_ENABLED, **_ANSWER_CACHE.stats()})
+
+
+async def _stream_answer(question: str):
+    """
+    Yield the agent answer as SSE messages while it is being generated.
+
+    Each text delta is sent as a `data: {"delta": ...}` message. The stream ends with a
+    `done` event carrying time-to-first-token and total latency, or an `error` event.
+    """
+    start = time.perf_counter()
+    first_token_at = None
+
+    cached, probe = await _lookup_cached_answer(question)
+    if cached is not None:
+        first_token_at = time.perf_counter()
+        yield _sse_event({"delta": cached})
+    else:
+        parts: list[str] = []
+        try:
+            async with rag_agent_file.agent.run_stream(question) as result:
+                # delta=True yields only the newly generated text, same as the CLI
+                async for text in result.stream_text(delta=True):
+                    if not text:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    parts.append(text)
+                    yield _sse_event({"delta": text})
+        except Exception as err:
+            logger.error(f"Streaming answer failed: {err}", exc_info=True)
+            yield _sse_event({"error": str(err)}, event="error")
+            return
+
+        if probe is not None:
+            _ANSWER_CACHE.store(probe, "".join(parts))
+
+    end = time.perf_counter()
+    timings = {
+        "ttft_ms": round(((first_token_at or end) - start) * 1000, 1),
+        "total_ms": round((end - start) * 1000, 1),
+        "cached": cached is not None,
+    }
+    logger.info(
+        f"/api/stream ttft={timings['ttft_ms']:.0f} ms total={timings['total_ms']:.0f} ms "
+        f"cached={timings['cached']}"
+    )
+    yield _sse_event(timings, event="done")
+
+
+@app.post("/api/stream")
+async def idea_stream(payload: IdeaRequest):
+    """Stream the answer token-by-token as Server-Sent Events."""
+    return StreamingResponse(
+        _stream_answer(payload.text),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # stop reverse proxies from buffering the stream
+        },
+    )
+
+
+@app.post("/ingest", response_class=JSONResponse)
 async def ingest(payload: IngestRequest):
+    """
+    Queue a website crawl + ingestion job. Poll `/ingest/status/{job_id}` for progress.
+    """
     try:
-        md_path = await web_data_ingestion.crawl_data(payload.url)
+        job = _INGEST_SCHEDULER.submit(_run_ingest_web_job, url=payload.url)
+    except QueueFullError as err:
+        raise HTTPException(status_code=503, detail=str(err))
 
-        # After crawl saves markdown into api/documents, run the file ingestion pipeline over those files.
-        await file_data_ingest.run_ingestion(document_path=md_path)
+    return JSONResponse(status_code=202, content={"job_id": job.job_id})
 
-        return "Sucessfully ingested website data"
-    except Exception as err:
-        return f"Error: {err}"
+
+@app.get("/ingest/status/{job_id}")
+async def ingest_status(job_id: str):
+    job = _INGEST_SCHEDULER.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job_id")
+    return JSONResponse(content=job.to_dict())
 
 
 @app.post("/ingest-file", response_class=JSONResponse)
-async def ingest_file(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+async def ingest_file(file: UploadFile = File(...)):
     """
     Receives an uploaded file and stores it under the repo-relative `api/documents/` folder.
     """
@@ -136,29 +366,111 @@ async def ingest_file(background_tasks: BackgroundTasks, file: UploadFile = File
 
     # Avoid path traversal (e.g. "..\\..\\foo") by keeping only the base name.
     filename = Path(file.filename or "uploaded_file").name
-    dest_path = _unique_path(documents_dir / filename)
 
+    # Stream into a temporary file, hashing as we go, so a duplicate never takes a real name.
+    tmp_path = documents_dir / f".upload-{uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
     try:
-        with dest_path.open("wb") as out:
+        with tmp_path.open("wb") as out:
             while True:
                 chunk = await file.read(1024 * 1024)  # 1MB chunks
                 if not chunk:
                     break
+                digest.update(chunk)
+                size += len(chunk)
                 out.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
     finally:
         await file.close()
 
-    job_id = uuid4().hex
-    _INGEST_JOBS[job_id] = {"status": "queued", "document_path": str(dest_path)}
-    background_tasks.add_task(_run_ingest_file_job, job_id)
+    content_hash = digest.hexdigest()
+    _DEDUP_STATS["uploads"] += 1
+
+    duplicate = await _find_duplicate_upload(content_hash)
+    if duplicate is not None:
+        tmp_path.unlink(missing_ok=True)
+        _DEDUP_STATS["deduplicated"] += 1
+        _DEDUP_STATS["bytes_saved"] += size
+        _DEDUP_STATS["embeddings_saved"] += duplicate.get("chunk_count", 0)
+        logger.info(f"Skipping ingestion of {filename}: identical content already ingested")
+        if "job_id" in duplicate:
+            # Same file is still being ingested by an earlier upload; follow that job.
+            return JSONResponse(status_code=202, content={"job_id": duplicate["job_id"], "deduplicated": True})
+        return JSONResponse(
+            status_code=200,
+            content={"document_id": duplicate["id"], "status": "succeeded", "deduplicated": True},
+        )
+
+    dest_path = _unique_path(documents_dir / filename)
+    tmp_path.replace(dest_path)
+
+    try:
+        job = _INGEST_SCHEDULER.submit(
+            _run_ingest_file_job,
+            document_path=str(dest_path),
+            content_sha256=content_hash,
+        )
+    except QueueFullError as err:
+        # Don't leave an orphan upload behind; the client is expected to retry.
+        dest_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=503, detail=str(err))
+
+    return JSONResponse(status_code=202, content={"job_id": job.job_id})
+
+
+async def _find_duplicate_upload(content_hash: str) -> dict | None:
+    """
+    Look for an upload with the same content: first among queued/running jobs, then in the
+    database (documents store their source file hash in metadata.content_sha256).
+    """
+    for job in _INGEST_SCHEDULER.jobs.values():
+        if job.info.get("content_sha256") == content_hash and not job.finished:
+            return {"job_id": job.job_id}
+
+    try:
+        from .utils.db_utils import get_document_by_content_hash
+        return await get_document_by_content_hash(content_hash)
+    except Exception as err:
+        # Dedup is an optimization; if the lookup fails just ingest the file.
+        logger.warning(f"Content hash lookup failed, ingesting anyway: {err}")
+        return None
+
+
+@app.post("/ingest-file/resume/{run_id}", response_class=JSONResponse)
+async def ingest_file_resume(run_id: str):
+    """
+    Queue a job that continues a failed or interrupted file ingestion run (`run_id` is the
+    job id of the original upload). Saved files are skipped and checkpointed embeddings are
+    reused, so the retry doesn't pay for conversion and embedding again.
+    """
+    from .file_data_ingestion.checkpoints import RunCheckpoint
+
+    try:
+        RunCheckpoint.load(run_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Unknown run_id")
+
+    try:
+        job = _INGEST_SCHEDULER.submit(_run_ingest_file_job, resume=run_id)
+    except QueueFullError as err:
+        raise HTTPException(status_code=503, detail=str(err))
+
+    return JSONResponse(status_code=202, content={"job_id": job.job_id, "run_id": run_id})
+
 
-    return JSONResponse(status_code=202, content={"job_id": job_id})
+@app.get("/ingest-file/stats")
+async def ingest_file_stats():
+    """Upload deduplication counters since process start."""
+    return JSONResponse(content=_DEDUP_STATS)
 
 
 @app.get("/ingest-file/status/{job_id}")
 async def ingest_file_status(job_id: str):
-    job = _INGEST_JOBS.get(job_id)
+    job = _INGEST_SCHEDULER.get(job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Unknown job_id")
-    return JSONResponse(content=job)
+    return JSONResponse(content=job.to_dict())
     
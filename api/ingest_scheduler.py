@@ -0,0 +1,209 @@
+"""
+In-process scheduler for background ingestion jobs.
+
+Jobs are put on a bounded queue and picked up by a fixed number of worker
+tasks, so independent uploads ingest in parallel instead of waiting on a
+single process-wide lock. Each job records the pipeline stage it is in and
+how long it spent in every stage, which is what the status endpoints report.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Stages reported by the ingestion pipeline, in the order a document goes through them
+JOB_STAGES = ("queued", "converting", "chunking", "embedding", "saving")
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the scheduler queue cannot accept more jobs."""
+
+
+@dataclass
+class IngestJob:
+    """A single unit of background ingestion work and its progress."""
+    job_id: str
+    runner: Callable[["IngestJob"], Awaitable[Any]]
+    info: Dict[str, Any] = field(default_factory=dict)
+    status: str = "queued"  # queued | running | succeeded | failed
+    stage: str = "queued"
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stage_timings_ms: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    _stage_started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set_stage(self, stage: str) -> None:
+        """Move the job to `stage`, charging the elapsed time to the previous one."""
+        now = time.perf_counter()
+        elapsed_ms = (now - self._stage_started) * 1000
+        self.stage_timings_ms[self.stage] = self.stage_timings_ms.get(self.stage, 0.0) + elapsed_ms
+        self.stage = stage
+        self._stage_started = now
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """Add `amount` to a progress counter (e.g. pages crawled)."""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable view of the job used by the status endpoints."""
+        data: Dict[str, Any] = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "stage": self.stage,
+            "stage_timings_ms": {k: round(v, 1) for k, v in self.stage_timings_ms.items()},
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            **self.info,
+        }
+        if self.counters:
+            data["counters"] = dict(self.counters)
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class IngestScheduler:
+    """Bounded job queue drained by a fixed pool of asyncio worker tasks."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue_size: int = 100,
+        max_finished_jobs: int = 1000
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            workers: Number of jobs allowed to run at the same time
+            max_queue_size: Maximum number of jobs waiting to start
+            max_finished_jobs: How many finished jobs to keep around for status polling
+        """
+        if workers < 1:
+            raise ValueError("Scheduler needs at least one worker")
+
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, IngestJob] = {}
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls) -> "IngestScheduler":
+        """Create a scheduler configured by INGEST_WORKERS and INGEST_QUEUE_SIZE."""
+        return cls(
+            workers=int(os.getenv("INGEST_WORKERS", "2")),
+            max_queue_size=int(os.getenv("INGEST_QUEUE_SIZE", "100")),
+        )
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop (idempotent)."""
+        if self._worker_tasks:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"ingest-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Ingestion scheduler started with {self.workers} workers (queue size {self.max_queue_size})")
+
+    async def shutdown(self) -> None:
+        """Cancel worker tasks. Jobs still queued are left in the `queued` state."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+
+    def submit(self, runner: Callable[[IngestJob], Awaitable[Any]], **info: Any) -> IngestJob:
+        """
+        Queue a new job.
+
+        Args:
+            runner: Coroutine function that performs the work; receives the job so it can report stages
+            **info: Extra fields shown in the job status (e.g. document_path)
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        self.start()
+
+        job = IngestJob(job_id=uuid4().hex, runner=runner, info=info)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(
+                f"Ingestion queue is full ({self.max_queue_size} jobs waiting), try again later"
+            )
+
+        self.jobs[job.job_id] = job
+        self._prune_finished()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        """Look up a job by id."""
+        return self.jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self, worker_index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run_job(job, worker_index)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: IngestJob, worker_index: int) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        logger.info(f"Worker {worker_index} starting job {job.job_id}")
+
+        try:
+            await job.runner(job)
+            job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Job cancelled"
+            raise
+        except Exception as err:
+            logger.error(f"Ingestion job {job.job_id} failed: {err}")
+            job.status = "failed"
+            job.error = str(err)
+        finally:
+            # Failed jobs keep the stage they failed in so the status shows where it broke
+            job.set_stage("done" if job.status == "succeeded" else job.stage)
+            job.finished_at = time.time()
+
+    def _prune_finished(self) -> None:
+        """Drop the oldest finished jobs once more than `max_finished_jobs` are kept."""
+        finished = [job for job in self.jobs.values() if job.finished]
+        excess = len(finished) - self.max_finished_jobs
+        if excess <= 0:
+            return
+
+        finished.sort(key=lambda job: job.finished_at or 0.0)
+        for job in finished[:excess]:
+            del self.jobs[job.job_id]
@@ -10,6 +10,7 @@ import json
 import logging
 import os
 import sys
+from functools import lru_cache
 from typing import Any
 
 from dotenv import load_dotenv
@@ -26,13 +27,25 @@ db_pool = None
 
 async def initialize_db():
     """Initialize database connection pool."""
+    try:
+        # When running as a package: `python -m api.rag_agent_file`
+        from .utils.db_utils import register_vector_codec  # type: ignore
+    except ImportError:
+        try:
+            # When running from repo root: `python api/rag_agent_file.py`
+            from api.utils.db_utils import register_vector_codec
+        except ImportError:
+            # When running from inside `api/`: `python rag_agent_file.py`
+            from utils.db_utils import register_vector_codec
+
     global db_pool
     if not db_pool:
         db_pool = await asyncpg.create_pool(
             os.getenv("DATABASE_URL"),
             min_size=2,
             max_size=10,
-            command_timeout=60
+            command_timeout=60,
+            init=register_vector_codec
         )
         logger.info("Database connection pool initialized")
 
@@ -45,6 +58,22 @@ async def close_db():
         logger.info("Database connection pool closed")
 
 
+@lru_cache(maxsize=1)
+def _query_embedder():
+    """One embedder for all searches, so its caches stay warm between queries."""
+    try:
+        # When running as a package: `python -m api.rag_agent_file`
+        from .file_data_ingestion.embedder import create_embedder  # type: ignore
+    except ImportError:
+        try:
+            # When running from repo root: `python api/rag_agent_file.py`
+            from api.file_data_ingestion.embedder import create_embedder
+        except ImportError:
+            # When running from inside `api/`: `python rag_agent_file.py`
+            from file_data_ingestion.embedder import create_embedder
+    return create_embedder()
+
+
 async def search_knowledge_base(ctx: RunContext[None], query: str, limit: int = 5) -> str:
     """
     Search the knowledge base using semantic similarity.
@@ -62,30 +91,16 @@ async def search_knowledge_base(ctx: RunContext[None], query: str, limit: int =
             await initialize_db()
 
         # Generate embedding for query
-        try:
-            # When running as a package: `python -m api.rag_agent_file`
-            from .file_data_ingestion.embedder import create_embedder  # type: ignore
-        except ImportError:
-            try:
-                # When running from repo root: `python api/rag_agent_file.py`
-                from api.file_data_ingestion.embedder import create_embedder
-            except ImportError:
-                # When running from inside `api/`: `python rag_agent_file.py`
-                from file_data_ingestion.embedder import create_embedder
-
-        embedder = create_embedder()
-        query_embedding = await embedder.embed_query(query)
-
-        # Convert to PostgreSQL vector format
-        embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+        query_embedding = await _query_embedder().embed_query(query)
 
-        # Search using match_chunks function
+        # Search using match_chunks function; the vector is sent as packed float32
+        # through the binary codec registered on the pool
         async with db_pool.acquire() as conn:
             results = await conn.fetch(
                 """
                 SELECT * FROM match_chunks($1::vector, $2)
                 """,
-                embedding_str,
+                query_embedding,
                 limit
             )
 
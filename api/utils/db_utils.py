@@ -3,12 +3,15 @@ Database utilities for PostgreSQL connection and operations.
 """
 
 import os
+import sys
 import json
+import struct
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+from array import array
+from typing import List, Dict, Any, AsyncIterable, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from contextlib import asynccontextmanager
-from uuid import UUID
+from uuid import UUID, uuid4
 import logging
 import ssl
 from urllib.parse import parse_qs, urlparse
@@ -74,6 +77,65 @@ def _build_ssl_context(database_url: str) -> Optional[ssl.SSLContext]:
     return ssl_ctx
 
 
+# pgvector binary wire format: uint16 dimensions, uint16 unused, then big-endian float32 values
+_VECTOR_HEADER = struct.Struct(">HH")
+
+
+def encode_vector(value) -> bytes:
+    """
+    Encode an embedding for the binary `vector` codec.
+
+    Accepts any sequence of floats; the text form '[1.0,2.0]' is accepted too so
+    older call sites that format vectors as strings keep working.
+    """
+    if isinstance(value, str):
+        value = [float(v) for v in value.strip("[] ").split(",") if v.strip()]
+    floats = array("f", value)
+    if sys.byteorder == "little":
+        floats.byteswap()
+    return _VECTOR_HEADER.pack(len(floats), 0) + floats.tobytes()
+
+
+def decode_vector(data: bytes) -> List[float]:
+    """Decode a binary `vector` value into a list of floats."""
+    dimensions, _ = _VECTOR_HEADER.unpack_from(data)
+    floats = array("f")
+    floats.frombytes(data[_VECTOR_HEADER.size:_VECTOR_HEADER.size + 4 * dimensions])
+    if sys.byteorder == "little":
+        floats.byteswap()
+    return floats.tolist()
+
+
+async def register_vector_codec(conn) -> bool:
+    """
+    Register the binary pgvector codec on a connection.
+
+    Embeddings then travel as packed float32 instead of formatted text, and can be
+    written with COPY. Returns False when the `vector` type is not installed.
+    """
+    schema = await conn.fetchval(
+        """
+        SELECT n.nspname
+        FROM pg_type t
+        JOIN pg_namespace n ON n.oid = t.typnamespace
+        WHERE t.typname = 'vector'
+        LIMIT 1
+        """
+    )
+    if schema is None:
+        logger.warning("pgvector type not found; embeddings will not use the binary codec")
+        return False
+
+    await conn.set_type_codec(
+        "vector",
+        schema=schema,
+        encoder=encode_vector,
+        decoder=decode_vector,
+        format="binary",
+    )
+    return True
+
+
 class DatabasePool:
     """Manages PostgreSQL connection pool."""
     
@@ -90,6 +152,9 @@ class DatabasePool:
         
         self.pool: Optional[Pool] = None
         self.ssl_ctx = _build_ssl_context(self.database_url)
+        # Read when the pool is created (lowered by processes that only need a few connections)
+        self.min_size = 5
+        self.max_size = 20
     
     async def initialize(self):
         """Create connection pool."""
@@ -97,10 +162,11 @@ class DatabasePool:
             self.pool = await asyncpg.create_pool(
                 self.database_url,
                 ssl=self.ssl_ctx,
-                min_size=5,
-                max_size=20,
+                min_size=self.min_size,
+                max_size=self.max_size,
                 max_inactive_connection_lifetime=300,
-                command_timeout=60
+                command_timeout=60,
+                init=register_vector_codec
             )
             logger.info("Database connection pool initialized")
     
@@ -239,6 +305,153 @@ async def list_documents(
             for row in results
         ]
 
+_content_hash_index_ready = False
+
+
+async def ensure_content_hash_index() -> None:
+    """
+    Create the expression index on `documents.metadata->>'content_sha256'`.
+
+    Built with CONCURRENTLY so writes to `documents` carry on while it builds; meant to
+    run in the background (e.g. at API startup), never on a request. A build that
+    failed part way leaves an invalid index behind, which is dropped and rebuilt.
+    """
+    global _content_hash_index_ready
+    if _content_hash_index_ready:
+        return
+
+    async with db_pool.acquire() as conn:
+        valid = await conn.fetchval(
+            """
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = 'idx_documents_content_sha256'
+              AND pg_catalog.pg_table_is_visible(c.oid)
+            """
+        )
+        if valid is False:
+            await conn.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_documents_content_sha256")
+        if not valid:
+            # CONCURRENTLY can't run in a transaction; asyncpg runs this in autocommit
+            await conn.execute(
+                """
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_content_sha256
+                ON documents ((metadata->>'content_sha256'))
+                """
+            )
+    _content_hash_index_ready = True
+    logger.info("Content hash index is ready")
+
+
+async def get_document_by_content_hash(content_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Find an already ingested document by the SHA-256 of its source file.
+
+    The pipeline stores the hash as `metadata.content_sha256`; the expression index
+    from `ensure_content_hash_index` keeps the lookup cheap as the table grows.
+
+    Args:
+        content_hash: Hex-encoded SHA-256 of the source file
+
+    Returns:
+        Document id, title, source and chunk count, or None if not found
+    """
+    async with db_pool.acquire() as conn:
+        result = await conn.fetchrow(
+            """
+            SELECT
+                d.id::text,
+                d.title,
+                d.source,
+                COUNT(c.id) AS chunk_count
+            FROM documents d
+            LEFT JOIN chunks c ON d.id = c.document_id
+            WHERE d.metadata->>'content_sha256' = $1
+            GROUP BY d.id, d.title, d.source, d.created_at
+            ORDER BY d.created_at DESC
+            LIMIT 1
+            """,
+            content_hash
+        )
+
+        if result:
+            return {
+                "id": result["id"],
+                "title": result["title"],
+                "source": result["source"],
+                "chunk_count": result["chunk_count"]
+            }
+
+        return None
+
+CHUNK_COLUMNS = ("document_id", "content", "embedding", "chunk_index", "metadata", "token_count")
+
+
+async def copy_chunk_records(conn, records: List[Tuple[Any, ...]], table: str = "chunks") -> None:
+    """
+    Bulk-insert chunk rows with COPY.
+
+    Needs a connection with the binary vector codec registered (every connection
+    from `db_pool` has it).
+
+    Args:
+        conn: Connection, usually inside the document's transaction
+        records: Tuples in CHUNK_COLUMNS order; embedding is a float sequence or None,
+            metadata a JSON string
+        table: Chunks table (the shadow table during a rebuild)
+    """
+    if not records:
+        return
+    await conn.copy_records_to_table(table, records=records, columns=list(CHUNK_COLUMNS))
+
+
+def _copy_text_escape(value: str) -> str:
+    """Escape a value for COPY's text format."""
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+async def copy_document_stream(
+    conn,
+    title: str,
+    source: str,
+    content: AsyncIterable[str],
+    metadata: str,
+    table: str = "documents"
+) -> str:
+    """
+    Insert a document whose content arrives in pieces, streaming it with COPY.
+
+    Used for text files too large to hold in memory as one string; the row goes
+    over the wire as the pieces are read.
+
+    Args:
+        conn: Connection, usually inside the document's transaction
+        title: Document title
+        source: Document source
+        content: Consecutive pieces of the content
+        metadata: Metadata as a JSON string
+        table: Documents table (the shadow table during a rebuild)
+
+    Returns:
+        Document ID
+    """
+    document_id = str(uuid4())
+
+    async def row():
+        yield f"{document_id}\t{_copy_text_escape(title)}\t{_copy_text_escape(source)}\t".encode("utf-8")
+        async for piece in content:
+            yield _copy_text_escape(piece).encode("utf-8")
+        yield f"\t{_copy_text_escape(metadata)}\n".encode("utf-8")
+
+    await conn.copy_to_table(
+        table,
+        source=row(),
+        columns=["id", "title", "source", "content", "metadata"],
+        format="text"
+    )
+    return document_id
+
 # Utility Functions
 async def execute_query(query: str, *params) -> List[Dict[str, Any]]:
     """
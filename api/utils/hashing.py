@@ -0,0 +1,29 @@
+"""
+Content hashing helpers for the ingestion pipeline.
+
+The upload endpoint hashes uploads inline while streaming them to disk (one pass
+over the bytes); it uses the same SHA-256 hex digest, so its hashes match these.
+"""
+
+import hashlib
+
+
+def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Hash a file's content without loading it into memory.
+
+    Args:
+        path: Path to the file
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
@@ -176,6 +176,26 @@ class IngestionConfig(BaseModel):
     chunk_overlap: int = Field(default=200, ge=0, le=1000)
     max_chunk_size: int = Field(default=2000, ge=500, le=10000)
     use_semantic_chunking: bool = True
+
+    # Pipelined ingestion: workers per stage and documents buffered between stages
+    convert_concurrency: int = Field(default=2, ge=1, le=32)
+    chunk_concurrency: int = Field(default=1, ge=1, le=32)
+    embed_concurrency: int = Field(default=2, ge=1, le=32)
+    save_concurrency: int = Field(default=2, ge=1, le=32)
+    stage_queue_size: int = Field(default=2, ge=1, le=100)
+
+    # Folder discovery filters (globs on the path relative to the folder, or the file name)
+    include_patterns: List[str] = Field(default_factory=list)
+    exclude_patterns: List[str] = Field(default_factory=list)
+    max_file_size_mb: Optional[float] = Field(default=None, gt=0)
+
+    # Documents larger than this are streamed: text files are stored as they are read,
+    # and chunks are embedded and saved stream_batch_size at a time
+    max_inline_text_mb: float = Field(default=16.0, gt=0)
+    stream_batch_size: int = Field(default=128, ge=1, le=2048)
+
+    # Batched background LLM titles for documents without a good local title
+    llm_title_enrichment: bool = False
     
     @field_validator('chunk_overlap')
     @classmethod
@@ -187,10 +207,44 @@ class IngestionConfig(BaseModel):
         return v
 
 
+class StageTimings(BaseModel):
+    """Wall-clock time spent in each ingestion stage, in milliseconds."""
+    convert_ms: float = 0.0
+    title_ms: float = 0.0
+    metadata_ms: float = 0.0
+    chunk_ms: float = 0.0
+    embed_ms: float = 0.0
+    save_ms: float = 0.0
+
+    def add(self, other: "StageTimings") -> None:
+        """Accumulate another document's timings into this one."""
+        for name in StageTimings.model_fields:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
 class IngestionResult(BaseModel):
     """Result of document ingestion."""
     document_id: str
     title: str
+    source: str = ""  # File path or URL the document came from
     chunks_created: int
+    chunks_embedded: int = 0
     processing_time_ms: float
-    errors: List[str] = Field(default_factory=list)
\ No newline at end of file
+    stage_timings: StageTimings = Field(default_factory=StageTimings)
+    bytes_read: int = 0
+    tokens_embedded: int = 0
+    chunks_per_second: float = 0.0
+    errors: List[str] = Field(default_factory=list)
+
+
+class IngestionSummary(BaseModel):
+    """Aggregated metrics for an ingestion run."""
+    documents: int = 0
+    chunks_created: int = 0
+    chunks_embedded: int = 0
+    errors: int = 0
+    bytes_read: int = 0
+    tokens_embedded: int = 0
+    total_time_ms: float = 0.0
+    chunks_per_second: float = 0.0
+    stage_timings: StageTimings = Field(default_factory=StageTimings)
\ No newline at end of file
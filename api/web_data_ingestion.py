@@ -4,7 +4,7 @@ import json
 import asyncio
 import requests
 from xml.etree import ElementTree
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Awaitable, Callable, Optional
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from urllib.parse import urlparse
@@ -267,10 +267,21 @@ async def process_and_store_document(url: str, markdown: str):
     ]
     await asyncio.gather(*insert_tasks)
 
-async def crawl_parallel(urls: List[str], max_concurrent: int = 5) -> Path:
+# Called as (url, markdown, error) after each URL: markdown is None when the crawl failed.
+PageCallback = Callable[[str, Optional[str], Optional[str]], Awaitable[None]]
+
+
+async def crawl_parallel(
+    urls: List[str],
+    max_concurrent: int = 5,
+    page_callback: Optional[PageCallback] = None,
+) -> Path:
     """
     Crawl multiple URLs in parallel with a concurrency limit.
 
+    If `page_callback` is given it is awaited after every URL, so callers can start
+    processing pages while the rest of the site is still being crawled.
+
     Returns:
         Path to the newly created markdown file containing the crawl output.
     """
@@ -324,8 +335,12 @@ async def crawl_parallel(urls: List[str], max_concurrent: int = 5) -> Path:
                         with md_path.open("a", encoding="utf-8") as out:
                             out.write(block)
                     print(f"Appended markdown to: {md_path}")
+                    if page_callback:
+                        await page_callback(url, markdown_text, None)
                 else:
                     print(f"Failed: {url} - Error: {result.error_message}")
+                    if page_callback:
+                        await page_callback(url, None, str(result.error_message))
         
         # Process all URLs in parallel with limited concurrency
         await asyncio.gather(*[process_url(url) for url in urls])
@@ -377,6 +392,40 @@ def get_pydantic_ai_docs_urls(base_url: str):
         # Return the base URL if any error occurs
         return [base_url]
     
+def _bind_callback_to_loop(
+    callback: PageCallback,
+    loop: asyncio.AbstractEventLoop,
+) -> PageCallback:
+    """Run `callback` on `loop` when it is invoked from a different event loop (thread)."""
+    async def bound(url: str, markdown: Optional[str], error: Optional[str]) -> None:
+        future = asyncio.run_coroutine_threadsafe(callback(url, markdown, error), loop)
+        await asyncio.wrap_future(future)
+
+    return bound
+
+
+async def crawl_urls(urls: List[str], page_callback: Optional[PageCallback] = None) -> str:
+    """
+    Crawl an already discovered list of URLs, reporting each page through `page_callback`.
+
+    Uses the same Windows Proactor loop workaround as `crawl_data`; the callback still
+    runs on the caller's event loop.
+    """
+    if sys.platform.startswith("win"):
+        try:
+            loop = asyncio.get_running_loop()
+            if _is_windows_selector_event_loop(loop):
+                callback = _bind_callback_to_loop(page_callback, loop) if page_callback else None
+                md_path = await asyncio.to_thread(
+                    _run_coroutine_in_new_proactor_loop, crawl_parallel(urls, page_callback=callback)
+                )
+                return str(md_path)
+        except RuntimeError:
+            pass
+
+    return str(await crawl_parallel(urls, page_callback=page_callback))
+
+
 async def crawl_data(url: str) -> str:
     """
     Ingest website docs into Supabase.
@@ -0,0 +1,141 @@
+"""
+Chunk write throughput benchmark.
+
+Writes synthetic chunks into a temporary copy of the `chunks` table and reports
+rows/sec for:
+
+- insert-text: one INSERT per chunk with the embedding formatted as text (the old writer)
+- executemany-binary: one executemany with the binary vector codec
+- copy-binary: COPY with the binary vector codec (what the pipeline uses now)
+
+Every run happens in a transaction that is rolled back, so nothing is persisted.
+Needs DATABASE_URL and the pgvector extension.
+
+Usage (from the project root):
+    python benchmarks/chunk_writer.py
+    python benchmarks/chunk_writer.py --rows 5000 --dimensions 1536 --repeat 3
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from uuid import uuid4
+
+import asyncpg
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.utils.db_utils import CHUNK_COLUMNS, DatabasePool, register_vector_codec  # noqa: E402
+
+TABLE = "bench_chunks"
+
+
+def make_records(rows: int, dimensions: int) -> List[Tuple[Any, ...]]:
+    """Chunk rows shaped like the pipeline's (one document, ~1 KB of text each)."""
+    document_id = str(uuid4())
+    metadata = json.dumps({"title": "Benchmark", "source": "benchmark.md", "chunk_method": "hybrid"})
+    return [
+        (
+            document_id,
+            f"chunk {i} " + "lorem ipsum dolor sit amet " * 36,
+            [random.uniform(-1, 1) for _ in range(dimensions)],
+            i,
+            metadata,
+            250,
+        )
+        for i in range(rows)
+    ]
+
+
+async def write_insert_text(conn, records: List[Tuple[Any, ...]]) -> None:
+    for document_id, content, embedding, index, metadata, token_count in records:
+        await conn.execute(
+            f"""
+            INSERT INTO {TABLE} (document_id, content, embedding, chunk_index, metadata, token_count)
+            VALUES ($1::uuid, $2, $3::vector, $4, $5, $6)
+            """,
+            document_id,
+            content,
+            '[' + ','.join(map(str, embedding)) + ']',
+            index,
+            metadata,
+            token_count
+        )
+
+
+async def write_executemany_binary(conn, records: List[Tuple[Any, ...]]) -> None:
+    await conn.executemany(
+        f"""
+        INSERT INTO {TABLE} (document_id, content, embedding, chunk_index, metadata, token_count)
+        VALUES ($1::uuid, $2, $3, $4, $5, $6)
+        """,
+        records
+    )
+
+
+async def write_copy_binary(conn, records: List[Tuple[Any, ...]]) -> None:
+    await conn.copy_records_to_table(TABLE, records=records, columns=list(CHUNK_COLUMNS))
+
+
+WRITERS: Dict[str, Tuple[Callable[[Any, List[Tuple[Any, ...]]], Awaitable[None]], bool]] = {
+    # name -> (writer, needs binary vector codec)
+    "insert-text": (write_insert_text, False),
+    "executemany-binary": (write_executemany_binary, True),
+    "copy-binary": (write_copy_binary, True),
+}
+
+
+async def run_writer(db: DatabasePool, name: str, records: List[Tuple[Any, ...]]) -> float:
+    """Time one writer on a fresh connection; returns rows/sec."""
+    writer, binary = WRITERS[name]
+    conn = await asyncpg.connect(db.database_url, ssl=db.ssl_ctx)
+    try:
+        if binary:
+            await register_vector_codec(conn)
+        tx = conn.transaction()
+        await tx.start()
+        try:
+            await conn.execute(f"CREATE TEMP TABLE {TABLE} (LIKE chunks INCLUDING DEFAULTS)")
+            start = time.perf_counter()
+            await writer(conn, records)
+            elapsed = time.perf_counter() - start
+        finally:
+            await tx.rollback()
+    finally:
+        await conn.close()
+    return len(records) / elapsed
+
+
+async def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure chunk write throughput")
+    parser.add_argument("--rows", type=int, default=2000, help="Chunks written per run")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Embedding dimensions (must match chunks.embedding)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per writer (best is reported)")
+    parser.add_argument("--writers", nargs="+", choices=list(WRITERS), default=list(WRITERS))
+    args = parser.parse_args(argv)
+
+    db = DatabasePool()
+    records = make_records(args.rows, args.dimensions)
+
+    results = {}
+    for name in args.writers:
+        rates = [await run_writer(db, name, records) for _ in range(args.repeat)]
+        results[name] = max(rates)
+        print(f"{name:<20} {results[name]:10.0f} rows/sec")
+
+    if "insert-text" in results:
+        baseline = results["insert-text"]
+        for name, rate in results.items():
+            if name != "insert-text":
+                print(f"{name} is {rate / baseline:.1f}x insert-text")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,198 @@
+"""
+Import-time benchmark for the API.
+
+Imports each module in a fresh interpreter with `python -X importtime` and
+reports wall time plus the packages that contribute most of it. The query-only
+path (what `uvicorn api.index:app` loads before it can answer a question) is
+checked against a time budget and must not pull in the heavy ingestion stack.
+
+Import time alone can't tell deferred work from removed work, so the first
+`/api` request is also timed in a fresh interpreter, with pydantic-ai's
+TestModel in place of the LLM (no tool calls, answer cache off, so no network).
+Whatever it imports is reported the same way and must not include the heavy
+packages either.
+
+Usage (from the project root):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 2000 --top 15
+    python benchmarks/import_time.py --json report.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Loaded at API startup; must stay within the budget
+QUERY_PATH_MODULE = "api.index"
+
+# Measured on their own to show what each subsystem costs. Apart from the
+# agent itself, these are only imported on first use.
+SUBSYSTEM_MODULES = [
+    "api.rag_agent_file",
+    "api.rag_agent_web",
+    "api.web_data_ingestion",
+    "api.file_data_ingestion.ingest",
+]
+
+# Packages that must not be imported by the query path
+HEAVY_PACKAGES = {"docling", "docling_core", "transformers", "torch", "crawl4ai", "playwright", "logfire", "langsmith"}
+
+DEFAULT_BUDGET_MS = float(os.getenv("QUERY_IMPORT_BUDGET_MS", "1500"))
+
+DEFAULT_FIRST_REQUEST_BUDGET_MS = float(os.getenv("FIRST_REQUEST_BUDGET_MS", "1000"))
+
+# Written to stderr between importing the app and sending the first request
+_REQUEST_MARKER = "--- first request ---"
+
+# Imports the app, then times one /api request; everything the test client
+# needs is imported before the marker so it isn't counted
+_FIRST_REQUEST_CODE = f"""
+import sys, time
+import api.index as index
+from fastapi.testclient import TestClient
+from pydantic_ai.models.test import TestModel
+client = TestClient(index.app)
+print({_REQUEST_MARKER!r}, file=sys.stderr, flush=True)
+start = time.perf_counter()
+with index.rag_agent_file.agent.override(model=TestModel(call_tools=[])):
+    response = client.post("/api", json={{"text": "What is in the knowledge base?"}})
+response.raise_for_status()
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure_import(module: str) -> Dict[str, Any]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        Wall time in ms and self import time per top-level package in ms
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    return _run_timed(module, code)
+
+
+def measure_first_request() -> Dict[str, Any]:
+    """
+    Time the first `/api` request after importing the app, in a fresh interpreter.
+
+    Returns:
+        Wall time in ms and self import time per top-level package in ms, counting
+        only what the request itself imported
+    """
+    env = {**os.environ, "ANSWER_CACHE_ENABLED": "false"}
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    return _run_timed("first /api request", _FIRST_REQUEST_CODE, env=env, after_marker=True)
+
+
+def _run_timed(label: str, code: str, env: Dict[str, str] | None = None, after_marker: bool = False) -> Dict[str, Any]:
+    """Run `code` under `-X importtime`; it prints its wall time in ms as the last line."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+    lines = proc.stderr.splitlines()
+    if after_marker:
+        lines = lines[lines.index(_REQUEST_MARKER) + 1:] if _REQUEST_MARKER in lines else []
+
+    packages: Dict[str, float] = defaultdict(float)
+    for line in lines:
+        # Format: "import time: <self us> | <cumulative us> | <indented module name>"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+            packages[name.strip().split(".")[0]] += int(self_us) / 1000
+        except ValueError:
+            continue
+
+    if proc.returncode != 0:
+        errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        return {"module": label, "error": errors[-1] if errors else "failed"}
+
+    return {
+        "module": label,
+        "wall_ms": float(proc.stdout.strip().splitlines()[-1]),
+        "packages_ms": dict(sorted(packages.items(), key=lambda kv: kv[1], reverse=True)),
+    }
+
+
+def _check(report: Dict[str, Any], budget_ms: float) -> List[str]:
+    """Budget and heavy-package failures of one report."""
+    if "error" in report:
+        return [f"{report['module']} failed: {report['error']}"]
+    failures = []
+    if report["wall_ms"] > budget_ms:
+        failures.append(f"{report['module']} took {report['wall_ms']:.0f} ms (budget {budget_ms:.0f} ms)")
+    leaked = sorted(HEAVY_PACKAGES & set(report["packages_ms"]))
+    if leaked:
+        failures.append(f"{report['module']} imports: {', '.join(leaked)}")
+    return failures
+
+
+def print_report(report: Dict[str, Any], top: int) -> None:
+    if "error" in report:
+        print(f"{report['module']:<36} ERROR: {report['error']}")
+        return
+
+    print(f"{report['module']:<36} {report['wall_ms']:8.0f} ms")
+    for package, ms in list(report["packages_ms"].items())[:top]:
+        print(f"    {package:<32} {ms:8.1f} ms")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure API import cost per module")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Import budget for {QUERY_PATH_MODULE} (default: QUERY_IMPORT_BUDGET_MS or 1500)")
+    parser.add_argument("--first-request-budget-ms", type=float, default=DEFAULT_FIRST_REQUEST_BUDGET_MS,
+                        help="Budget for the first /api request (default: FIRST_REQUEST_BUDGET_MS or 1000)")
+    parser.add_argument("--top", type=int, default=10, help="Packages to list per module")
+    parser.add_argument("--json", dest="json_path", help="Also write the full report to this file")
+    args = parser.parse_args(argv)
+
+    reports = [measure_import(module) for module in [QUERY_PATH_MODULE, *SUBSYSTEM_MODULES]]
+    first_request = measure_first_request()
+    for report in [*reports, first_request]:
+        print_report(report, args.top)
+        print()
+
+    query_report = reports[0]
+    failures = _check(query_report, args.budget_ms) + _check(first_request, args.first_request_budget_ms)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "budget_ms": args.budget_ms,
+                "first_request_budget_ms": args.first_request_budget_ms,
+                "reports": reports,
+                "first_request": first_request,
+                "failures": failures,
+            }, f, indent=2)
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        return 1
+
+    print(f"OK: {QUERY_PATH_MODULE} imports in {query_report['wall_ms']:.0f} ms (budget {args.budget_ms:.0f} ms), "
+          f"first /api request in {first_request['wall_ms']:.0f} ms (budget {args.first_request_budget_ms:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
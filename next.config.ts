@@ -12,10 +12,18 @@ const nextConfig: NextConfig = {
         source: "/api",
         destination: "http://127.0.0.1:8000/api",
       },
+      {
+        source: "/api/stream",
+        destination: "http://127.0.0.1:8000/api/stream",
+      },
       {
         source: "/ingest",
         destination: "http://127.0.0.1:8000/ingest",
       },
+      {
+        source: "/ingest/status/:path*",
+        destination: "http://127.0.0.1:8000/ingest/status/:path*",
+      },
       {
         source: "/ingest-file/:path*",
         destination: "http://127.0.0.1:8000/ingest-file/:path*",
@@ -45,6 +45,57 @@ function Markdown({ children }: { children: string }) {
     );
 }
 
+type SseEvent = { event: string; data: Record<string, unknown> };
+
+// Parses one "event: ...\ndata: ..." block of a Server-Sent Events stream.
+function parseSseEvent(block: string): SseEvent | null {
+    let event = 'message';
+    const dataLines: string[] = [];
+    for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+    }
+    if (dataLines.length === 0) return null;
+    return { event, data: JSON.parse(dataLines.join('\n')) };
+}
+
+type JobStatus = {
+    status?: string;
+    stage?: string;
+    error?: string;
+    counters?: Record<string, number>;
+};
+
+// Polls a job status endpoint until the job succeeds (returns) or fails (throws).
+async function pollJob(statusUrl: string, onProgress: (status: JobStatus) => void): Promise<JobStatus> {
+    const pollEveryMs = 1000;
+    const timeoutMs = 10 * 60 * 1000;
+    const startedAt = Date.now();
+
+    while (true) {
+        if (Date.now() - startedAt > timeoutMs) {
+            throw new Error('Ingestion is taking too long. Please check backend logs.');
+        }
+
+        // Wait pollEveryMs milliseconds, then continue.
+        await new Promise((resolve) => setTimeout(resolve, pollEveryMs));
+
+        const statusRes = await fetch(statusUrl);
+        if (!statusRes.ok) {
+            const text = await statusRes.text();
+            throw new Error(text || `Status request failed (${statusRes.status})`);
+        }
+        const statusData = (await statusRes.json()) as JobStatus;
+
+        if (statusData.status === 'succeeded') return statusData;
+        if (statusData.status === 'failed') {
+            throw new Error(statusData.error || 'Ingestion failed.');
+        }
+
+        onProgress(statusData);
+    }
+}
+
 export default function Home() {
     const [idea, setIdea] = useState<string>('');
     const [inputText, setInputText] = useState<string>('');
@@ -67,7 +118,7 @@ export default function Home() {
         setIsLoading(true);
 
         try {
-            const res = await fetch('/api', {
+            const res = await fetch('/api/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -75,10 +126,38 @@ export default function Home() {
                 body: JSON.stringify({ text: inputText }),
             });
 
-            const text = await res.text();
-            if (!res.ok) throw new Error(text || `Request failed (${res.status})`);
+            if (!res.ok || !res.body) {
+                const text = await res.text();
+                throw new Error(text || `Request failed (${res.status})`);
+            }
 
-            setIdea(text);
+            // Render tokens as they arrive instead of waiting for the full answer.
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let answer = '';
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                let boundary = buffer.indexOf('\n\n');
+                while (boundary !== -1) {
+                    const parsed = parseSseEvent(buffer.slice(0, boundary));
+                    buffer = buffer.slice(boundary + 2);
+                    boundary = buffer.indexOf('\n\n');
+                    if (!parsed) continue;
+
+                    if (parsed.event === 'error') {
+                        throw new Error(String(parsed.data.error ?? 'Streaming failed'));
+                    }
+                    if (parsed.event === 'message' && typeof parsed.data.delta === 'string') {
+                        answer += parsed.data.delta;
+                        setIdea(answer);
+                    }
+                }
+            }
         } catch (err) {
             const message = err instanceof Error ? err.message : String(err);
             setIdea('Error: ' + message);
@@ -104,10 +183,28 @@ export default function Home() {
                 body: JSON.stringify({ url: ingestUrl }),
             });
 
-            const text = await res.text();
-            if (!res.ok) throw new Error(text || `Request failed (${res.status})`);
+            if (res.status !== 202) {
+                const text = await res.text();
+                throw new Error(text || `Request failed (${res.status})`);
+            }
+
+            const data = (await res.json()) as { job_id?: string };
+            const jobId = data.job_id;
+            if (!jobId) throw new Error('Backend did not return a job_id.');
+
+            setIngestionResponse(`Crawl started (job_id: ${jobId}).`);
 
-            setIngestionResponse(text);
+            const formatCounters = (counters?: Record<string, number>) =>
+                counters
+                    ? `${counters.crawled ?? 0}/${counters.discovered ?? 0} pages crawled, ` +
+                      `${counters.failed ?? 0} failed, ${counters.embedded ?? 0} chunks embedded`
+                    : '';
+
+            const finalStatus = await pollJob(`/ingest/status/${jobId}`, (status) => {
+                setIngestionResponse(`Ingestion status: ${status.status ?? 'unknown'}... ${formatCounters(status.counters)}`);
+            });
+
+            setIngestionResponse(`Successfully ingested website data (${formatCounters(finalStatus.counters)}).`);
         } catch (err) {
             const message = err instanceof Error ? err.message : String(err);
             setIngestionResponse('Error: ' + message);
@@ -146,7 +243,13 @@ export default function Home() {
             if (res.status !== 202) {
                 const text = await res.text();
                 if (!res.ok) throw new Error(text || `Request failed (${res.status})`);
-                setIngestionResponse(text);
+                // 200 means an identical file was already ingested and nothing had to be redone.
+                const existing = JSON.parse(text) as { document_id?: string; deduplicated?: boolean };
+                setIngestionResponse(
+                    existing.deduplicated
+                        ? `This file was already ingested (document id: ${existing.document_id}).`
+                        : text
+                );
                 return;
             }
 
@@ -156,37 +259,11 @@ export default function Home() {
 
             setIngestionResponse(`Ingestion started (job_id: ${jobId}).`);
 
-            const pollEveryMs = 1000;
-            const timeoutMs = 10 * 60 * 1000;
-            const startedAt = Date.now();
-
-            while (true) {
-                if (Date.now() - startedAt > timeoutMs) {
-                    throw new Error('Ingestion is taking too long. Please check backend logs.');
-                }
-
-                // Wait pollEveryMs milliseconds, then continue.
-                await new Promise((resolve) => setTimeout(resolve, pollEveryMs));
-
-                const statusRes = await fetch(`/ingest-file/status/${jobId}`);
-                if (!statusRes.ok) {
-                    const text = await statusRes.text();
-                    throw new Error(text || `Status request failed (${statusRes.status})`);
-                }
-                const statusData = (await statusRes.json()) as { status?: string; error?: string };
-                const status = statusData.status ?? 'unknown';
-
-                if (status === 'succeeded') {
-                    setIngestionResponse('Successfully ingested the document.');
-                    break;
-                }
-
-                if (status === 'failed') {
-                    throw new Error(statusData.error || 'Ingestion failed.');
-                }
+            await pollJob(`/ingest-file/status/${jobId}`, (status) => {
+                setIngestionResponse(`Ingestion status: ${status.stage ?? status.status ?? 'unknown'}...`);
+            });
 
-                setIngestionResponse(`Ingestion status: ${status}...`);
-            }
+            setIngestionResponse('Successfully ingested the document.');
         } catch (err) {
             const message = err instanceof Error ? err.message : String(err);
             setIngestionResponse('Error: ' + message);
@@ -0,0 +1,5 @@
+import os
+
+# Read at import time: db_utils creates its (unconnected) pool object and the embedder its client
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
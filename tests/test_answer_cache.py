@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from api import answer_cache
+from api.answer_cache import SemanticAnswerCache
+
+EMBEDDINGS = {
+    "what is rag": [1.0, 0.0, 0.0],
+    "explain rag": [0.99, 0.1, 0.0],
+    "define rag": [0.97, 0.2, 0.0],
+    "who wrote the paper": [0.0, 1.0, 0.0],
+    "when is the meeting": [0.0, 0.0, 1.0],
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(answer_cache, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def make_cache(**kwargs):
+    calls = []
+
+    async def embed(text):
+        calls.append(text)
+        return EMBEDDINGS[" ".join(text.lower().split())]
+
+    return SemanticAnswerCache(embed=embed, **kwargs), calls
+
+
+def ask(cache, question, answer=None):
+    """Look `question` up and, on a miss, store `answer` for it."""
+    cached, probe = asyncio.run(cache.lookup(question))
+    if cached is None and answer is not None:
+        cache.store(probe, answer)
+    return cached
+
+
+def test_identical_question_is_answered_without_embedding(clock):
+    cache, calls = make_cache()
+    assert ask(cache, "What is RAG", "retrieval") is None
+    assert ask(cache, "  what is   rag ") == "retrieval"
+    assert calls == ["What is RAG"]
+
+
+def test_similar_question_hits_and_unrelated_question_misses(clock):
+    cache, _ = make_cache(similarity_threshold=0.95)
+    ask(cache, "what is rag", "retrieval")
+    assert ask(cache, "explain rag") == "retrieval"
+    assert ask(cache, "who wrote the paper") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_expired_answers_are_dropped(clock):
+    cache, _ = make_cache(ttl_seconds=60)
+    ask(cache, "what is rag", "retrieval")
+    clock.now += 61
+    assert ask(cache, "what is rag") is None
+    assert ask(cache, "explain rag") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_expired_best_match_does_not_hide_a_fresh_one(clock):
+    cache, _ = make_cache(ttl_seconds=60, similarity_threshold=0.99)
+    ask(cache, "what is rag", "old answer")
+    clock.now += 30
+    ask(cache, "define rag", "fresh answer")
+    clock.now += 40
+    # "what is rag" is the closer match to "explain rag" but has expired
+    assert ask(cache, "explain rag") == "fresh answer"
+
+
+def test_least_recently_used_answer_is_evicted(clock):
+    cache, _ = make_cache(max_entries=2)
+    ask(cache, "what is rag", "retrieval")
+    ask(cache, "who wrote the paper", "authors")
+    assert ask(cache, "what is rag") == "retrieval"
+    ask(cache, "when is the meeting", "monday")
+
+    assert cache.stats()["evictions"] == 1
+    assert ask(cache, "what is rag") == "retrieval"
+    assert ask(cache, "when is the meeting") == "monday"
+    assert ask(cache, "who wrote the paper") is None
+
+
+def test_storing_the_same_question_twice_replaces_the_answer(clock):
+    cache, _ = make_cache()
+    _, first = asyncio.run(cache.lookup("what is rag"))
+    _, second = asyncio.run(cache.lookup("what is rag"))
+    cache.store(first, "first")
+    cache.store(second, "second")
+    assert cache.stats()["entries"] == 1
+    assert ask(cache, "what is rag") == "second"
+
+
+def test_invalidate_drops_answers_and_discards_answers_in_flight(clock):
+    cache, _ = make_cache()
+    ask(cache, "what is rag", "retrieval")
+    _, probe = asyncio.run(cache.lookup("who wrote the paper"))
+
+    cache.invalidate()
+    cache.store(probe, "generated from the old corpus")
+
+    assert cache.stats()["entries"] == 0
+    assert ask(cache, "what is rag") is None
+    assert ask(cache, "who wrote the paper") is None
@@ -0,0 +1,20 @@
+import struct
+
+from api.utils.db_utils import decode_vector, encode_vector
+
+
+def test_vector_round_trip():
+    embedding = [0.0, 1.5, -2.25, 1e-3, 3.4e38]
+    decoded = decode_vector(encode_vector(embedding))
+    assert decoded == [struct.unpack("f", struct.pack("f", v))[0] for v in embedding]
+
+
+def test_vector_wire_format_is_pgvector_binary():
+    data = encode_vector([1.0, -2.0])
+    assert data[:4] == struct.pack(">HH", 2, 0)
+    assert data[4:] == struct.pack(">ff", 1.0, -2.0)
+
+
+def test_text_vectors_are_accepted():
+    assert encode_vector("[1.0, 2.5,-3]") == encode_vector([1.0, 2.5, -3.0])
+    assert decode_vector(encode_vector("[]")) == []
@@ -0,0 +1,86 @@
+import asyncio
+
+from api.file_data_ingestion.embedder import AdaptiveConcurrency, EmbeddingCache
+
+
+def test_rate_limit_halves_the_limit_once_per_burst():
+    throttle = AdaptiveConcurrency(16)
+    started = [throttle.epoch for _ in range(8)]  # Eight requests in flight
+    for epoch in started:
+        throttle.record_rate_limit(epoch)
+    assert throttle.limit == 8
+    assert throttle.rate_limited == 8
+
+    # A request sent after the decrease can lower it again
+    throttle.record_rate_limit(throttle.epoch)
+    assert throttle.limit == 4
+
+
+def test_limit_never_drops_below_one():
+    throttle = AdaptiveConcurrency(2)
+    for _ in range(3):
+        throttle.record_rate_limit(throttle.epoch)
+    assert throttle.limit == 1
+
+
+def test_limit_grows_back_after_a_run_of_successes():
+    throttle = AdaptiveConcurrency(4)
+    throttle.record_rate_limit(throttle.epoch)
+    assert throttle.limit == 2
+
+    for _ in range(2):
+        throttle.record_success()
+    assert throttle.limit == 3
+    for _ in range(3):
+        throttle.record_success()
+    assert throttle.limit == 4
+    for _ in range(10):
+        throttle.record_success()
+    assert throttle.limit == 4
+
+
+def test_requests_in_flight_stay_within_the_limit():
+    throttle = AdaptiveConcurrency(3)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with throttle:
+            peak = max(peak, throttle.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(*(request() for _ in range(12)))
+
+    asyncio.run(scenario())
+    assert peak == 3
+    assert throttle.in_flight == 0
+
+
+def test_memory_cache_evicts_least_recently_used_within_its_byte_budget():
+    # Four float32 dimensions are 16 bytes; room for three vectors
+    cache = EmbeddingCache(max_bytes=48)
+    for text in ("a", "b", "c"):
+        cache.put(text, [1.0, 2.0, 3.0, 4.0])
+    assert cache.get("a") == [1.0, 2.0, 3.0, 4.0]  # "b" is now least recently used
+
+    cache.put("d", [0.5] * 4)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.bytes == 48
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_cache_replacing_an_entry_does_not_count_it_twice():
+    cache = EmbeddingCache(max_bytes=48)
+    cache.put("a", [1.0] * 4)
+    cache.put("a", [2.0] * 4)
+    assert cache.bytes == 16
+    assert cache.get("a") == [2.0] * 4
+
+
+def test_memory_cache_skips_vectors_larger_than_the_budget():
+    cache = EmbeddingCache(max_bytes=8)
+    cache.put("a", [1.0] * 4)
+    assert cache.get("a") is None
+    assert cache.bytes == 0
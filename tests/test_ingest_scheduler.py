@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from api.ingest_scheduler import IngestScheduler, QueueFullError
+
+
+def test_submit_raises_when_queue_is_full():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def runner(job):
+            await release.wait()
+
+        scheduler = IngestScheduler(workers=1, max_queue_size=1)
+        running = scheduler.submit(runner)
+        await asyncio.sleep(0)  # The worker takes the first job off the queue
+        queued = scheduler.submit(runner)
+        with pytest.raises(QueueFullError):
+            scheduler.submit(runner)
+
+        assert running.status == "running"
+        assert queued.status == "queued"
+        assert scheduler.queue_depth() == 1
+        release.set()
+        await scheduler.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_job_records_time_per_stage():
+    async def scenario():
+        async def runner(job):
+            job.set_stage("converting")
+            await asyncio.sleep(0.05)
+            job.set_stage("embedding")
+
+        scheduler = IngestScheduler(workers=1)
+        job = scheduler.submit(runner, document_path="doc.pdf")
+        while not job.finished:
+            await asyncio.sleep(0.01)
+        await scheduler.shutdown()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "succeeded"
+    assert job.stage == "done"
+    assert set(job.stage_timings_ms) == {"queued", "converting", "embedding"}
+    assert job.stage_timings_ms["converting"] >= 40
+
+    status = job.to_dict()
+    assert status["document_path"] == "doc.pdf"
+    assert status["stage_timings_ms"]["converting"] == round(job.stage_timings_ms["converting"], 1)
+
+
+def test_failed_job_keeps_the_stage_it_failed_in():
+    async def scenario():
+        async def runner(job):
+            job.set_stage("embedding")
+            raise RuntimeError("rate limited")
+
+        scheduler = IngestScheduler(workers=1)
+        job = scheduler.submit(runner)
+        while not job.finished:
+            await asyncio.sleep(0.01)
+        await scheduler.shutdown()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "failed"
+    assert job.stage == "embedding"
+    assert job.to_dict()["error"] == "rate limited"
+
+
+def test_only_the_newest_finished_jobs_are_kept():
+    async def scenario():
+        async def runner(job):
+            pass
+
+        scheduler = IngestScheduler(workers=1, max_finished_jobs=2)
+        jobs = []
+        for _ in range(3):
+            jobs.append(scheduler.submit(runner))
+            while not jobs[-1].finished:
+                await asyncio.sleep(0.01)
+        last = scheduler.submit(runner)
+        await scheduler.shutdown()
+        return scheduler, jobs, last
+
+    scheduler, jobs, last = asyncio.run(scenario())
+    assert scheduler.get(jobs[0].job_id) is None
+    assert scheduler.get(jobs[1].job_id) is jobs[1]
+    assert scheduler.get(jobs[2].job_id) is jobs[2]
+    assert scheduler.get(last.job_id) is last
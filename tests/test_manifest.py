@@ -0,0 +1,58 @@
+import asyncio
+
+from api.file_data_ingestion.manifest import FileState, ManifestEntry, SyncPlan
+
+
+def state(path, size=10, mtime_ns=1):
+    return FileState(root="/docs", file_path=f"/docs/{path}", path=path, size=size, mtime_ns=mtime_ns)
+
+
+def entry(path, size=10, mtime_ns=1, content_sha256="old", document_id=None):
+    return ManifestEntry(path, size, mtime_ns, content_sha256, document_id or f"doc-{path}")
+
+
+def classify(plan, file_state, hashes):
+    hashed = []
+
+    def hash_file(file_path):
+        hashed.append(file_path)
+        return hashes[file_path]
+
+    return asyncio.run(plan.classify(file_state, hash_file)), hashed
+
+
+def test_new_file_is_ingested_without_hashing():
+    plan = SyncPlan(manifest={})
+    assert classify(plan, state("new.md"), {}) == (True, [])
+    assert plan.stats() == {"new": 1, "modified": 0, "unchanged": 0, "deleted": 0}
+
+
+def test_unchanged_stat_skips_the_file_without_hashing():
+    plan = SyncPlan(manifest={"a.md": entry("a.md")})
+    assert classify(plan, state("a.md"), {}) == (False, [])
+    assert plan.stats()["unchanged"] == 1
+
+
+def test_touched_file_with_the_same_content_is_skipped():
+    plan = SyncPlan(manifest={"a.md": entry("a.md")})
+    touched = state("a.md", mtime_ns=2)
+    assert classify(plan, touched, {"/docs/a.md": "old"}) == (False, ["/docs/a.md"])
+    assert plan.touched == [touched]
+    assert plan.stats()["unchanged"] == 1
+
+
+def test_modified_file_replaces_its_document():
+    plan = SyncPlan(manifest={"a.md": entry("a.md")})
+    modified = state("a.md", size=11, mtime_ns=2)
+    assert classify(plan, modified, {"/docs/a.md": "new"}) == (True, ["/docs/a.md"])
+    assert modified.content_sha256 == "new"
+    assert plan.replaces == {"a.md": "doc-a.md"}
+    assert plan.stats() == {"new": 0, "modified": 1, "unchanged": 0, "deleted": 0}
+
+
+def test_files_not_seen_are_deleted():
+    plan = SyncPlan(manifest={"a.md": entry("a.md"), "gone.md": entry("gone.md")})
+    classify(plan, state("a.md"), {})
+    plan.finish()
+    assert [e.path for e in plan.deleted] == ["gone.md"]
+    assert plan.stats() == {"new": 0, "modified": 0, "unchanged": 1, "deleted": 1}
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from api.file_data_ingestion.scanner import is_converted_side_file, iterate_in_thread, scan_documents
+
+
+@pytest.fixture
+def documents(tmp_path):
+    files = {
+        "a.md": "alpha",
+        "b.txt": "bravo",
+        "notes.exe": "binary",
+        ".hidden.md": "hidden",
+        ".git/config.md": "git",
+        "reports/q1.pdf": "%PDF",
+        "reports/drafts/q2.docx": "docx",
+        "archive/old.md": "old",
+        "large.md": "x" * 5000,
+        "talk.mp3": "audio",
+        "talk-converted.md": "transcript",
+        "slides.pptx": "pptx",
+        "slides-converted.md": "slides",
+        "orphan-converted.md": "source deleted",
+    }
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+def paths(root, **kwargs):
+    return [state.path.replace("\\", "/") for state in scan_documents(str(root), **kwargs)]
+
+
+def test_supported_files_in_name_order_before_subdirectories(documents):
+    assert paths(documents) == [
+        "a.md",
+        "b.txt",
+        "large.md",
+        "orphan-converted.md",
+        "slides.pptx",
+        "talk.mp3",
+        "archive/old.md",
+        "reports/q1.pdf",
+        "reports/drafts/q2.docx",
+    ]
+
+
+def test_file_state_has_stat_fields(documents):
+    state = next(s for s in scan_documents(str(documents)) if s.path == "large.md")
+    assert state.root == str(documents)
+    assert state.file_path == str(documents / "large.md")
+    assert state.size == 5000
+    assert state.mtime_ns == (documents / "large.md").stat().st_mtime_ns
+    assert state.content_sha256 is None
+
+
+def test_include_matches_relative_path_or_file_name(documents):
+    assert paths(documents, include=["*.md"]) == ["a.md", "large.md", "orphan-converted.md", "archive/old.md"]
+    assert paths(documents, include=["reports/*"]) == ["reports/q1.pdf", "reports/drafts/q2.docx"]
+
+
+def test_excluded_directories_are_not_descended_into(documents):
+    assert "archive/old.md" not in paths(documents, exclude=["archive"])
+    assert paths(documents, include=["*.pdf", "*.docx"], exclude=["drafts"]) == ["reports/q1.pdf"]
+
+
+def test_files_over_the_size_limit_are_skipped(documents):
+    assert "large.md" not in paths(documents, max_file_size=1000)
+    assert "large.md" in paths(documents, max_file_size=5000)
+
+
+def test_converted_side_files_are_skipped_while_their_source_exists(documents):
+    assert is_converted_side_file(str(documents / "talk-converted.md"))
+    assert is_converted_side_file(str(documents / "slides-converted.md"))
+    assert not is_converted_side_file(str(documents / "orphan-converted.md"))
+    assert not is_converted_side_file(str(documents / "a.md"))
+
+
+def test_iterate_in_thread_yields_every_item_in_order():
+    async def collect(iterator, batch_size):
+        return [item async for item in iterate_in_thread(iterator, batch_size=batch_size)]
+
+    assert asyncio.run(collect(iter(range(1000)), 16)) == list(range(1000))
+    assert asyncio.run(collect(iter([]), 16)) == []
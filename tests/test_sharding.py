@@ -0,0 +1,41 @@
+from api.file_data_ingestion.manifest import FileState
+from api.file_data_ingestion.sharding import shard_files
+
+
+def files(*sizes):
+    return [
+        (FileState(root="/docs", file_path=f"/docs/{i}", path=str(i), size=size, mtime_ns=0), None)
+        for i, size in enumerate(sizes)
+    ]
+
+
+def loads(planned, shards):
+    return [sum(planned[i][0].size for i in shard) for shard in shards]
+
+
+def test_every_file_is_in_exactly_one_shard_in_discovery_order():
+    planned = files(5, 90, 10, 40, 40, 7, 60, 1)
+    shards = shard_files(planned, 3)
+    assert sorted(i for shard in shards for i in shard) == list(range(len(planned)))
+    assert all(shard == sorted(shard) for shard in shards)
+
+
+def test_shards_are_balanced_by_size():
+    planned = files(100, 80, 60, 50, 40, 30, 20, 10, 5, 5)
+    shard_loads = loads(planned, shard_files(planned, 4))
+    assert len(shard_loads) == 4
+    # Largest-first placement ends within one file of the lightest shard
+    assert max(shard_loads) - min(shard_loads) <= 100
+
+
+def test_one_huge_file_gets_a_shard_of_its_own():
+    planned = files(1000, 10, 10, 10, 10)
+    shards = shard_files(planned, 2)
+    assert [0] in shards
+    assert loads(planned, shards) in ([1000, 40], [40, 1000])
+
+
+def test_more_shards_than_files_leaves_no_empty_shards():
+    assert sorted(shard_files(files(1, 2), 8)) == [[0], [1]]
+    assert shard_files([], 4) == []
+    assert shard_files(files(1, 2), 0) == [[0, 1]]
@@ -0,0 +1,95 @@
+import random
+import re
+
+import pytest
+
+from api.file_data_ingestion.text_reader import iter_paragraphs, profile_text, read_text_file, sliding_windows
+
+
+def old_sliding_windows(content, chunk_size, overlap, min_chunk_size):
+    """The fallback chunker's window loop before it streamed blocks (whole text in memory)."""
+    start = 0
+    while start < len(content):
+        end = start + chunk_size
+        if end >= len(content):
+            chunk_text = content[start:]
+        else:
+            chunk_end = end
+            for i in range(end, max(start + min_chunk_size, end - 200), -1):
+                if i < len(content) and content[i] in '.!?\n':
+                    chunk_end = i + 1
+                    break
+            chunk_text = content[start:chunk_end]
+            end = chunk_end
+        yield start, end, chunk_text
+        start = end - overlap
+
+
+def sample_text(seed, paragraphs=40):
+    rng = random.Random(seed)
+    words = ["vector", "search", "chunk", "embedding", "table", "query", "index", "token"]
+    out = []
+    for _ in range(paragraphs):
+        sentences = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(3, 40))) + rng.choice(".!?")
+            for _ in range(rng.randint(1, 6))
+        ]
+        out.append(" ".join(sentences) + "\n" * rng.randint(1, 3))
+    return "".join(out)
+
+
+def blocks_of(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("block_size", [1, 7, 100, 4096, 10 ** 6])
+def test_sliding_windows_match_the_old_chunker(seed, block_size):
+    text = sample_text(seed)
+    expected = list(old_sliding_windows(text, 1000, 200, 100))
+    assert list(sliding_windows(blocks_of(text, block_size), 1000, 200, 100)) == expected
+
+
+def test_sliding_windows_without_sentence_breaks():
+    text = "x" * 2500
+    assert list(sliding_windows(blocks_of(text, 300), 1000, 200, 100)) == list(
+        old_sliding_windows(text, 1000, 200, 100)
+    )
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 64, 10 ** 6])
+def test_iter_paragraphs_matches_splitting_the_whole_text(block_size):
+    text = sample_text(3) + "\n \n\n tail"
+    expected = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    actual = [p.strip() for p in iter_paragraphs(blocks_of(text, block_size)) if p.strip()]
+    assert actual == expected
+
+
+def test_profile_counts_lines_words_and_characters():
+    text = sample_text(4)
+    profile = profile_text(text)
+    assert profile.char_count == len(text)
+    assert profile.line_count == text.count("\n") + 1
+    assert profile.word_count == len(text.split())
+
+
+def test_read_text_file_keeps_small_files_only(tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_text("héllo wörld\n", encoding="utf-8")
+
+    profile, content = read_text_file(str(path), max_inline_chars=100)
+    assert content == "héllo wörld\n"
+    assert profile.encoding == "utf-8"
+    assert profile.word_count == 2
+
+    profile, content = read_text_file(str(path), max_inline_chars=5)
+    assert content is None
+    assert profile.char_count == 12
+
+
+def test_read_text_file_falls_back_to_latin1(tmp_path):
+    path = tmp_path / "legacy.txt"
+    path.write_bytes("café".encode("latin-1"))
+    profile, content = read_text_file(str(path), max_inline_chars=100)
+    assert content == "café"
+    assert profile.encoding == "latin-1"
@@ -0,0 +1,39 @@
+import numpy as np
+
+from api.file_data_ingestion.transcriber import SAMPLE_RATE, split_on_silence
+
+SILENCES = [(8.5, 9.0), (17.5, 18.0), (26.5, 27.0)]  # Seconds
+
+
+def recording(seconds=35.0):
+    rng = np.random.default_rng(0)
+    audio = rng.normal(0, 0.3, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    for start, end in SILENCES:
+        audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0.0
+    return audio
+
+
+def test_short_recording_is_one_segment():
+    audio = np.zeros(12 * SAMPLE_RATE, dtype=np.float32)
+    assert split_on_silence(audio, segment_seconds=10) == [(0, len(audio))]
+
+
+def test_segments_cover_the_recording_and_are_cut_in_pauses():
+    audio = recording()
+    segments = split_on_silence(audio, segment_seconds=10, search_seconds=4)
+
+    assert segments[0][0] == 0
+    assert segments[-1][1] == len(audio)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(segments, segments[1:]))
+
+    cuts = [start / SAMPLE_RATE for start, _ in segments[1:]]
+    assert len(cuts) == len(SILENCES)
+    for cut, (start, end) in zip(cuts, SILENCES):
+        assert start <= cut <= end
+
+
+def test_no_short_tail_segment():
+    audio = recording()
+    segments = split_on_silence(audio, segment_seconds=10, search_seconds=4)
+    assert all(end - start <= 12.5 * SAMPLE_RATE for start, end in segments)
+    assert (segments[-1][1] - segments[-1][0]) > 2.5 * SAMPLE_RATE